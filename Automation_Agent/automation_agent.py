@@ -1,38 +1,9 @@
 import os
 
-from google.adk.agents.llm_agent import Agent
-from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
-from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
-from mcp import StdioServerParameters
-
-from constants import WORKSPACE_DIR, PLATFORM, MODEL
-
-
-if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
-    raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
-else:
-    model = f"{MODEL}"
-
-toolset = McpToolset(
-    connection_params=StdioConnectionParams(
-        server_params = StdioServerParameters(
-            command='businessflow',
-            args=["-u", "-m"],
-            env={
-                "WORKSPACE_DIR":WORKSPACE_DIR,
-                "PLATFORM":PLATFORM,
-            },
-        ),
-        timeout=15.0,
-    ),
-    tool_filter=['send_email']
-)
-
-root_agent = Agent(
-    name="Email_Automation_Agent",
-    model=model,
-    description="An Automation Agent responsible for generating and emailing the final business report after approval.",
-    instruction=f"""
+from constants import WORKSPACE_DIR, PLATFORM, MODEL, MCP_TIMEOUT
+
+
+INSTRUCTION = f"""
     You are an Automation Agent responsible for executing the final approved action
     in the business automation workflow.
 
@@ -43,7 +14,19 @@ root_agent = Agent(
     - You MUST NOT perform validation or business reasoning.
     - Your responsibility is strictly report generation and email delivery.
 
-    All required inputs are automatically injected via the system state.
+    All required inputs are automatically injected via the system state:
+
+    QA Validator verdict:
+    {{qa_verdict?}}
+
+    Executive summary:
+    {{executive_summary?}}
+
+    Validated business rules:
+    {{business_specifications?}}
+
+    Statistical summary:
+    {{statistical_summary?}}
 
     **Task:**
     a) Verify that the QA Validator verdict is exactly "APPROVED".
@@ -58,7 +41,42 @@ root_agent = Agent(
     d) Send the email to the user using the tool `send_email`.
 
     Respond with ONLY a confirmation that the email has been successfully sent.
-    """,
-    tools=[toolset],
-    output_key="automation_status"
-)
\ No newline at end of file
+    """
+
+
+def create_agent():
+    """Build the Email Automation Agent and its toolset."""
+    if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
+        raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
+    else:
+        model = f"{MODEL}"
+
+    from google.adk.agents.llm_agent import Agent
+    from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
+    from mcp import StdioServerParameters
+
+    from deadline import DeadlineMcpToolset
+
+    toolset = DeadlineMcpToolset(
+        connection_params=StdioConnectionParams(
+            server_params = StdioServerParameters(
+                command='businessflow',
+                args=["-u", "-m"],
+                env={
+                    "WORKSPACE_DIR":WORKSPACE_DIR,
+                    "PLATFORM":PLATFORM,
+                },
+            ),
+            timeout=MCP_TIMEOUT,
+        ),
+        tool_filter=['send_email']
+    )
+
+    return Agent(
+        name="Email_Automation_Agent",
+        model=model,
+        description="An Automation Agent responsible for generating and emailing the final business report after approval.",
+        instruction=INSTRUCTION,
+        tools=[toolset],
+        output_key="automation_status"
+    )
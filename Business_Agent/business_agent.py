@@ -1,38 +1,9 @@
 import os
 
-from google.adk.agents.llm_agent import Agent
-from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
-from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
-from google.adk.models.google_llm import Gemini
-from mcp import StdioServerParameters
+from constants import WORKSPACE_DIR, MODEL, PLATFORM, MCP_TIMEOUT
 
-from constants import WORKSPACE_DIR, MODEL, PLATFORM, RETRY_CONFIG
 
-if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
-    raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
-else:
-    model = f"{MODEL}"
-
-toolset = McpToolset(
-    connection_params=StdioConnectionParams(
-        server_params = StdioServerParameters(
-            command='businessflow',
-            args=["-u", "-m"],
-            env={
-                "WORKSPACE_DIR": WORKSPACE_DIR,
-                "PLATFORM": PLATFORM,
-            },
-        ),
-        timeout=15.0,
-    ),
-    tool_filter=['create_file', 'create_folder']
-)
-
-root_agent = Agent(
-  name='Business_Agent',
-  description='A Business Logic Agent responsible for defining business rules, KPI requirements, and statistical constraints.',
-  model=Gemini(model=model, retry_options=RETRY_CONFIG),
-  instruction=f"""
+INSTRUCTION = f"""
     **CRITICAL EXECUTION RULES:**
     - You MUST define business rules, assumptions, and KPI requirements independently of the data agent.
     - You MUST NOT validate, approve, or critique your own logic.
@@ -60,7 +31,46 @@ root_agent = Agent(
     have been successfully created and are ready for validation.
 
     **END OF BUSINESS SPECIFICATIONS**
-    """,
-  tools=[toolset],
-  output_key="business_specifications"
-)
\ No newline at end of file
+    """
+
+
+def create_agent():
+    """Build the Business Agent, its toolset and its Gemini client."""
+    if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
+        raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
+    else:
+        model = f"{MODEL}"
+
+    from google.adk.agents.llm_agent import Agent
+    from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
+    from google.adk.models.google_llm import Gemini
+    from mcp import StdioServerParameters
+
+    from constants import RETRY_CONFIG
+    from deadline import DeadlineMcpToolset
+    from refinement import reuse_cached_output
+
+    toolset = DeadlineMcpToolset(
+        connection_params=StdioConnectionParams(
+            server_params = StdioServerParameters(
+                command='businessflow',
+                args=["-u", "-m"],
+                env={
+                    "WORKSPACE_DIR": WORKSPACE_DIR,
+                    "PLATFORM": PLATFORM,
+                },
+            ),
+            timeout=MCP_TIMEOUT,
+        ),
+        tool_filter=['create_file', 'create_folder']
+    )
+
+    return Agent(
+      name='Business_Agent',
+      description='A Business Logic Agent responsible for defining business rules, KPI requirements, and statistical constraints.',
+      model=Gemini(model=model, retry_options=RETRY_CONFIG),
+      instruction=INSTRUCTION,
+      tools=[toolset],
+      output_key="business_specifications",
+      before_agent_callback=reuse_cached_output("business_specifications"),
+    )
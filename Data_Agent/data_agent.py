@@ -1,56 +1,9 @@
 import os
 
-from google.adk.tools import google_search
-from google.adk.agents.llm_agent import Agent
-from google.adk.agents import SequentialAgent
-from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
-from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
-from google.adk.models.google_llm import Gemini
-from constants import RETRY_CONFIG, WORKSPACE_DIR, PLATFORM, MODEL
-from mcp import StdioServerParameters
-
-
-if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
-    raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
-else:
-    model = f"{MODEL}"
-
-rag_agent_toolset = McpToolset(
-    connection_params=StdioConnectionParams(
-        server_params = StdioServerParameters(
-            command='businessflow',
-            args=["-u", "-m"],
-            env={
-                "WORKSPACE_DIR": WORKSPACE_DIR,
-                "PLATFORM": PLATFORM,
-            },
-        ),
-        timeout=15.0,
-    ),
-    tool_filter=['rag_retrieve']
-)
-
-summary_agent_agent_toolset = McpToolset(
-    connection_params=StdioConnectionParams(
-        server_params = StdioServerParameters(
-            command='businessflow',
-            args=["-u", "-m"],
-            env={
-                "WORKSPACE_DIR": WORKSPACE_DIR,
-                "PLATFORM": PLATFORM,
-            },
-        ),
-        timeout=15.0,
-    ),
-    tool_filter=['create_file', 'create_folder']
-)
+from constants import WORKSPACE_DIR, PLATFORM, MODEL, MCP_TIMEOUT
 
 
-rag_agent = Agent(
-  name='RAG_Data_Collector',
-  description='A Retrieval Agent responsible for collecting ranked numerical and factual data using a specialized RAG tool.',
-  model=Gemini(model=model, retry_options=RETRY_CONFIG),
-  instruction=f"""
+RAG_INSTRUCTION = f"""
     **CRITICAL EXECUTION RULES:**
     - You MUST fully complete your task before any validation can occur.
     - You MUST produce quantitative outputs including raw values, statistics, and KPI-ready measures.
@@ -80,17 +33,10 @@ rag_agent = Agent(
     and that the retrieved data is ready for formatting and cleaning.
 
     **END OF DATA ANALYSIS**
-    """,
-  tools=[rag_agent_toolset, google_search],
-  output_key="retrieved_raw_data"
-)
+    """
 
 
-etl_agent = Agent(
-  name='Data_Formatter_Cleaner',
-  description='An ETL Agent responsible for cleaning, transforming, and identifying relevant numerical and statistical data.',
-  model=Gemini(model=model, retry_options=RETRY_CONFIG),
-  instruction=f"""You are a Data Formatting and Cleaning Agent responsible for transforming
+ETL_INSTRUCTION = f"""You are a Data Formatting and Cleaning Agent responsible for transforming
     retrieved raw data into structured, consistent, and analyzable datasets.
     DO NOT summarize or apply business logic.
     Your responsibility is strictly ETL and data preparation.
@@ -108,17 +54,10 @@ etl_agent = Agent(
 
     Respond with ONLY a confirmation that data formatting and cleaning is completed
     and that the processed data is ready for statistical summarization.
-    """,
-  tools=[],
-  output_key="processed_structured_data"
-)
+    """
 
 
-summary_agent = Agent(
-  name='Statistical_Summarizer',
-  description='A Summarization Agent responsible for extracting numerical values and statistical measurements for KPI readiness.',
-  model=Gemini(model=model, retry_options=RETRY_CONFIG),
-  instruction=f"""You are a Statistical Summarization Agent responsible for producing
+SUMMARY_INSTRUCTION = f"""You are a Statistical Summarization Agent responsible for producing
     concise summaries focused strictly on numerical values, metrics, and statistical measurements.
     DO NOT define KPIs or apply business rules.
     Your responsibility is strictly numerical summarization.
@@ -137,14 +76,75 @@ summary_agent = Agent(
 
     Respond with ONLY a confirmation that the statistical summary is completed
     and ready for validation by the QA Validator Agent.
-    """,
-  tools=[summary_agent_agent_toolset],
-  output_key="statistical_summary"
-)
-
-
-root_agent = SequentialAgent(
-    name="Data_Agent",
-    sub_agents=[rag_agent, etl_agent, summary_agent],
-    description="Retrieves data from provided documents and perform a web search, cleans and formats it then extracts the key values."
-)
\ No newline at end of file
+    """
+
+
+def create_toolset(tool_filter: list[str]):
+    """Toolset of the businessflow MCP server, limited to `tool_filter`."""
+    from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
+    from mcp import StdioServerParameters
+    from deadline import DeadlineMcpToolset
+
+    return DeadlineMcpToolset(
+        connection_params=StdioConnectionParams(
+            server_params = StdioServerParameters(
+                command='businessflow',
+                args=["-u", "-m"],
+                env={
+                    "WORKSPACE_DIR": WORKSPACE_DIR,
+                    "PLATFORM": PLATFORM,
+                },
+            ),
+            timeout=MCP_TIMEOUT,
+        ),
+        tool_filter=tool_filter
+    )
+
+
+def create_agent():
+    """Build the Data Agent, its toolsets and its Gemini clients."""
+    if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
+        raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
+    else:
+        model = f"{MODEL}"
+
+    from google.adk.tools import google_search
+    from google.adk.agents.llm_agent import Agent
+    from google.adk.agents import SequentialAgent
+    from google.adk.models.google_llm import Gemini
+    from constants import RETRY_CONFIG
+    from refinement import reuse_cached_output
+
+    rag_agent = Agent(
+      name='RAG_Data_Collector',
+      description='A Retrieval Agent responsible for collecting ranked numerical and factual data using a specialized RAG tool.',
+      model=Gemini(model=model, retry_options=RETRY_CONFIG),
+      instruction=RAG_INSTRUCTION,
+      tools=[create_toolset(['rag_retrieve']), google_search],
+      output_key="retrieved_raw_data"
+    )
+
+    etl_agent = Agent(
+      name='Data_Formatter_Cleaner',
+      description='An ETL Agent responsible for cleaning, transforming, and identifying relevant numerical and statistical data.',
+      model=Gemini(model=model, retry_options=RETRY_CONFIG),
+      instruction=ETL_INSTRUCTION,
+      tools=[],
+      output_key="processed_structured_data"
+    )
+
+    summary_agent = Agent(
+      name='Statistical_Summarizer',
+      description='A Summarization Agent responsible for extracting numerical values and statistical measurements for KPI readiness.',
+      model=Gemini(model=model, retry_options=RETRY_CONFIG),
+      instruction=SUMMARY_INSTRUCTION,
+      tools=[create_toolset(['create_file', 'create_folder'])],
+      output_key="statistical_summary"
+    )
+
+    return SequentialAgent(
+        name="Data_Agent",
+        sub_agents=[rag_agent, etl_agent, summary_agent],
+        description="Retrieves data from provided documents and perform a web search, cleans and formats it then extracts the key values.",
+        before_agent_callback=reuse_cached_output("statistical_summary"),
+    )
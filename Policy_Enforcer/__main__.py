@@ -1,4 +1,4 @@
-import logging, click, uvicorn, os, sys
+import logging, click, httpx, os, sys
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 target_directory = os.path.join(current_dir, '..') 
@@ -7,15 +7,21 @@ sys.path.append(target_directory)
 
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
+from a2a.server.tasks import (
+    BasePushNotificationSender,
+    InMemoryPushNotificationConfigStore,
+    InMemoryTaskStore,
+)
 from a2a.types import (
     AgentCapabilities,
     AgentCard,
     AgentSkill,
 )
-from agent_executor import ADKAgentExecutor
+from serving import serve, server_options
+from sqlite_storage import SqliteStorage, SqliteTaskStore, default_db_path
 
-from policy_enforcement_agent import root_agent as policy_enforcement_agent
+from Policy_Enforcer.policy_enforcement_agent import create_agent, create_batch_agent
+from Policy_Enforcer.batch import PolicyAgentExecutor
 from logs.core.loggers import policy_logger as logger
 from constants import APP_NAME
 
@@ -24,10 +30,10 @@ class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
 
 
-@click.command()
-@click.option("--host", default="localhost")
-@click.option("--port", default=8004)
-def main(host, port):
+def build_app(host, port, db_path, workers):
+    """Build the A2A app of the agent."""
+    policy_enforcement_agent = create_agent()
+
     # Agent card (metadata)
     agent_card = AgentCard(
         name='Policy Enforcement Agent',
@@ -36,7 +42,7 @@ def main(host, port):
         version="1.0.0",
         defaultInputModes=["text", "text/plain"],
         defaultOutputModes=["text", "text/plain"],
-        capabilities=AgentCapabilities(streaming=True),
+        capabilities=AgentCapabilities(streaming=True, push_notifications=True),
         skills=[
             AgentSkill(
                 id="policy_enforcer",
@@ -50,24 +56,66 @@ def main(host, port):
                     "Tell me how does the architecture exactly look like",
                     "Tell me the network details"
                 ],
-            )
+            ),
+            AgentSkill(
+                id="policy_batch",
+                name="Batch policy evaluation",
+                description=(
+                    'Evaluates a list of texts, sent as a data part {"items": ["text", ...]}, '
+                    'and returns a "verdicts" data artifact with the decision and reasoning '
+                    'of each text, in order.'
+                ),
+                tags=["guardrail", "policy", "batch"],
+                input_modes=["application/json"],
+                output_modes=["application/json"],
+            ),
         ],
     )
 
+    storage = SqliteStorage(db_path, shared=workers > 1) if db_path else None
+    push_config_store = InMemoryPushNotificationConfigStore()
+    agent_executor = PolicyAgentExecutor(
+        app_name=APP_NAME,
+        agent=policy_enforcement_agent,
+        batch_agent=create_batch_agent(),
+        logger=logger,
+        storage=storage,
+    )
     request_handler = DefaultRequestHandler(
-        agent_executor=ADKAgentExecutor(
-            app_name=APP_NAME,
-            agent=policy_enforcement_agent,
-            logger=logger,
+        agent_executor=agent_executor,
+        task_store=SqliteTaskStore(storage) if storage else InMemoryTaskStore(),
+        push_config_store=push_config_store,
+        push_sender=BasePushNotificationSender(
+            httpx_client=httpx.AsyncClient(),
+            config_store=push_config_store,
         ),
-        task_store=InMemoryTaskStore(),
     )
 
     server = A2AStarletteApplication(
         agent_card=agent_card, http_handler=request_handler
     )
 
-    uvicorn.run(server.build(), host=host, port=port)
+    app = server.build()
+    app.add_event_handler("shutdown", agent_executor.drain)
+    if storage:
+        app.add_event_handler("shutdown", storage.close)
+    return app
+
+
+def create_app():
+    """App factory of the worker processes."""
+    return build_app(**server_options())
+
+
+@click.command()
+@click.option("--host", default="localhost")
+@click.option("--port", default=8004)
+@click.option("--db-path", default=default_db_path("policy"), help="SQLite file persisting tasks and sessions, in memory when unset.")
+@click.option("--workers", default=1, help="Worker processes serving the agent; more than one requires a database.")
+def main(host, port, db_path, workers):
+    if workers > 1 and not db_path:
+        raise click.UsageError("--workers above 1 requires --db-path or STORAGE_DIR, so that workers share tasks and sessions.")
+    serve("Policy_Enforcer.__main__:create_app", build_app, host, port, workers, db_path=db_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+import asyncio, json, logging, time
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import DataPart, Part, TaskState
+from a2a.utils import new_agent_text_message, new_task
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from admission import DEFAULT_PRIORITY, PRIORITY_KEY, AdmissionRejected
+from agent_executor import ADKAgentExecutor
+from constants import (
+    POLICY_BATCH_CONCURRENCY,
+    POLICY_BATCH_SIZE,
+    POLICY_MAX_INPUT_CHARS,
+    POLICY_WINDOW_OVERLAP,
+)
+from Policy_Enforcer.rule_engine import RuleEngine
+from Policy_Enforcer.windows import split_windows
+
+
+# A batch request is a message with a data part {"items": ["text", ...]}; the
+# verdicts are returned in order in a data artifact {"verdicts": [...]}.
+ITEMS_KEY = 'items'
+VERDICTS_ARTIFACT = 'verdicts'
+# Severity of the verdicts of the windows of a text, the worst one wins
+DECISION_RANK = {'safe': 0, 'error': 1, 'unsafe': 2}
+
+
+def batch_items(context: RequestContext) -> list[str] | None:
+    """Texts of a batch evaluation request, None for a single input."""
+    for part in context.message.parts if context.message else []:
+        if isinstance(part.root, DataPart) and isinstance(part.root.data.get(ITEMS_KEY), list):
+            return [str(item) for item in part.root.data[ITEMS_KEY]]
+    return None
+
+
+def parse_verdicts(raw: str) -> dict[int, dict]:
+    """Well-formed verdicts of a batch response, by item id."""
+    try:
+        data = json.loads(raw.replace('```json', '').replace('```', '').strip())
+    except json.JSONDecodeError:
+        return {}
+    verdicts = {}
+    for verdict in data if isinstance(data, list) else []:
+        if (
+            isinstance(verdict, dict)
+            and isinstance(verdict.get('id'), int)
+            and verdict.get('decision') in ('safe', 'unsafe')
+        ):
+            verdicts[verdict['id']] = {
+                'decision': verdict['decision'],
+                'reasoning': str(verdict.get('reasoning', '')),
+                'source': 'model',
+            }
+    return verdicts
+
+
+class BatchPolicyEvaluator:
+    """Evaluates many texts against the policy with few model calls.
+
+    Texts decided by the rule engine skip the model. The others are cut into
+    windows of at most `max_chars` characters, packed by up to `batch_size`
+    windows and `max_chars` characters into prompts asking one verdict per
+    window, and at most `concurrency` prompts run at once. A text gets the
+    worst verdict of its windows; windows missing from a response are
+    evaluated again on their own, and get an "error" verdict if still missing.
+    """
+
+    def __init__(
+        self,
+        agent,
+        logger=logging.getLogger(__name__),
+        rules: RuleEngine | None = None,
+        batch_size: int = POLICY_BATCH_SIZE,
+        max_chars: int = POLICY_MAX_INPUT_CHARS,
+        concurrency: int = POLICY_BATCH_CONCURRENCY,
+    ):
+        # Every prompt runs in a session of its own, deleted afterwards
+        self.runner = Runner(
+            app_name=agent.name, agent=agent, session_service=InMemorySessionService()
+        )
+        self.logger = logger
+        self.rules = rules or RuleEngine()
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def evaluate(self, texts: list[str]) -> list[dict]:
+        """One verdict per text, in order, with the index of the text."""
+        results: list[dict | None] = [None] * len(texts)
+        windows: list[tuple[int, str]] = []
+        # Scanning large texts takes a noticeable time, off the event loop
+        decisions = await asyncio.to_thread(lambda: [self.rules.check(text) for text in texts])
+        for index, (text, decision) in enumerate(zip(texts, decisions)):
+            if decision is not None:
+                results[index] = {
+                    'decision': decision.decision,
+                    'reasoning': decision.reasoning,
+                    'source': 'rules',
+                }
+                continue
+            for window in split_windows(text, self.max_chars, POLICY_WINDOW_OVERLAP):
+                windows.append((index, window))
+
+        packs = self._pack(windows)
+        self.logger.info(
+            f'Evaluating {len(texts)} texts: {len(texts) - len({i for i, _ in windows})} '
+            f'decided by the rules, {len(windows)} windows in {len(packs)} model calls'
+        )
+        pack_verdicts = await asyncio.gather(*(self._evaluate_pack(pack) for pack in packs))
+        for pack, verdicts in zip(packs, pack_verdicts):
+            for (index, _), verdict in zip(pack, verdicts):
+                current = results[index]
+                if current is None or DECISION_RANK[verdict['decision']] > DECISION_RANK[current['decision']]:
+                    results[index] = verdict
+        return [{'index': index, **result} for index, result in enumerate(results)]
+
+    def _pack(self, windows: list[tuple[int, str]]) -> list[list[tuple[int, str]]]:
+        packs, pack, size = [], [], 0
+        for window in windows:
+            if pack and (len(pack) == self.batch_size or size + len(window[1]) > self.max_chars):
+                packs.append(pack)
+                pack, size = [], 0
+            pack.append(window)
+            size += len(window[1])
+        if pack:
+            packs.append(pack)
+        return packs
+
+    async def _evaluate_pack(self, pack: list[tuple[int, str]]) -> list[dict]:
+        prompt = json.dumps([{'id': i, 'text': text} for i, (_, text) in enumerate(pack)])
+        try:
+            async with self._slots:
+                verdicts = parse_verdicts(await self._run(prompt))
+        except Exception as e:
+            self.logger.error(f'Batch of {len(pack)} windows failed: {e}')
+            return [{'decision': 'error', 'reasoning': str(e), 'source': 'model'}] * len(pack)
+
+        missing = [i for i in range(len(pack)) if i not in verdicts]
+        if missing and len(pack) > 1:
+            self.logger.warning(f'{len(missing)} verdicts missing from a batch of {len(pack)}, retrying them')
+            retried = await asyncio.gather(*(self._evaluate_pack([pack[i]]) for i in missing))
+            verdicts.update((i, verdict) for i, [verdict] in zip(missing, retried))
+        return [
+            verdicts.get(i, {'decision': 'error', 'reasoning': 'No verdict in the model response.', 'source': 'model'})
+            for i in range(len(pack))
+        ]
+
+    async def _run(self, prompt: str) -> str:
+        session = await self.runner.session_service.create_session(
+            app_name=self.runner.app_name, user_id='batch'
+        )
+        try:
+            async for event in self.runner.run_async(
+                user_id='batch',
+                session_id=session.id,
+                new_message=types.Content(role='user', parts=[types.Part(text=prompt)]),
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    return ''.join(p.text for p in event.content.parts if p.text)
+            return ''
+        finally:
+            await self.runner.session_service.delete_session(
+                app_name=self.runner.app_name, user_id='batch', session_id=session.id
+            )
+
+
+class PolicyAgentExecutor(ADKAgentExecutor):
+    """Agent executor of the Policy Enforcer, with batch evaluation.
+
+    Messages with a list of items are evaluated by a BatchPolicyEvaluator
+    running `batch_agent`; any other message is a single policy check.
+    """
+
+    def __init__(self, *args, batch_agent, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch = BatchPolicyEvaluator(batch_agent, logger=self.logger)
+
+    async def execute(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
+    ) -> None:
+        items = batch_items(context)
+        if items is None:
+            return await super().execute(context, event_queue)
+
+        task = context.current_task or new_task(context.message)
+        await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+
+        priority = (context.message.metadata or {}).get(PRIORITY_KEY, DEFAULT_PRIORITY)
+        try:
+            await self._wait_for_admission(updater, task, priority)
+        except AdmissionRejected as e:
+            await self._reject(updater, task, e)
+            return
+
+        started = time.monotonic()
+        try:
+            await updater.update_status(
+                TaskState.working,
+                new_agent_text_message(f"Evaluating {len(items)} items...", task.context_id, task.id),
+            )
+            run = asyncio.create_task(self.batch.evaluate(items))
+            self._track(task.id, run)
+            try:
+                verdicts = await run
+            except asyncio.CancelledError:
+                if not await self._record_cancellation(updater, task):
+                    raise
+                return
+            finally:
+                self._untrack(task.id)
+
+            await updater.add_artifact(
+                [Part(root=DataPart(data={VERDICTS_ARTIFACT: verdicts}))],
+                name=VERDICTS_ARTIFACT,
+            )
+            await updater.complete()
+        except Exception as e:
+            await updater.update_status(
+                TaskState.failed,
+                new_agent_text_message(f"Error: {e!s}", task.context_id, task.id),
+                final=True,
+            )
+        finally:
+            self.admission.release(time.monotonic() - started)
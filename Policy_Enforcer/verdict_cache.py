@@ -0,0 +1,164 @@
+import asyncio, hashlib, re, time, unicodedata
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Only a type here: the rule engine imports this module without the
+    # agent frameworks that sqlite_storage loads.
+    from sqlite_storage import SqliteStorage
+
+
+NAMESPACE = 'policy_verdict'
+SIMHASH_BITS = 64
+# SimHash bands: texts within MAX_DISTANCE bits share at least one band
+BANDS = 8
+BAND_BITS = SIMHASH_BITS // BANDS
+MAX_DISTANCE = 6
+# Texts shorter than this many tokens are only matched exactly, SimHash is
+# too coarse for them ("approved" / "not approved").
+MIN_NEAR_DUPLICATE_TOKENS = 8
+# Only the first tokens of a text are fingerprinted, which bounds the cost of
+# a lookup.
+SIMHASH_MAX_TOKENS = 2048
+
+
+def normalize(text: str) -> str:
+    """Case, whitespace and punctuation insensitive form of a text."""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def simhash(tokens: list[str]) -> int:
+    """64-bit SimHash of the tokens and token bigrams of a text.
+
+    Pure Python and CPU bound, the cache runs it in a worker thread.
+    """
+    tokens = tokens[:SIMHASH_MAX_TOKENS]
+    weights = [0] * SIMHASH_BITS
+    features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def bands(fingerprint: int) -> list[tuple[int, int]]:
+    mask = (1 << BAND_BITS) - 1
+    return [(band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+
+@dataclass
+class Verdict:
+    response: str
+    safe: bool
+    fingerprint: int | None
+    expires_at: float
+
+
+class VerdictCache:
+    """Policy verdicts by normalized text, with near-duplicate lookup.
+
+    Exact matches are served from a dict keyed by the normalized text; for
+    longer texts, a SimHash band index finds "unsafe" verdicts of texts
+    within MAX_DISTANCE bits. A near-duplicate never inherits a "safe"
+    verdict: removing a single "not" keeps the text close and flips its
+    meaning. Entries are bounded by LRU size and TTL and persisted in
+    `storage` when one is given.
+    """
+
+    def __init__(self, size: int, ttl: float, storage: "SqliteStorage | None" = None):
+        self.size = size
+        self.ttl = ttl
+        self.storage = storage
+        self._entries: OrderedDict[str, Verdict] = OrderedDict()
+        self._bands: dict[tuple[int, int], set[str]] = {}
+
+    async def load(self) -> None:
+        """Restore the persisted verdicts."""
+        if self.storage is None:
+            return
+        now = time.time()
+        for key in await self.storage.keys(NAMESPACE):
+            value = await self.storage.get(NAMESPACE, key)
+            if value and value['expires_at'] > now:
+                self._add(key, value['response'], value['safe'], value['expires_at'])
+
+    async def get(self, text: str) -> str | None:
+        """The cached policy response for a text, None on a miss."""
+        key = normalize(text)
+        now = time.time()
+        verdict = self._entries.get(key)
+        if verdict is not None:
+            if verdict.expires_at > now:
+                self._entries.move_to_end(key)
+                return verdict.response
+            self._discard(key)
+
+        tokens = key.split()
+        if len(tokens) < MIN_NEAR_DUPLICATE_TOKENS or not self._bands:
+            return None
+        # Long texts take a noticeable time to hash, off the event loop
+        fingerprint = await asyncio.to_thread(simhash, tokens)
+        for candidate in {k for band in bands(fingerprint) for k in self._bands.get(band, ())}:
+            verdict = self._entries.get(candidate)
+            if verdict is None:
+                continue
+            if verdict.expires_at <= now or bin(verdict.fingerprint ^ fingerprint).count('1') > MAX_DISTANCE:
+                continue
+            self._entries.move_to_end(candidate)
+            return verdict.response
+        return None
+
+    async def put(self, text: str, response: str, safe: bool) -> None:
+        key = normalize(text)
+        expires_at = time.time() + self.ttl
+        tokens = key.split()
+        fingerprint = None
+        if not safe and len(tokens) >= MIN_NEAR_DUPLICATE_TOKENS:
+            fingerprint = await asyncio.to_thread(simhash, tokens)
+        for evicted in self._add(key, response, safe, expires_at, fingerprint):
+            if self.storage is not None:
+                await self.storage.delete(NAMESPACE, evicted)
+        if self.storage is not None:
+            await self.storage.put(
+                NAMESPACE, key, {'response': response, 'safe': safe, 'expires_at': expires_at}
+            )
+
+    def _add(
+        self, key: str, response: str, safe: bool, expires_at: float, fingerprint: int | None = None
+    ) -> list[str]:
+        """Insert a verdict, returning the keys evicted to make room.
+
+        Only unsafe verdicts are fingerprinted, they are the only ones
+        near-duplicates inherit.
+        """
+        self._discard(key)
+        tokens = key.split()
+        if fingerprint is None and not safe and len(tokens) >= MIN_NEAR_DUPLICATE_TOKENS:
+            fingerprint = simhash(tokens)
+        self._entries[key] = Verdict(response, safe, fingerprint, expires_at)
+        if fingerprint is not None:
+            for band in bands(fingerprint):
+                self._bands.setdefault(band, set()).add(key)
+
+        evicted = []
+        while len(self._entries) > self.size:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            evicted.append(oldest)
+        return evicted
+
+    def _discard(self, key: str) -> None:
+        verdict = self._entries.pop(key, None)
+        if verdict is None or verdict.fingerprint is None:
+            return
+        for band in bands(verdict.fingerprint):
+            keys = self._bands.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._bands[band]
@@ -0,0 +1,20 @@
+def split_windows(text: str, size: int, overlap: int) -> list[str]:
+    """Cut a text into windows of at most `size` characters.
+
+    Consecutive windows share `overlap` characters, so that a phrase spanning
+    a cut is entirely in one of them; cuts fall on whitespace when possible.
+    """
+    if len(text) <= size:
+        return [text]
+    windows, start = [], 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            space = text.rfind(' ', start + overlap + 1, end)
+            if space != -1:
+                end = space
+        windows.append(text[start:end])
+        if end == len(text):
+            break
+        start = end - overlap
+    return windows
@@ -1,18 +1,16 @@
 import os, logging
 
+from typing import TYPE_CHECKING
+
 logger = logging.getLogger(__name__)
 
-from google.adk.agents.llm_agent import Agent
-from google.adk.tools.tool_context import ToolContext
-from google.adk.agents import LoopAgent, SequentialAgent, ParallelAgent
-from google.adk.models.google_llm import Gemini
-from google.adk.tools import FunctionTool
-from Data_Agent.data_agent import root_agent as data_agent
-from Business_Agent.business_agent import root_agent as business_agent
-from constants import MODEL, RETRY_CONFIG
+from constants import MODEL, MIN_LOOP_ITERATION_BUDGET
+
+if TYPE_CHECKING:
+    from google.adk.tools.tool_context import ToolContext
 
 
-def exit_loop(tool_context: ToolContext):
+def exit_loop(tool_context: "ToolContext"):
   """Call this function ONLY when no further changes are needed, signaling the iterative process should end."""
   logger.info(f"  [Tool Call] exit_loop triggered by {tool_context.agent_name}")
   tool_context.actions.escalate = True
@@ -20,16 +18,7 @@ def exit_loop(tool_context: ToolContext):
   return {}
 
 
-if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
-    raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
-else:
-    model = f"{MODEL}"
-
-
-aggregator_agent = Agent(
-    name="AggregatorAgent",
-    model=Gemini(model=model, retry_options=RETRY_CONFIG),
-    instruction="""
+AGGREGATOR_INSTRUCTION = """
     You MUST combine the FULL outputs of BOTH agents below.
     Do NOT proceed unless BOTH sections are present and complete.
 
@@ -46,28 +35,10 @@ aggregator_agent = Agent(
     - Explicit business rules and assumptions
 
     END OF EXECUTIVE SUMMARY
-    """,
-    output_key="executive_summary",
-)
-
-
-parallel_business_data_team = ParallelAgent(
-    name="ParallelBusinessDataTeam",
-    sub_agents=[data_agent, business_agent],
-)
+    """
 
 
-business_system_agent = SequentialAgent(
-    name="BusinessSystem",
-    sub_agents=[parallel_business_data_team, aggregator_agent],
-)
-
-
-validator_agent = Agent(
-    name="QA_Validator",
-    model=Gemini(model=model, retry_options=RETRY_CONFIG),
-    description="A validation agent responsible for approving or rejecting business logic based on coherence with collected data.",
-    instruction=f"""
+VALIDATOR_INSTRUCTION = f"""
     You are a QA Validator Agent acting as the final authority before automation.
 
     CRITICAL EXECUTION CONSTRAINTS:
@@ -97,16 +68,10 @@ validator_agent = Agent(
     You are evaluating the following EXECUTIVE SUMMARY ONLY:
 
     {{executive_summary}}
-    """,
-    output_key="qa_verdict"
-)
+    """
 
 
-refiner_agent = Agent(
-    name="Business_Refiner",
-    model=Gemini(model=model, retry_options=RETRY_CONFIG),
-    description="A refinement agent responsible for improving business logic based on QA feedback.",
-    instruction=f"""
+REFINER_INSTRUCTION = f"""
     Your task is to analyze the QA Validator critique.
 
     IMPORTANT:
@@ -133,21 +98,68 @@ refiner_agent = Agent(
     {{business_specifications}}
 
     Produce ONLY the refined version of the business rules.
-    """,
-    output_key="business_specifications",
-    tools=[FunctionTool(exit_loop)]
-)
-
-
-business_validator = LoopAgent(
-    name="Business_Validator_Agent",
-    sub_agents=[validator_agent, refiner_agent],
-    max_iterations=3,
-)
-
-
-root_agent = SequentialAgent(
-    name="BusinessPipeline",
-    description="A Business Validation agent responsible for Validation-Controlled Execution",
-    sub_agents=[business_system_agent, business_validator],
-)
\ No newline at end of file
+    """
+
+
+def create_agent():
+    """Build the business pipeline, with its Data and Business agents."""
+    if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
+        raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
+    else:
+        model = f"{MODEL}"
+
+    from google.adk.agents.llm_agent import Agent
+    from google.adk.agents import LoopAgent, SequentialAgent, ParallelAgent
+    from google.adk.models.google_llm import Gemini
+    from google.adk.tools import FunctionTool
+    from Data_Agent.data_agent import create_agent as create_data_agent
+    from Business_Agent.business_agent import create_agent as create_business_agent
+    from constants import RETRY_CONFIG
+    from deadline import stop_loop_on_low_budget
+
+    aggregator_agent = Agent(
+        name="AggregatorAgent",
+        model=Gemini(model=model, retry_options=RETRY_CONFIG),
+        instruction=AGGREGATOR_INSTRUCTION,
+        output_key="executive_summary",
+    )
+
+    parallel_business_data_team = ParallelAgent(
+        name="ParallelBusinessDataTeam",
+        sub_agents=[create_data_agent(), create_business_agent()],
+    )
+
+    business_system_agent = SequentialAgent(
+        name="BusinessSystem",
+        sub_agents=[parallel_business_data_team, aggregator_agent],
+    )
+
+    validator_agent = Agent(
+        name="QA_Validator",
+        model=Gemini(model=model, retry_options=RETRY_CONFIG),
+        description="A validation agent responsible for approving or rejecting business logic based on coherence with collected data.",
+        instruction=VALIDATOR_INSTRUCTION,
+        output_key="qa_verdict",
+        before_agent_callback=stop_loop_on_low_budget(MIN_LOOP_ITERATION_BUDGET),
+    )
+
+    refiner_agent = Agent(
+        name="Business_Refiner",
+        model=Gemini(model=model, retry_options=RETRY_CONFIG),
+        description="A refinement agent responsible for improving business logic based on QA feedback.",
+        instruction=REFINER_INSTRUCTION,
+        output_key="business_specifications",
+        tools=[FunctionTool(exit_loop)]
+    )
+
+    business_validator = LoopAgent(
+        name="Business_Validator_Agent",
+        sub_agents=[validator_agent, refiner_agent],
+        max_iterations=3,
+    )
+
+    return SequentialAgent(
+        name="BusinessPipeline",
+        description="A Business Validation agent responsible for Validation-Controlled Execution",
+        sub_agents=[business_system_agent, business_validator],
+    )
@@ -1,40 +1,86 @@
 import asyncio
+import atexit
 import os
 import json
-import subprocess
-import sys
-from pprint import pformat
-import traceback
-from typing import AsyncIterator
+from contextvars import ContextVar
+from functools import partial
+from typing import AsyncIterator, Awaitable
 
 import gradio as gr
 from google.genai import types
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
 from google.adk.events import Event
 from google.adk.sessions import InMemorySessionService
+from google.adk.artifacts import InMemoryArtifactService
 from google.adk.plugins.logging_plugin import LoggingPlugin
-
-from constants import APP_NAME
+from a2a.types import (
+    AgentCard,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+)
+
+from constants import (
+    APP_NAME,
+    GRADIO_CONCURRENCY_LIMIT,
+    POLICY_CACHE_SIZE,
+    POLICY_CACHE_TTL,
+    POLICY_MAX_INPUT_CHARS,
+    POLICY_WINDOW_CONCURRENCY,
+    POLICY_WINDOW_OVERLAP,
+    SPECULATIVE_POLICY_CHECK,
+)
+from deadline import DEADLINE_KEY, new_deadline
+from file_viewer import PAGE_SIZE, DirectoryWatcher, Page, follow, read_page, read_tail
+from output_moderation import ChunkedOutputCheck
+from chat_rendering import ChatTranscript
 from logs.core.loggers import workflow_log as logger
+from agent_supervisor import AgentSupervisor, remote_agents
+from Policy_Enforcer.rule_engine import RuleEngine
+from Policy_Enforcer.verdict_cache import VerdictCache
+from Policy_Enforcer.windows import split_windows
+from sqlite_storage import SqliteStorage, default_db_path, split_state_delta
+from request_config import REQUEST_CONFIG, RequestConfig
+from speculation import INPUT_CLEARED
 
 
-USER_ID = "default_user"
-SESSION_ID = "default_session"
+# User of the sessions of browsers without an authenticated user
+DEFAULT_USER_ID = "default_user"
 
 SESSION_SERVICE = InMemorySessionService()
+# Each policy check runs in a session of its own, deleted once it is done
+POLICY_SESSION_SERVICE = InMemorySessionService()
 
 COORDINATOR_AGENT_RUNNER: Runner | None = None
 POLICY_ENFORCER_AGENT_RUNNER: Runner | None = None
-
-
-async def read_file(path: str) -> str:
-    if not path or not os.path.exists(path):
-        return "File not found."
-    try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
-    except Exception as e:
-        return f"Error reading file: {e}"
+# Concurrent first requests must start the agents only once
+INIT_LOCK = asyncio.Lock()
+
+# Remote agents run as child processes of the app
+SUPERVISOR = AgentSupervisor(remote_agents(), logger)
+# Seconds the coordinator waits for the remote agents before resolving them
+AGENT_READY_TIMEOUT = 60
+# Seconds between two refreshes of the agent status panel
+AGENT_STATUS_INTERVAL = 2
+AGENT_STATE_ICONS = {"ready": "🟢", "starting": "🟡", "crashed": "🔴", "stopped": "⚪"}
+# Seconds between two checks for lines appended to a viewed file, and for
+# files added to or removed from the viewed directories
+FILE_FOLLOW_INTERVAL = 1
+FILE_LIST_INTERVAL = 5
+
+# Policy verdicts of already checked texts, persisted under STORAGE_DIR
+POLICY_RULES = RuleEngine()
+POLICY_CACHE_PATH = default_db_path("policy_verdicts")
+POLICY_CACHE = VerdictCache(
+    size=POLICY_CACHE_SIZE,
+    ttl=POLICY_CACHE_TTL,
+    storage=SqliteStorage(POLICY_CACHE_PATH, cache_size=0) if POLICY_CACHE_PATH else None,
+)
+
+# Queue of the chat request currently running the coordinator; remote agent
+# updates streamed by `CoordinatorAgent.send_message` are pushed onto it.
+A2A_UPDATES: ContextVar[asyncio.Queue | None] = ContextVar("a2a_updates", default=None)
 
 
 def parse_policy_response(raw: str) -> tuple[str, str]:
@@ -47,112 +93,420 @@ def parse_policy_response(raw: str) -> tuple[str, str]:
         return "safe", raw
 
 
+def forward_task_update(
+    update: Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent,
+    agent_card: AgentCard,
+) -> None:
+    """Task callback of the coordinator: hand streamed A2A updates to the UI."""
+    queue = A2A_UPDATES.get()
+    if queue is not None:
+        queue.put_nowait(("a2a", update, agent_card))
+
+
+async def stream_coordinator_events(
+    event_iterator: AsyncIterator[Event],
+    config: RequestConfig,
+    input_check: Awaitable[str] | None = None,
+    input_cleared: asyncio.Future | None = None,
+) -> AsyncIterator[tuple]:
+    """Interleave coordinator events with the A2A updates of its delegations.
+
+    Yields `("adk", event)` for coordinator events and
+    `("a2a", update, agent_card)` for remote agent updates, in arrival order.
+    The coordinator runs with the configuration of the request.
+
+    A speculative run also gets the policy check of its input, run
+    concurrently and yielded as `("verdict", task)` once done; the tools of
+    the coordinator wait for `input_cleared`.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    producers = 1
+
+    async def pump() -> None:
+        try:
+            async for event in event_iterator:
+                await queue.put(("adk", event))
+        finally:
+            await queue.put(None)
+
+    def report_verdict(task: asyncio.Task) -> None:
+        queue.put_nowait(("verdict", task))
+        queue.put_nowait(None)
+
+    token = A2A_UPDATES.set(queue)
+    config_token = REQUEST_CONFIG.set(config)
+    cleared_token = INPUT_CLEARED.set(input_cleared)
+    pump_task = asyncio.create_task(pump())
+    INPUT_CLEARED.reset(cleared_token)
+    REQUEST_CONFIG.reset(config_token)
+    A2A_UPDATES.reset(token)
+    check_task = None
+    if input_check is not None:
+        check_task = asyncio.create_task(input_check)
+        check_task.add_done_callback(report_verdict)
+        producers += 1
+    try:
+        while producers:
+            item = await queue.get()
+            if item is None:
+                producers -= 1
+                continue
+            yield item
+        await pump_task
+    finally:
+        pump_task.cancel()
+        if check_task is not None:
+            check_task.cancel()
+        if input_cleared is not None:
+            # Tools still held are cancelled with the run
+            input_cleared.cancel()
+
+
+async def cancel_remote_tasks(session_id: str) -> None:
+    from coordinator import coordinator
+    if coordinator is not None:
+        await coordinator.cancel_session_tasks(session_id)
+
+
+def browser_session(request: gr.Request | None) -> tuple[str, str]:
+    """User and session ids of the browser tab sending a request."""
+    if request is None:
+        return DEFAULT_USER_ID, "default_session"
+    return request.username or DEFAULT_USER_ID, request.session_hash
+
+
+async def get_or_create_session(user_id: str, session_id: str) -> None:
+    session = await SESSION_SERVICE.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    if session is None:
+        logger.info(f"Creating session {session_id} for {user_id}")
+        await SESSION_SERVICE.create_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
+        )
+
+
+async def fork_session(user_id: str, session_id: str) -> tuple[str, int]:
+    """Throwaway copy of a session, and its number of events.
+
+    A speculative turn runs on the copy, so that an unsafe input and the
+    events it caused never reach the session of the browser tab.
+    """
+    session = await SESSION_SERVICE.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    fork = await SESSION_SERVICE.create_session(
+        app_name=APP_NAME, user_id=user_id, state=split_state_delta(session.state)["session"]
+    )
+    for event in session.events:
+        # The state is already copied, the deltas must not be applied again
+        actions = event.actions.model_copy(update={"state_delta": {}})
+        await SESSION_SERVICE.append_event(
+            fork, event.model_copy(update={"actions": actions}, deep=True)
+        )
+    return fork.id, len(session.events)
+
+
+async def close_fork(user_id: str, session_id: str, fork_id: str, start: int, merge: bool) -> None:
+    """Delete a forked session, appending its new events to the original one if `merge`."""
+    if merge:
+        fork = await SESSION_SERVICE.get_session(
+            app_name=APP_NAME, user_id=user_id, session_id=fork_id
+        )
+        session = await SESSION_SERVICE.get_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
+        )
+        for event in fork.events[start:]:
+            await SESSION_SERVICE.append_event(session, event)
+        from coordinator import coordinator
+        if coordinator is not None:
+            coordinator.move_session_tasks(fork_id, session_id)
+    await SESSION_SERVICE.delete_session(
+        app_name=APP_NAME, user_id=user_id, session_id=fork_id
+    )
+
+
+async def end_browser_session(request: gr.Request) -> None:
+    """Drop the session of a closed browser tab and its remote tasks."""
+    user_id, session_id = browser_session(request)
+    await cancel_remote_tasks(session_id)
+    await SESSION_SERVICE.delete_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+
+
+def file_viewer_panel(watcher: DirectoryWatcher, label: str, lines: int) -> None:
+    """Paged viewer of the files of a directory, following the selected file.
+
+    Files are read by pages of PAGE_SIZE bytes, starting from their tail;
+    while the tail is shown, appended lines are added as they are written.
+    The file list is only sent again when the directory changed.
+    """
+    files = gr.Dropdown(watcher.files(), value=None, label=label, interactive=True)
+    view = gr.Textbox(label="Content", lines=lines, max_lines=lines, autoscroll=True)
+    position = gr.Markdown()
+    with gr.Row():
+        older = gr.Button("◀ Older", size="sm")
+        newer = gr.Button("Newer ▶", size="sm")
+        tail = gr.Button("⏬ Tail", size="sm")
+        following = gr.Checkbox(True, label="Follow")
+    page = gr.State(None)
+    version = gr.State(watcher.version)
+
+    def show(read_next) -> tuple:
+        try:
+            new_page: Page | None = read_next()
+        except OSError as e:
+            return None, f"Error reading file: {e}", ""
+        if new_page is None:
+            return gr.skip(), gr.skip(), gr.skip()
+        return (
+            new_page,
+            new_page.text,
+            f"Bytes {new_page.start:,} to {new_page.end:,} of {new_page.size:,}",
+        )
+
+    def open_file(name: str | None) -> tuple:
+        if not name:
+            return None, "", ""
+        return show(lambda: read_tail(os.path.join(watcher.root, name)))
+
+    def page_older(current: Page | None) -> tuple:
+        if current is None or current.start == 0:
+            return gr.skip(), gr.skip(), gr.skip()
+        return show(lambda: read_page(current.path, current.start - PAGE_SIZE))
+
+    def page_newer(current: Page | None) -> tuple:
+        if current is None or current.end >= current.size:
+            return gr.skip(), gr.skip(), gr.skip()
+        return show(lambda: read_page(current.path, current.end))
+
+    def page_tail(current: Page | None) -> tuple:
+        if current is None:
+            return gr.skip(), gr.skip(), gr.skip()
+        return show(lambda: read_tail(current.path))
+
+    def follow_file(current: Page | None, enabled: bool) -> tuple:
+        # Paging back through a file pauses following it
+        if not enabled or current is None or current.end < current.size:
+            return gr.skip(), gr.skip(), gr.skip()
+        return show(lambda: follow(current))
+
+    def refresh_files(known: int) -> tuple:
+        current = watcher.check()
+        if current == known:
+            return gr.skip(), gr.skip()
+        return gr.Dropdown(choices=watcher.files()), current
+
+    outputs = [page, view, position]
+    files.change(open_file, files, outputs)
+    older.click(page_older, page, outputs)
+    newer.click(page_newer, page, outputs)
+    tail.click(page_tail, page, outputs)
+    gr.Timer(FILE_FOLLOW_INTERVAL).tick(
+        follow_file, [page, following], outputs, show_progress="hidden"
+    )
+    gr.Timer(FILE_LIST_INTERVAL).tick(
+        refresh_files, version, [files, version], show_progress="hidden"
+    )
+
+
 # =============================
 # Agent Initialization
 # =============================
 
-async def init_agents():
-    logger.info(f"=================INITIALIZING COORDINATOR AGENT==============")
-    try:
-        logger.info(f"=================INITIALIZING Email Automation AGENT==============")
-        with open("logs/automation.log", "w") as log_file:
-            process = subprocess.Popen(
-                [sys.executable, "-m", "Automation_Agent"],
-                stdout=log_file,
-                stderr=log_file,
-                close_fds=True
-            )
-            ret = process.poll()  # or process.wait()
-            if ret is not None and ret != 0:
-                logger.error(f"Subprocess Automation_Agent exited with code {ret}")
-    except Exception as e:
-        logger.error(
-            f"""
-                STATUS: FAILURE TO START Email Automation AGENT
-                ERROR: {str(e)}
-                TRACEBACK:{traceback.format_exc()}
-                PYTHON_EXECUTABLE: {sys.executable}
-    """.strip()
-        )
-    await asyncio.sleep(5)
-    
-    try:
-        logger.info(f"=================INITIALIZING Business Validation AGENT==============")
-        with open("logs/validator.log", "w") as log_file:
-            process = subprocess.Popen(
-                [sys.executable, "-m", "Validator_Agent"],
-                stdout=log_file,
-                stderr=log_file,
-                close_fds=True
-            )
-            ret = process.poll()  # or process.wait()
-            if ret is not None and ret != 0:
-                logger.error(f"Subprocess Validator_Agent exited with code {ret}")
-    except Exception as e:
-        logger.error(
-            f"""
-                STATUS: FAILURE TO START Business Validation AGENT
-                ERROR: {str(e)}
-                TRACEBACK:{traceback.format_exc()}
-                PYTHON_EXECUTABLE: {sys.executable}
-    """.strip()
-        )
-    await asyncio.sleep(5)
+def agent_status_markdown() -> str:
+    lines = []
+    for agent in SUPERVISOR.status():
+        line = f"{AGENT_STATE_ICONS.get(agent['state'], '⚪')} **{agent['name']}**: {agent['state']}"
+        if agent["restarts"]:
+            line += f" ({agent['restarts']} restarts, last exit code {agent['last_exit_code']})"
+        lines.append(line)
+    return "\n\n".join(lines)
+
+
+async def warm_up() -> bool:
+    """Initialize the agents ahead of the first chat message.
 
+    Returns False while the remote agents are not ready, in which case
+    nothing is cached and the next call tries again.
+    """
+    async with INIT_LOCK:
+        if COORDINATOR_AGENT_RUNNER is None:
+            return await init_agents()
+        return True
+
+
+async def init_agents() -> bool:
+    logger.info(f"=================INITIALIZING COORDINATOR AGENT==============")
+    # The remote agents are started by the supervisor at launch; their agent
+    # cards are resolved once by the coordinator, so it is only built when
+    # they are served.
+    if not await asyncio.to_thread(SUPERVISOR.wait_ready, AGENT_READY_TIMEOUT):
+        logger.error(f"Remote agents not ready: {SUPERVISOR.status()}")
+        return False
     logger.info(f"=================A2A Agents Intialized==============")
-    await asyncio.sleep(5)
-    
-    from coordinator import initialized_coordinator_agent
-    from Policy_Enforcer.policy_enforcement_agent import root_agent as policy_enforcement_agent
+
+    await POLICY_CACHE.load()
+
+    from coordinator import close_coordinator_agent, initialized_coordinator_agent
+    from Policy_Enforcer.policy_enforcement_agent import create_agent as create_policy_agent
     global COORDINATOR_AGENT_RUNNER
     global POLICY_ENFORCER_AGENT_RUNNER
 
-    coordinator_agent = await initialized_coordinator_agent()
+    coordinator_agent = await initialized_coordinator_agent(
+        task_callback=forward_task_update
+    )
+    from coordinator import coordinator
+    if len(coordinator.cards) < len(SUPERVISOR.agents):
+        # A coordinator missing an agent would never delegate to it
+        logger.error(f"Agent cards not resolved, only got {list(coordinator.cards)}")
+        await close_coordinator_agent()
+        return False
     COORDINATOR_AGENT_RUNNER = Runner(
         agent=coordinator_agent,
         app_name=APP_NAME,
         session_service=SESSION_SERVICE,
+        artifact_service=InMemoryArtifactService(),
         plugins=[LoggingPlugin()]
     )
 
     POLICY_ENFORCER_AGENT_RUNNER = Runner(
-        agent=policy_enforcement_agent,
+        agent=create_policy_agent(),
         app_name=APP_NAME,
-        session_service=SESSION_SERVICE,
+        session_service=POLICY_SESSION_SERVICE,
         plugins=[LoggingPlugin()]
     )
+    return True
+
+async def known_policy_verdict(message: str, output: bool = False) -> str | None:
+    """Policy response for a message decided by the rules or cached, None otherwise.
+
+    Outputs are only checked against the unsafe rules: a paragraph of an
+    answer mentioning the World Cup is not off-topic chatter.
+    """
+    # Inputs the rules decide confidently never reach the model. Scanning a
+    # large message takes a noticeable time, off the event loop.
+    decision = await asyncio.to_thread(POLICY_RULES.check, message, not output)
+    if decision is not None:
+        logger.info(f"Policy verdict decided by the rules: {decision.reasoning}")
+        return decision.to_json()
+
+    cached = await POLICY_CACHE.get(message)
+    if cached is not None:
+        logger.info("Policy verdict served from the cache")
+    return cached
+
 
 async def get_response_from_policy_agent(
     message: str,
-    history: list[gr.ChatMessage],   
+    history: list[gr.ChatMessage],
+    user_id: str,
+    config: RequestConfig,
+    output: bool = False,
 )-> AsyncIterator[gr.ChatMessage]:
     """Get response from policy agent."""
- 
+    known = await known_policy_verdict(message, output)
+    if known is not None:
+        return known
+
+    # Long texts are checked by windows of bounded size, at most
+    # POLICY_WINDOW_CONCURRENCY at once; the first unsafe verdict is the
+    # verdict of the text.
+    windows = split_windows(message, POLICY_MAX_INPUT_CHARS, POLICY_WINDOW_OVERLAP)
+    if len(windows) == 1:
+        policy_response_json = await run_policy_check(message, user_id, config)
+    else:
+        logger.info(f"Checking {len(message)} characters in {len(windows)} windows")
+        slots = asyncio.Semaphore(POLICY_WINDOW_CONCURRENCY)
+
+        async def check_window(window: str) -> str | None:
+            async with slots:
+                return await run_policy_check(window, user_id, config)
+
+        responses = await asyncio.gather(*(check_window(window) for window in windows))
+        policy_response_json = next(
+            (
+                response for response in responses
+                if response and (get_policy_decision(response)[0] or "").lower() != "safe"
+            ),
+            responses[0],
+        )
+    if policy_response_json:
+        await cache_policy_verdict(message, policy_response_json)
+    return policy_response_json
+
+
+async def run_policy_check(text: str, user_id: str, config: RequestConfig) -> str | None:
+    """Run the policy agent on a text, in a fresh session.
+
+    The prompt is only made of the policy instruction and the text, so its
+    size does not grow with the conversation.
+    """
+    session = await POLICY_SESSION_SERVICE.create_session(app_name=APP_NAME, user_id=user_id)
     policy_event_iterator: AsyncIterator[Event] = POLICY_ENFORCER_AGENT_RUNNER.run_async(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
+        user_id=user_id,
+        session_id=session.id,
         new_message=types.Content(
-            role='user', parts=[types.Part(text=message)]
+            role='user', parts=[types.Part(text=text)]
         ),
     )
 
-    async for event in policy_event_iterator:
-        if event.is_final_response():
-            final_response_text = ''
-            if event.content and event.content.parts:
-                final_response_text = ''.join(
-                    [p.text for p in event.content.parts if p.text]
+    # The model of the policy agent uses the settings of the request
+    token = REQUEST_CONFIG.set(config)
+    try:
+        async for event in policy_event_iterator:
+            if event.usage_metadata:
+                logger.info(
+                    f"Policy check prompt of {event.usage_metadata.prompt_token_count} tokens "
+                    f"for {len(text)} characters"
                 )
-            elif event.actions and event.actions.escalate:
-                final_response_text = f"""
-                {
-                    "decision": "unsafe",
-                    "reasoning": "Agent escalated: {event.error_message or "No specific message."}"
-                }
-                """
-            if final_response_text:
-                return final_response_text
-        break
+            if event.is_final_response():
+                final_response_text = ''
+                if event.content and event.content.parts:
+                    final_response_text = ''.join(
+                        [p.text for p in event.content.parts if p.text]
+                    )
+                elif event.actions and event.actions.escalate:
+                    final_response_text = f"""
+                    {
+                        "decision": "unsafe",
+                        "reasoning": "Agent escalated: {event.error_message or "No specific message."}"
+                    }
+                    """
+                if final_response_text:
+                    return final_response_text
+            break
+    finally:
+        REQUEST_CONFIG.reset(token)
+        await POLICY_SESSION_SERVICE.delete_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session.id
+        )
+
+
+async def cache_policy_verdict(message: str, policy_response_json: str) -> None:
+    """Remember a well-formed verdict of the policy agent."""
+    try:
+        data = json.loads(policy_response_json.replace("```json", "").replace("```", "").strip())
+    except json.JSONDecodeError:
+        return
+    if isinstance(data, dict) and data.get("decision") in ("safe", "unsafe"):
+        await POLICY_CACHE.put(message, policy_response_json, data["decision"] == "safe")
+
+
+async def check_output(
+    text: str,
+    history: list[gr.ChatMessage],
+    user_id: str,
+    config: RequestConfig,
+) -> tuple[bool, str]:
+    """Whether a chunk of a response is safe, with the reasoning of the verdict."""
+    policy_response_json = await get_response_from_policy_agent(
+        text, history, user_id, config, output=True
+    )
+    decision,reasoning = get_policy_decision(policy_response_json)
+    logger.info(f"Response from Policy Enforcer {decision} and reasoning is {reasoning}")
+    return decision is not None and decision.lower() == "safe", reasoning
 
 
 def get_policy_decision(policy_response_json:str):
@@ -180,109 +534,180 @@ async def get_response_from_agent(
     model_name: str,
     api_key: str,
     timeout: str,
-) -> AsyncIterator[gr.ChatMessage]:
+    request: gr.Request,
+) -> AsyncIterator[gr.ChatMessage | list[gr.ChatMessage]]:
     """Get response from host agent."""    
     if not model_name or model_name.strip() == "":
         yield gr.ChatMessage(role="assistant", content="❌ Please enter a Model Name.")
         return
-    else:
-        os.environ["MODEL"] = model_name.strip()
     
     if not api_key or api_key.strip() == "":
         yield gr.ChatMessage(role="assistant", content="❌ Please enter an API key.")
         return
-    else:
-        os.environ["GOOGLE_API_KEY"] = api_key
             
     if not timeout or timeout <= 0:
         yield gr.ChatMessage(role="assistant", content="❌ Please enter a Timeout.")
         return
-    else:
-        os.environ["TIMEOUT"] = str(timeout)
+
+    # Settings of this request only, the environment is shared by all users
+    config = RequestConfig(model=model_name.strip(), api_key=api_key.strip(), timeout=timeout)
+    user_id, session_id = browser_session(request)
+    output_check: ChunkedOutputCheck | None = None
+    # Messages of this response, yielded whole as they are added
+    transcript = ChatTranscript()
+    # Session the coordinator runs on, a fork of the tab's one while speculating
+    fork: tuple[str, int] | None = None
+    input_cleared = coordinator_stream = None
 
     try:
-        if COORDINATOR_AGENT_RUNNER == None:
-            await init_agents()
-        
-        policy_response_json = await get_response_from_policy_agent(message, history)
-        decision,reasoning = get_policy_decision(policy_response_json)
-        logger.info(f"Response from Policy Enforcer {decision} and reasoning is {reasoning}")
-        if decision is not None and decision.lower() =="safe":
-            event_iterator: AsyncIterator[Event] = COORDINATOR_AGENT_RUNNER.run_async(
-                user_id=USER_ID,
-                session_id=SESSION_ID,
-                new_message=types.Content(
-                    role='user', parts=[types.Part(text=message)]
-                ),
-            )
-        else:
+        if not await warm_up():
             yield gr.ChatMessage(
-                role='assistant', content=reasoning
+                role="assistant",
+                content="❌ The remote agents are not ready yet, see the Agents panel. "
+                "They run with the GOOGLE_API_KEY of the server environment.",
             )
             return
+        await get_or_create_session(user_id, session_id)
+        check_response = partial(
+            check_output, history=history, user_id=user_id, config=config
+        )
 
-        async for event in event_iterator:
-            if event.content and event.content.parts:
-                for part in event.content.parts:
-                    if part.function_call:
-                        formatted_call = f'```python\n{pformat(part.function_call.model_dump(exclude_none=True), indent=2, width=80)}\n```'
-                        yield gr.ChatMessage(
-                            role='assistant',
-                            content=f'🛠️ **Tool Call: {part.function_call.name}**\n{formatted_call}',
-                        )
-                    elif part.function_response:
-                        response_content = part.function_response.response
-                        if (
-                            isinstance(response_content, dict)
-                            and 'response' in response_content
-                        ):
-                            formatted_response_data = response_content[
-                                'response'
-                            ]
-                        else:
-                            formatted_response_data = response_content
-                        formatted_response = f'```json\n{pformat(formatted_response_data, indent=2, width=80)}\n```'
-                        yield gr.ChatMessage(
-                            role='assistant',
-                            content=f'⚡ **Tool Response from {part.function_response.name}**\n{formatted_response}',
-                        )
-            if event.is_final_response():
-                final_response_text = ''
-                if event.content and event.content.parts:
-                    final_response_text = ''.join(
-                        [p.text for p in event.content.parts if p.text]
+        policy_response_json = await known_policy_verdict(message)
+        input_check = None
+        if policy_response_json is None and SPECULATIVE_POLICY_CHECK:
+            # The coordinator starts along with the policy check of the
+            # input; its output and tool calls are held until it is cleared.
+            input_check = get_response_from_policy_agent(
+                message, history, user_id, config
+            )
+            input_cleared = asyncio.get_running_loop().create_future()
+            fork = await fork_session(user_id, session_id)
+        else:
+            if policy_response_json is None:
+                policy_response_json = await get_response_from_policy_agent(
+                    message, history, user_id, config
+                )
+            decision,reasoning = get_policy_decision(policy_response_json)
+            logger.info(f"Response from Policy Enforcer {decision} and reasoning is {reasoning}")
+            if decision is None or decision.lower() != "safe":
+                yield gr.ChatMessage(
+                    role='assistant', content=reasoning
+                )
+                return
+
+        event_iterator: AsyncIterator[Event] = COORDINATOR_AGENT_RUNNER.run_async(
+            user_id=user_id,
+            session_id=fork[0] if fork else session_id,
+            new_message=types.Content(
+                role='user', parts=[types.Part(text=message)]
+            ),
+            state_delta={DEADLINE_KEY: new_deadline(timeout)},
+            # Text is streamed so that its policy check overlaps generation
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        )
+
+        held: list[tuple] | None = [] if input_check is not None else None
+        coordinator_stream = stream_coordinator_events(
+            event_iterator, config, input_check, input_cleared
+        )
+        async for item in coordinator_stream:
+            if item[0] == "verdict":
+                decision,reasoning = get_policy_decision(item[1].result())
+                logger.info(f"Response from Policy Enforcer {decision} and reasoning is {reasoning}")
+                if decision is None or decision.lower() != "safe":
+                    logger.info(f"Unsafe input, cancelling the coordinator after {len(held)} held events")
+                    await coordinator_stream.aclose()
+                    yield gr.ChatMessage(
+                        role='assistant', content=reasoning
                     )
-                elif event.actions and event.actions.escalate:
-                    final_response_text = f'Agent escalated: {event.error_message or "No specific message."}'
-                if final_response_text:
-                    policy_response_json = await get_response_from_policy_agent(final_response_text,history)
-                    decision,reasoning = get_policy_decision(policy_response_json)
-                    logger.info(f"Response from Policy Enforcer {decision} and reasoning is {reasoning}")
-                    if decision is not None and decision.lower() =="safe":
-                        yield gr.ChatMessage(
-                            role='assistant', content=final_response_text
-                        )
-                    else:
-                        yield gr.ChatMessage(
-                            role='assistant', content=reasoning
+                    return
+                input_cleared.set_result(None)
+                items, held = held, None
+            elif held is not None:
+                held.append(item)
+                continue
+            else:
+                items = [item]
+
+            for item in items:
+                if item[0] == "a2a":
+                    yield transcript.task_update(*item[1:])
+                    continue
+
+                event = item[1]
+                if event.partial:
+                    parts = event.content.parts if event.content and event.content.parts else []
+                    text = ''.join(p.text for p in parts if p.text)
+                    if text:
+                        if output_check is None:
+                            output_check = ChunkedOutputCheck(check_response)
+                        released = output_check.released
+                        output_check.feed(text)
+                        if output_check.released != released:
+                            yield transcript.answer(output_check.released)
+                    continue
+                if not event.is_final_response() and output_check is not None:
+                    # The text streamed so far preceded a tool call
+                    output_check.cancel()
+                    output_check = None
+
+                if event.content and event.content.parts:
+                    for part in event.content.parts:
+                        if part.function_call:
+                            yield transcript.tool_call(
+                                part.function_call.name, part.function_call.args or {}
+                            )
+                        elif part.function_response:
+                            yield transcript.tool_response(
+                                part.function_response.name, part.function_response.response
+                            )
+                if event.is_final_response():
+                    final_response_text = ''
+                    if event.content and event.content.parts:
+                        final_response_text = ''.join(
+                            [p.text for p in event.content.parts if p.text]
                         )
-                break
+                    elif event.actions and event.actions.escalate:
+                        final_response_text = f'Agent escalated: {event.error_message or "No specific message."}'
+                    if final_response_text:
+                        # Chunks are released as they clear, the response
+                        # is replaced by the reasoning of an unsafe one.
+                        if output_check is None or not final_response_text.startswith(output_check.text):
+                            if output_check is not None:
+                                output_check.cancel()
+                            output_check = ChunkedOutputCheck(check_response)
+                        output_check.finish(final_response_text)
+                        async for released in output_check.releases():
+                            yield transcript.answer(released)
+                        if output_check.rejection is not None:
+                            yield transcript.answer(output_check.rejection)
+                    return
+    except (asyncio.CancelledError, GeneratorExit):
+        # The user stopped the request or left the chat
+        logger.info('Request abandoned, cancelling the remote agent tasks')
+        await asyncio.shield(cancel_remote_tasks(session_id))
+        if fork is not None:
+            await asyncio.shield(cancel_remote_tasks(fork[0]))
+        raise
     except Exception as e:
         logger.error(f'Error in get_response_from_agent (Type: {type(e)}): {e}')
-        yield gr.ChatMessage(
-            role='assistant',
-            content='An error occurred while processing your request. Please check the server logs for details.',
+        yield transcript.answer(
+            'An error occurred while processing your request. Please check the server logs for details.'
         )
+    finally:
+        if output_check is not None:
+            output_check.cancel()
+        if fork is not None:
+            if coordinator_stream is not None:
+                await coordinator_stream.aclose()
+            # The turn only joins the conversation once its input is cleared
+            cleared = input_cleared.done() and not input_cleared.cancelled()
+            await asyncio.shield(close_fork(user_id, session_id, *fork, merge=cleared))
 
 
 async def main():
-    print('Creating ADK session...')
-    await SESSION_SERVICE.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-    )
-    print('ADK session created successfully.')
+    SUPERVISOR.start()
+    atexit.register(SUPERVISOR.stop)
 
     with gr.Blocks(title="BUSINESSFLOW", fill_height=True) as demo:
 
@@ -321,15 +746,10 @@ async def main():
                 
                 timeout = gr.Slider(600, 1200, value=900, label="Timeout (s)")
 
-                log_files = gr.FileExplorer(
-                    root_dir="logs",
-                    glob="*.log",
-                    label="Logs",
-                    height=150,
-                )
+                agent_status = gr.Markdown(agent_status_markdown(), label="Agents")
+                gr.Timer(AGENT_STATUS_INTERVAL).tick(agent_status_markdown, outputs=agent_status)
 
-                log_view = gr.Textbox(label="Log Content", lines=10)
-                log_files.change(read_file, log_files, log_view)
+                file_viewer_panel(DirectoryWatcher("logs", "*.log"), label="Logs", lines=10)
 
             with gr.Column(scale=4):
                 chat = gr.ChatInterface(
@@ -339,12 +759,14 @@ async def main():
                 chat.chatbot.height = 520
 
             with gr.Column(scale=2):
-                files = gr.FileExplorer(root_dir="./workspace", label="Workspace")
-                file_view = gr.Textbox(label="File Content", lines=12)
-                files.change(read_file, files, file_view)
+                file_viewer_panel(DirectoryWatcher("./workspace"), label="Workspace", lines=12)
+
+        # Each browser tab has its own session, dropped when the tab closes
+        demo.unload(end_browser_session)
+        demo.load(warm_up)
 
     print('Launching Gradio interface...')
-    demo.queue().launch(
+    demo.queue(default_concurrency_limit=GRADIO_CONCURRENCY_LIMIT).launch(
         server_name="0.0.0.0",
         server_port=8083,
         theme=gr.themes.Ocean(),
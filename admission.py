@@ -0,0 +1,106 @@
+import asyncio, heapq, itertools, time
+
+from dataclasses import dataclass, field
+
+
+# Message metadata key selecting the priority class of a request
+PRIORITY_KEY = 'priority'
+PRIORITIES = {'interactive': 0, 'batch': 1}
+DEFAULT_PRIORITY = 'interactive'
+# Initial estimate of a run duration, in seconds, before any run completed
+INITIAL_RUN_ESTIMATE = 60.0
+
+
+class AdmissionRejected(Exception):
+    """The request cannot be queued, retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f'At capacity, retry in about {retry_after:.0f}s.')
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class Ticket:
+    rank: int
+    sequence: int
+    priority: str = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+    future: asyncio.Future = field(compare=False, default_factory=lambda: asyncio.get_running_loop().create_future())
+
+    @property
+    def waited(self) -> float:
+        return time.monotonic() - self.enqueued_at
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded priority wait queue.
+
+    At most `max_concurrency` runs are active; the next `max_queue` requests
+    wait, interactive ones ahead of batch ones and FIFO within a class.
+    When the queue is full a request is rejected, unless it outranks a
+    queued one, which is rejected in its place.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        # Set while the server drains, new requests are then rejected
+        self.closed = False
+        self._queue: list[Ticket] = []
+        self._sequence = itertools.count()
+        # Moving average of the run durations, for retry hints
+        self._run_estimate = INITIAL_RUN_ESTIMATE
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based position of a waiting ticket in the queue."""
+        return sum(1 for queued in self._queue if queued < ticket) + 1
+
+    def retry_after(self) -> float:
+        return self._run_estimate * (self.depth + 1) / self.max_concurrency
+
+    def enqueue(self, priority: str = DEFAULT_PRIORITY) -> Ticket:
+        """Admit a request or queue it, raise AdmissionRejected when full.
+
+        The returned ticket's future is resolved once the request may run;
+        `release` must then be called when the run ends.
+        """
+        priority = priority if priority in PRIORITIES else DEFAULT_PRIORITY
+        if self.closed:
+            raise AdmissionRejected(self.retry_after())
+        ticket = Ticket(PRIORITIES[priority], next(self._sequence), priority)
+        if self.active < self.max_concurrency and not self._queue:
+            self.active += 1
+            ticket.future.set_result(None)
+            return ticket
+
+        if len(self._queue) >= self.max_queue:
+            worst = max(self._queue)
+            if worst.rank <= ticket.rank:
+                raise AdmissionRejected(self.retry_after())
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            worst.future.set_exception(AdmissionRejected(self.retry_after()))
+        heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def withdraw(self, ticket: Ticket) -> None:
+        """Remove a ticket whose request was abandoned while waiting."""
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+        elif ticket.future.done() and not ticket.future.exception():
+            self.release()
+
+    def release(self, duration: float | None = None) -> None:
+        if duration is not None:
+            self._run_estimate = 0.8 * self._run_estimate + 0.2 * duration
+        self.active -= 1
+        while self._queue and self.active < self.max_concurrency:
+            ticket = heapq.heappop(self._queue)
+            self.active += 1
+            ticket.future.set_result(None)
@@ -1,9 +1,12 @@
-import logging
+import asyncio, base64, json, logging, time, uuid
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import (
+    DataPart,
+    FilePart,
+    FileWithUri,
     Part,
     TaskState,
     TextPart,
@@ -12,11 +15,62 @@ from google.adk.plugins.logging_plugin import (
     LoggingPlugin,
 )
 from a2a.utils import new_agent_text_message, new_task
+from admission import DEFAULT_PRIORITY, PRIORITY_KEY, AdmissionController, AdmissionRejected
+from artifact_store import WorkspaceArtifactStore
+from constants import (
+    AGENT_MAX_CONCURRENCY,
+    AGENT_MAX_QUEUE,
+    PROGRESS_PREVIEW_CHARS,
+    SHUTDOWN_DRAIN_TIMEOUT,
+)
+from deadline import DEADLINE_KEY, PARTIAL_KEY, remaining_budget
+from refinement import REFINE_KEY
 from google.adk.artifacts import InMemoryArtifactService
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
+from sqlite_storage import (
+    SqliteArtifactService,
+    SqliteMemoryService,
+    SqliteSessionService,
+    SqliteStorage,
+)
+
+
+# Seconds between two status updates of a queued request
+QUEUE_STATUS_INTERVAL = 5
+DRAIN_POLL_INTERVAL = 1
+# Seconds the runs cancelled by a drain get to record their final state
+DRAIN_CANCEL_TIMEOUT = 5
+# Storage namespace of the cancel requests received by another worker, and
+# seconds between two checks of the owning worker
+CANCEL_NAMESPACE = 'cancel'
+CANCEL_POLL_INTERVAL = 1
+
+
+def collect_output_keys(agent) -> list[str]:
+    """Output keys of an agent and all of its sub-agents, in tree order."""
+    keys = [agent.output_key] if getattr(agent, "output_key", None) else []
+    for sub_agent in agent.sub_agents:
+        keys.extend(collect_output_keys(sub_agent))
+    return list(dict.fromkeys(keys))
+
+
+def convert_a2a_part(part: Part) -> types.Part:
+    """Convert an incoming A2A part to a GenAI part."""
+    part = part.root
+    if isinstance(part, TextPart):
+        return types.Part.from_text(text=part.text)
+    if isinstance(part, DataPart):
+        return types.Part.from_text(text=json.dumps(part.data))
+    if isinstance(part, FilePart):
+        if isinstance(part.file, FileWithUri):
+            return types.Part.from_uri(file_uri=part.file.uri, mime_type=part.file.mime_type)
+        return types.Part.from_bytes(
+            data=base64.b64decode(part.file.bytes), mime_type=part.file.mime_type
+        )
+    raise ValueError(f"Unsupported part type: {part.kind}")
 
 
 class ADKAgentExecutor(AgentExecutor):
@@ -27,6 +81,11 @@ class ADKAgentExecutor(AgentExecutor):
         status_message="Processing request...",
         artifact_name="response",
         logger=logging.getLogger(__name__),
+        inline_keys=None,
+        artifact_store=None,
+        storage=None,
+        max_concurrency=AGENT_MAX_CONCURRENCY,
+        max_queue=AGENT_MAX_QUEUE,
     ):
         """Initialize a generic ADK agent executor.
 
@@ -34,17 +93,38 @@ class ADKAgentExecutor(AgentExecutor):
             agent: The ADK agent instance
             status_message: Message to display while processing
             artifact_name: Name for the response artifact
+            inline_keys: Output keys returned inline to the caller; every
+                other output key is stored as a shared artifact and
+                returned by reference only
+            artifact_store: Store of the shared artifacts
+            storage: SqliteStorage persisting the sessions, artifacts and
+                memory of the agent, in memory when None
+            max_concurrency: Number of agent runs executed at once
+            max_queue: Number of requests waiting for a run slot before
+                new ones are rejected
         """
         self.app_name = app_name
         self.agent = agent
         self.status_message = status_message
         self.artifact_name = artifact_name
+        self.inline_keys = inline_keys or []
+        self.output_keys = collect_output_keys(agent)
+        # Agent runs in progress, by A2A task id, so that they can be cancelled
+        self._running: dict[str, asyncio.Task] = {}
+        # Runs cancelled by a drain, until they recorded their final state
+        self._interrupted: set[str] = set()
+        # Runs cancelled by another worker, and the tasks watching for it
+        self._cancelled_elsewhere: set[str] = set()
+        self._cancel_watchers: dict[str, asyncio.Task] = {}
+        self.admission = AdmissionController(max_concurrency, max_queue)
+        self.artifact_store: WorkspaceArtifactStore | None = artifact_store
+        self.storage: SqliteStorage | None = storage
         self.runner = Runner(
             app_name=agent.name,
             agent=agent,
-            artifact_service=InMemoryArtifactService(),
-            session_service=InMemorySessionService(),
-            memory_service=InMemoryMemoryService(),
+            artifact_service=SqliteArtifactService(storage) if storage else InMemoryArtifactService(),
+            session_service=SqliteSessionService(storage) if storage else InMemorySessionService(),
+            memory_service=SqliteMemoryService(storage) if storage else InMemoryMemoryService(),
             plugins=[LoggingPlugin()]
         )
         self.logger = logger
@@ -54,17 +134,102 @@ class ADKAgentExecutor(AgentExecutor):
         context: RequestContext,
         event_queue: EventQueue,
     ) -> None:
-        """Cancel the execution of a specific task."""
-        raise NotImplementedError(
-            "Cancellation is not implemented for ADKAgentExecutor."
+        """Cancel the execution of a specific task.
+
+        The running agent is cancelled, which also aborts its in-flight
+        LLM and MCP tool calls, and the task is marked as canceled. When the
+        run belongs to another worker, a cancel request is left in the
+        shared storage for that worker to pick up.
+        """
+        running = self._running.pop(context.task_id, None)
+        if running is not None:
+            self.logger.info(f"Cancelling task {context.task_id}")
+            running.cancel()
+        elif self.storage is not None and self.storage.shared:
+            self.logger.info(f"Requesting the cancellation of task {context.task_id} from the other workers")
+            await self.storage.put(CANCEL_NAMESPACE, context.task_id, True)
+            await self.storage.flush()
+
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.cancel(
+            new_agent_text_message("Task canceled.", context.context_id, context.task_id)
         )
 
+    async def drain(self, timeout: float = SHUTDOWN_DRAIN_TIMEOUT) -> None:
+        """Stop admitting requests and let the admitted ones finish.
+
+        Called on server shutdown; runs still in progress after `timeout`
+        seconds are cancelled and their tasks marked as failed, so that the
+        shared task store does not report them as working forever.
+        """
+        self.admission.closed = True
+        deadline = time.monotonic() + timeout
+        while (self.admission.active or self.admission.depth) and time.monotonic() < deadline:
+            await asyncio.sleep(DRAIN_POLL_INTERVAL)
+        for task_id, run in list(self._running.items()):
+            self.logger.warning(f"Cancelling task {task_id} still running after the drain timeout")
+            self._interrupted.add(task_id)
+            run.cancel()
+        deadline = time.monotonic() + DRAIN_CANCEL_TIMEOUT
+        while self._interrupted and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+    def _track(self, task_id: str, run: asyncio.Task) -> None:
+        """Register a run so that it can be cancelled, from this worker or another one."""
+        self._running[task_id] = run
+        if self.storage is not None and self.storage.shared:
+            self._cancel_watchers[task_id] = asyncio.create_task(self._watch_cancel(task_id, run))
+
+    def _untrack(self, task_id: str) -> None:
+        self._running.pop(task_id, None)
+        watcher = self._cancel_watchers.pop(task_id, None)
+        if watcher is not None:
+            watcher.cancel()
+
+    async def _watch_cancel(self, task_id: str, run: asyncio.Task) -> None:
+        """Cancel the run once another worker received a cancel request for its task."""
+        while not run.done():
+            await asyncio.sleep(CANCEL_POLL_INTERVAL)
+            if await self.storage.get(CANCEL_NAMESPACE, task_id):
+                self.logger.info(f"Cancelling task {task_id}, cancelled from another worker")
+                self._cancelled_elsewhere.add(task_id)
+                run.cancel()
+                return
+
+    async def _record_cancellation(self, updater, task) -> bool:
+        """Record the final state of a run cancelled by a drain or another worker.
+
+        Returns False for a run cancelled by `cancel` in this worker, whose
+        state is already recorded.
+        """
+        if task.id in self._interrupted:
+            await self._fail_interrupted(updater, task)
+            return True
+        if task.id in self._cancelled_elsewhere:
+            self._cancelled_elsewhere.discard(task.id)
+            await self.storage.delete(CANCEL_NAMESPACE, task.id)
+            await updater.cancel(new_agent_text_message("Task canceled.", task.context_id, task.id))
+            return True
+        return False
+
+    async def _fail_interrupted(self, updater, task) -> None:
+        """Record the final state of a run cancelled by a drain."""
+        try:
+            await updater.update_status(
+                TaskState.failed,
+                new_agent_text_message(
+                    "The agent server shut down before the task finished.", task.context_id, task.id
+                ),
+                final=True,
+            )
+        finally:
+            self._interrupted.discard(task.id)
+
     async def execute(
         self,
         context: RequestContext,
         event_queue: EventQueue,
     ) -> None:
-        query = context.get_user_input()
         task = context.current_task or new_task(context.message)
         await event_queue.enqueue_event(task)
 
@@ -74,55 +239,273 @@ class ADKAgentExecutor(AgentExecutor):
         else:
             user_id = "a2a_user"
 
+        priority = ((context.message.metadata if context.message else None) or {}).get(
+            PRIORITY_KEY, DEFAULT_PRIORITY
+        )
+        try:
+            waited = await self._wait_for_admission(updater, task, priority)
+        except AdmissionRejected as e:
+            await self._reject(updater, task, e)
+            return
+
+        started = time.monotonic()
         try:
             # Update status with custom message
+            status_message = self.status_message
+            if waited >= 1:
+                status_message += f" (waited {waited:.0f}s in queue)"
             await updater.update_status(
                 TaskState.working,
-                new_agent_text_message(self.status_message, task.context_id, task.id),
+                new_agent_text_message(status_message, task.context_id, task.id),
             )
 
-            # Process with ADK agent
-            session = await self.runner.session_service.create_session(
-                app_name=self.agent.name,
-                user_id=user_id,
-                state={},
-                session_id=task.context_id,
-            )
+            # Process with ADK agent, continuing the session of the context
+            session = await self.get_or_create_session(user_id, task.context_id)
 
             content = types.Content(
-                role="user", parts=[types.Part.from_text(text=query)]
+                role="user",
+                parts=[convert_a2a_part(part) for part in context.message.parts],
             )
 
-            response_text = ""
-            async for event in self.runner.run_async(
-                user_id=user_id, session_id=session.id, new_message=content
-            ):  
-                if event.is_final_response():
-                    if event.content and event.content.parts:
-                        response_text = ''.join(
-                        [p.text for p in event.content.parts if p.text]
-                    )
-                        self.logger.info(f'🛠️ **Response from LLM Call: {response_text}')
-                else:
-                    if event.content and event.content.parts:
-                        for part in event.content.parts:
-                            if hasattr(part, "function_call") and part.function_call is not None:
-                                # Log or handle function calls if needed
-                                self.logger.info(f'🛠️ **Tool Call: {part.function_call.name}')
-                            elif hasattr(part, "function_response") and part.function_response is not None:
-                                self.logger.info(f'⚡ **Tool Response: {part.function_response.response}')           
+            # Deadline of the user request, propagated by the coordinator
+            metadata = context.message.metadata or {}
+            deadline = metadata.get(DEADLINE_KEY)
+            state_delta = self.load_artifact_refs(context)
+            state_delta[REFINE_KEY] = bool(metadata.get(REFINE_KEY))
+            state_delta[DEADLINE_KEY] = deadline
+            response = {"text": ""}
+            deadline_reached = False
+            run = asyncio.create_task(
+                self._consume_events(
+                    updater, task, user_id, session.id, content, state_delta, response
+                )
+            )
+            self._track(task.id, run)
+            try:
+                await asyncio.wait_for(run, timeout=remaining_budget(deadline))
+            except asyncio.TimeoutError:
+                deadline_reached = True
+                self.logger.warning(f"Deadline reached for task {task.id}, returning partial results")
+            except asyncio.CancelledError:
+                if not await self._record_cancellation(updater, task):
+                    raise
+                return
+            finally:
+                self._untrack(task.id)
+            response_text = response["text"]
 
             # Add response as artifact with custom name
             await updater.add_artifact(
                 [Part(root=TextPart(text=response_text))],
                 name=self.artifact_name,
             )
+            await self.publish_artifacts(updater, user_id, session.id, task.context_id)
 
-            await updater.complete()
+            if deadline_reached:
+                await updater.update_status(
+                    TaskState.completed,
+                    new_agent_text_message(
+                        "Deadline reached before the pipeline finished, results are partial.",
+                        task.context_id,
+                        task.id,
+                    ),
+                    final=True,
+                    metadata={PARTIAL_KEY: True},
+                )
+            else:
+                await updater.complete()
 
         except Exception as e:
             await updater.update_status(
                 TaskState.failed,
                 new_agent_text_message(f"Error: {e!s}", task.context_id, task.id),
                 final=True,
-            )
\ No newline at end of file
+            )
+        finally:
+            self.admission.release(time.monotonic() - started)
+
+    async def _reject(self, updater, task, error: AdmissionRejected) -> None:
+        self.logger.warning(f"Rejected task {task.id}: {error}")
+        await updater.update_status(
+            TaskState.rejected,
+            new_agent_text_message(str(error), task.context_id, task.id),
+            final=True,
+            metadata={"retry_after": round(error.retry_after)},
+        )
+
+    async def _wait_for_admission(self, updater, task, priority) -> float:
+        """Wait for a run slot, reporting the queue position meanwhile.
+
+        Returns the seconds spent in the queue; raises AdmissionRejected
+        when the queue is full.
+        """
+        ticket = self.admission.enqueue(priority)
+        try:
+            while not ticket.future.done():
+                await self._update_progress_status(
+                    updater,
+                    task,
+                    f"Queued as {ticket.priority}: position {self.admission.position(ticket)} "
+                    f"of {self.admission.depth}, waited {ticket.waited:.0f}s",
+                )
+                await asyncio.wait({ticket.future}, timeout=QUEUE_STATUS_INTERVAL)
+            ticket.future.result()
+        except asyncio.CancelledError:
+            self.admission.withdraw(ticket)
+            raise
+        return ticket.waited
+
+    async def _consume_events(
+        self, updater, task, user_id, session_id, content, state_delta, response
+    ):
+        """Run the agent, publishing its progress as it happens.
+
+        Tool calls and responses are sent as working status updates, and each
+        output key written by a sub-agent is appended as a chunk of a progress
+        artifact: a bounded preview for the `inline_keys`, only its name for
+        the others, which are published by reference at the end of the run.
+        The progress artifact is closed even when the run is cut short. The
+        latest final response is kept in `response`.
+        """
+        progress_id = uuid.uuid4().hex
+        streamed_keys = []
+        try:
+            async for event in self.runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=content,
+                state_delta=state_delta,
+            ):
+                if event.is_final_response():
+                    if event.content and event.content.parts:
+                        response["text"] = ''.join(
+                            [p.text for p in event.content.parts if p.text]
+                        )
+                        self.logger.info(f'🛠️ **Response from LLM Call: {response["text"]}')
+                else:
+                    if event.content and event.content.parts:
+                        for part in event.content.parts:
+                            if hasattr(part, "function_call") and part.function_call is not None:
+                                self.logger.info(f'🛠️ **Tool Call: {part.function_call.name}')
+                                await self._update_progress_status(
+                                    updater, task, f"{event.author} is calling `{part.function_call.name}`"
+                                )
+                            elif hasattr(part, "function_response") and part.function_response is not None:
+                                self.logger.info(f'⚡ **Tool Response: {part.function_response.response}')
+                                await self._update_progress_status(
+                                    updater, task, f"{event.author} received the result of `{part.function_response.name}`"
+                                )
+
+                for key, value in (event.actions.state_delta or {}).items():
+                    if key not in self.output_keys or value is None or value == "":
+                        continue
+                    await updater.add_artifact(
+                        [Part(root=TextPart(text=self._progress_chunk(key, value)))],
+                        artifact_id=progress_id,
+                        name=f"{self.artifact_name}_progress",
+                        metadata={"progress": True},
+                        append=bool(streamed_keys),
+                        last_chunk=False,
+                    )
+                    streamed_keys.append(key)
+        finally:
+            if streamed_keys:
+                await updater.add_artifact(
+                    [Part(root=DataPart(data={"streamed_keys": streamed_keys}))],
+                    artifact_id=progress_id,
+                    name=f"{self.artifact_name}_progress",
+                    metadata={"progress": True},
+                    append=True,
+                    last_chunk=True,
+                )
+
+    def _progress_chunk(self, key, value) -> str:
+        """Progress text of an output key, never its full value."""
+        if key not in self.inline_keys:
+            return f"### {key}\nWritten, published by reference when the run ends."
+        text = value if isinstance(value, str) else json.dumps(value)
+        if len(text) > PROGRESS_PREVIEW_CHARS:
+            text = text[:PROGRESS_PREVIEW_CHARS] + f"… ({len(text)} characters)"
+        return f"### {key}\n{text}"
+
+    async def _update_progress_status(self, updater, task, text):
+        await updater.update_status(
+            TaskState.working,
+            new_agent_text_message(text, task.context_id, task.id),
+        )
+
+    async def get_or_create_session(self, user_id, session_id):
+        """The session of an A2A context, created on its first message.
+
+        Follow-up messages on the same context continue the session, so
+        the outputs of previous turns remain available in its state.
+        """
+        session = await self.runner.session_service.get_session(
+            app_name=self.agent.name, user_id=user_id, session_id=session_id
+        )
+        if session is not None:
+            self.logger.info(f"Continuing session {session_id} ({len(session.events)} events)")
+            return session
+        return await self.runner.session_service.create_session(
+            app_name=self.agent.name, user_id=user_id, state={}, session_id=session_id
+        )
+
+    def load_artifact_refs(self, context: RequestContext) -> dict:
+        """State delta holding the artifacts referenced by the message.
+
+        Each reference in the `artifact_refs` message metadata is resolved
+        from the shared store and injected under its name, so instructions
+        can use it like any other state value.
+        """
+        state = {}
+        metadata = (context.message.metadata if context.message else None) or {}
+        if not self.artifact_store or not metadata.get("artifact_refs"):
+            return state
+        for reference in metadata["artifact_refs"]:
+            content = self.artifact_store.load(reference)
+            if content is None:
+                self.logger.warning(f"Artifact {reference} not found in the store")
+                continue
+            state[reference["name"]] = content
+        return state
+
+    async def publish_artifacts(self, updater, user_id, session_id, context_id):
+        """Emit the agents' output keys as typed data.
+
+        Only the `inline_keys` are returned inline, in a single data
+        artifact. The other output keys, e.g. raw retrieved documents, are
+        written to the shared artifact store and emitted as references, so
+        their content never reaches the caller's prompt; without a store
+        they are not emitted at all.
+        """
+        session = await self.runner.session_service.get_session(
+            app_name=self.agent.name, user_id=user_id, session_id=session_id
+        )
+        if not session:
+            return
+
+        data = {}
+        for key in self.output_keys:
+            value = session.state.get(key)
+            if value is None or value == "":
+                continue
+            if key in self.inline_keys:
+                data[key] = value
+                continue
+            if not self.artifact_store:
+                self.logger.info(f"Output key {key} kept in the session, no artifact store to publish it")
+                continue
+            content = value if isinstance(value, str) else json.dumps(value)
+            reference = self.artifact_store.save(key, content, context_id)
+            self.logger.info(f"Published artifact {reference}")
+            await updater.add_artifact(
+                [Part(root=DataPart(data=reference))],
+                name=key,
+                metadata={"artifact_ref": reference},
+            )
+
+        if data:
+            await updater.add_artifact(
+                [Part(root=DataPart(data=data))],
+                name=f"{self.artifact_name}_data",
+            )
@@ -0,0 +1,173 @@
+import subprocess, sys, threading, time
+
+from dataclasses import dataclass, field
+
+import httpx
+
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+from constants import EMIAL_AUTOMATION_AGENT_URLS, VALIDATOR_AGENT_URLS
+
+
+# Seconds between two readiness probes of a starting agent, and between two
+# liveness checks of a ready one
+PROBE_INTERVAL = 0.5
+MONITOR_INTERVAL = 1
+PROBE_TIMEOUT = 2
+# Restart backoff: doubled on each crash up to the maximum, and reset once an
+# agent stayed up for STABLE_AFTER seconds
+INITIAL_BACKOFF = 1
+MAX_BACKOFF = 60
+STABLE_AFTER = 60
+
+
+@dataclass
+class AgentProcess:
+    """A remote agent server run as a child process."""
+
+    name: str
+    module: str
+    url: str
+    log_path: str
+    state: str = 'stopped'
+    restarts: int = 0
+    last_exit_code: int | None = None
+    process: subprocess.Popen | None = field(default=None, repr=False)
+
+
+def remote_agents() -> list[AgentProcess]:
+    """Remote agents of the coordinator, served on the first URL configured for them."""
+    return [
+        AgentProcess(
+            name='Email Automation Agent',
+            module='Automation_Agent',
+            url=(EMIAL_AUTOMATION_AGENT_URLS or ['http://localhost:8003'])[0],
+            log_path='logs/automation.log',
+        ),
+        AgentProcess(
+            name='Business Validator Agent',
+            module='Validator_Agent',
+            url=(VALIDATOR_AGENT_URLS or ['http://localhost:8002'])[0],
+            log_path='logs/validator.log',
+        ),
+    ]
+
+
+class AgentSupervisor:
+    """Starts the remote agents, probes their readiness and restarts them.
+
+    Each agent is supervised by its own thread, independently of any event
+    loop: the process is started, marked ready once its agent card is
+    served, and restarted with exponential backoff when it exits.
+    """
+
+    def __init__(self, agents: list[AgentProcess], logger, environment: dict[str, str] | None = None):
+        self.agents = agents
+        self.logger = logger
+        self._environment = environment
+        self._changed = threading.Condition()
+        self._stopping = False
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for agent in self.agents:
+            thread = threading.Thread(
+                target=self._supervise, args=(agent,), name=f'supervise-{agent.module}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        with self._changed:
+            self._stopping = True
+            self._changed.notify_all()
+        for agent in self.agents:
+            if agent.process is not None and agent.process.poll() is None:
+                agent.process.terminate()
+
+    def ready(self) -> bool:
+        return all(agent.state == 'ready' for agent in self.agents)
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Block until every agent is ready, False on timeout or once one crashed.
+
+        An agent that crashes on start, e.g. for lack of an API key, would
+        not be ready before the timeout either.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while not self.ready():
+                if any(agent.state == 'crashed' for agent in self.agents):
+                    return False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+    def status(self) -> list[dict]:
+        return [
+            {
+                'name': agent.name,
+                'url': agent.url,
+                'state': agent.state,
+                'restarts': agent.restarts,
+                'last_exit_code': agent.last_exit_code,
+            }
+            for agent in self.agents
+        ]
+
+    def _set_state(self, agent: AgentProcess, state: str) -> None:
+        with self._changed:
+            agent.state = state
+            self._changed.notify_all()
+
+    def _spawn(self, agent: AgentProcess) -> subprocess.Popen:
+        with open(agent.log_path, 'a' if agent.restarts else 'w') as log_file:
+            return subprocess.Popen(
+                [sys.executable, '-m', agent.module],
+                stdout=log_file,
+                stderr=log_file,
+                close_fds=True,
+                env=self._environment,
+            )
+
+    def _probe(self, agent: AgentProcess) -> bool:
+        try:
+            response = httpx.get(f'{agent.url}{AGENT_CARD_WELL_KNOWN_PATH}', timeout=PROBE_TIMEOUT)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def _supervise(self, agent: AgentProcess) -> None:
+        backoff = INITIAL_BACKOFF
+        while not self._stopping:
+            self._set_state(agent, 'starting')
+            started = time.monotonic()
+            try:
+                agent.process = self._spawn(agent)
+                self.logger.info(f'Started {agent.name} (attempt {agent.restarts + 1})')
+            except Exception as e:
+                self.logger.error(f'Failed to start {agent.name}: {e}')
+                agent.process = None
+
+            while agent.process is not None and agent.process.poll() is None and not self._stopping:
+                if agent.state == 'starting' and self._probe(agent):
+                    self.logger.info(f'{agent.name} ready after {time.monotonic() - started:.1f}s')
+                    self._set_state(agent, 'ready')
+                time.sleep(PROBE_INTERVAL if agent.state == 'starting' else MONITOR_INTERVAL)
+            if self._stopping:
+                break
+
+            agent.last_exit_code = agent.process.returncode if agent.process else None
+            agent.restarts += 1
+            if time.monotonic() - started > STABLE_AFTER:
+                backoff = INITIAL_BACKOFF
+            self.logger.error(
+                f'{agent.name} exited with code {agent.last_exit_code}, restarting in {backoff}s'
+            )
+            self._set_state(agent, 'crashed')
+            with self._changed:
+                self._changed.wait_for(lambda: self._stopping, timeout=backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+        self._set_state(agent, 'stopped')
@@ -0,0 +1,71 @@
+import os, shutil, time, uuid
+
+from pathlib import Path
+from typing import Any
+
+from constants import STORAGE_TTL
+
+
+ARTIFACTS_FOLDER = 'artifacts'
+# Expired artifacts are deleted at most this often, in seconds
+EVICTION_INTERVAL = 60
+
+
+class WorkspaceArtifactStore:
+    """Artifacts shared by reference between agent processes.
+
+    Large agent outputs are written once under `<workspace>/artifacts` and
+    handed around as small references, so that messages and coordinator
+    prompts carry ids and paths instead of the content itself. Like the
+    SQLite rows of the agent servers, an artifact expires `ttl` seconds
+    after it was written; expired artifacts are deleted as new ones are saved.
+    """
+
+    def __init__(self, workspace_dir: str, ttl: float | None = STORAGE_TTL):
+        self.root = Path(workspace_dir).resolve() / ARTIFACTS_FOLDER
+        self.ttl = ttl
+        self._last_eviction = 0.0
+
+    def save(self, name: str, content: str, context_id: str | None = None) -> dict[str, Any]:
+        """Persist an artifact and return its reference."""
+        self._evict()
+        artifact_id = uuid.uuid4().hex
+        folder = self.root / artifact_id
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f'{name}.txt'
+        path.write_text(content, encoding='utf-8')
+        return {
+            'artifact_id': artifact_id,
+            'name': name,
+            'path': str(path.relative_to(self.root.parent)),
+            'size': len(content),
+            'context_id': context_id,
+        }
+
+    def load(self, reference: dict[str, Any]) -> str | None:
+        """Read the content behind a reference, None if it cannot be found."""
+        artifact_id = str(reference.get('artifact_id', ''))
+        name = os.path.basename(str(reference.get('name', '')))
+        if not artifact_id.isalnum() or not name:
+            return None
+        path = self.root / artifact_id / f'{name}.txt'
+        if not path.is_file() or self._expired(path.parent):
+            return None
+        return path.read_text(encoding='utf-8')
+
+    def _expired(self, folder: Path) -> bool:
+        try:
+            return bool(self.ttl) and time.time() - folder.stat().st_mtime > self.ttl
+        except OSError:
+            return True
+
+    def _evict(self) -> None:
+        now = time.time()
+        if not self.ttl or now - self._last_eviction < EVICTION_INTERVAL:
+            return
+        self._last_eviction = now
+        if not self.root.is_dir():
+            return
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and self._expired(Path(entry.path)):
+                shutil.rmtree(entry.path, ignore_errors=True)
@@ -0,0 +1,268 @@
+import asyncio, json, os, time, uuid
+
+import click
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from admission import PRIORITY_KEY
+from agent_supervisor import AgentSupervisor, remote_agents
+from constants import APP_NAME
+from deadline import DEADLINE_KEY, new_deadline
+from logs.core.loggers import batch_logger as logger
+
+
+# Reply of the runner to the approval gates of the coordinator
+APPROVAL = 'approved'
+# Turns of a run, the idea included, before it is stopped
+MAX_TURNS = 8
+# A run is complete once a task of this agent completed
+FINAL_AGENT = 'Email Automation Agent'
+DELEGATION_TOOLS = ('send_message', 'submit_task')
+# Tools whose response carries the final state of a remote task
+RESULT_TOOLS = ('send_message', 'check_task')
+# Statuses of the runs retried with --retry-failed
+RETRIED_STATUSES = ('failed', 'timeout')
+AGENT_READY_TIMEOUT = 120
+USER_ID = 'batch'
+
+
+def idea_message(idea: dict) -> str:
+    """First message of a run, as a user would write it in the chat."""
+    lines = [idea['text']]
+    if idea.get('documents'):
+        lines.append(f"Documents directory: {idea['documents']}")
+    if idea.get('email'):
+        lines.append(f"Email address: {idea['email']}")
+    return '\n'.join(lines)
+
+
+def read_ideas(path: str) -> list[tuple[str, dict]]:
+    """Ideas of a JSONL file with their run ids, the `id` field or the line number."""
+    ideas, seen = [], set()
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            if line.strip():
+                idea = json.loads(line)
+                if not idea.get('text'):
+                    raise click.ClickException(f'Line {number} of {path} has no "text"')
+                run_id = str(idea.get('id', number))
+                # Results are matched to their idea by id when resuming
+                if run_id in seen:
+                    raise click.ClickException(f'Line {number} of {path} repeats the id "{run_id}"')
+                seen.add(run_id)
+                ideas.append((run_id, idea))
+    return ideas
+
+
+def finished_runs(path: str, retry_failed: bool) -> set[str]:
+    """Ids of the runs with a result in a results file, by their last result."""
+    statuses = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line of an interrupted write
+                    continue
+                statuses[result['id']] = result['status']
+    return {
+        run_id for run_id, status in statuses.items()
+        if not (retry_failed and status in RETRIED_STATUSES)
+    }
+
+
+class BatchRunner:
+    """Runs business ideas through the policy check and the coordinator.
+
+    Every run has a session of its own, so its state, its remote agent tasks
+    and its cached delegations are isolated from the other runs. Approval
+    gates are answered with APPROVAL until a task of FINAL_AGENT completed;
+    a turn without any delegation means the coordinator needs more input,
+    which ends the run. At most `concurrency` runs are in
+    progress at once, and remote agents queue them as batch requests.
+    """
+
+    def __init__(self, coordinator_agent, evaluator, concurrency: int, timeout: float):
+        self.session_service = InMemorySessionService()
+        self.coordinator = Runner(
+            agent=coordinator_agent,
+            app_name=APP_NAME,
+            session_service=self.session_service,
+            artifact_service=InMemoryArtifactService(),
+        )
+        self.evaluator = evaluator
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def run(self, run_id: str, idea: dict, verdict: dict) -> dict:
+        """Result of a run, given the policy verdict of its idea."""
+        result = {
+            'id': run_id,
+            'status': 'failed',
+            'response': '',
+            'turns': 0,
+            'delegations': [],
+            'timings': {'turns': []},
+        }
+        if verdict['decision'] != 'safe':
+            result.update(status='unsafe_input', response=verdict['reasoning'])
+            return result
+
+        async with self._slots:
+            started = time.monotonic()
+            session = await self.session_service.create_session(
+                app_name=APP_NAME,
+                user_id=USER_ID,
+                session_id=uuid.uuid4().hex,
+                state={PRIORITY_KEY: 'batch', DEADLINE_KEY: new_deadline(self.timeout)},
+            )
+            result['session_id'] = session.id
+            logger.info(f'Run {run_id} started in session {session.id}')
+            try:
+                await asyncio.wait_for(self._run(session.id, idea, result), self.timeout)
+            except asyncio.TimeoutError:
+                result['status'] = 'timeout'
+                from coordinator import coordinator
+                await coordinator.cancel_session_tasks(session.id)
+            except Exception as e:
+                logger.error(f'Run {run_id} failed: {e}')
+                result.update(status='failed', error=str(e))
+            finally:
+                await self.session_service.delete_session(
+                    app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+                )
+            result['timings']['total'] = round(time.monotonic() - started, 3)
+            logger.info(f"Run {run_id} {result['status']} in {result['timings']['total']}s")
+            return result
+
+    async def _run(self, session_id: str, idea: dict, result: dict) -> None:
+        message = idea_message(idea)
+        result['status'] = 'max_turns'
+        for turn in range(MAX_TURNS):
+            started = time.monotonic()
+            response, delegations, final_task = await self._turn(session_id, message)
+            result['turns'] += 1
+            result['timings']['turns'].append(round(time.monotonic() - started, 3))
+            result['delegations'].extend(delegations)
+            result['response'] = response
+            if final_task == 'partial':
+                # Cut at its deadline: the report may be incomplete, retried with --retry-failed
+                result['status'] = 'timeout'
+                break
+            if final_task == 'completed':
+                result['status'] = 'completed'
+                break
+            if turn and not delegations:
+                result['status'] = 'needs_input'
+                break
+            message = APPROVAL
+
+        if not result['response']:
+            return
+        started = time.monotonic()
+        [verdict] = await self.evaluator.evaluate([result['response']])
+        result['timings']['output_policy'] = round(time.monotonic() - started, 3)
+        if verdict['decision'] != 'safe':
+            result.update(status='unsafe_output', response=verdict['reasoning'])
+
+    async def _turn(self, session_id: str, message: str) -> tuple[str, list[str], str | None]:
+        """Final response of a turn, its delegations, and 'completed' or 'partial'
+        when a FINAL_AGENT task completed, fully or at its deadline."""
+        response, delegations, final_task = '', [], None
+        # Agent of each call whose response carries the state of a task
+        result_calls: dict[str, str] = {}
+        async for event in self.coordinator.run_async(
+            user_id=USER_ID,
+            session_id=session_id,
+            new_message=types.Content(role='user', parts=[types.Part(text=message)]),
+        ):
+            for call in event.get_function_calls():
+                agent_name = (call.args or {}).get('agent_name', '')
+                if call.name in DELEGATION_TOOLS:
+                    delegations.append(agent_name)
+                if call.name in RESULT_TOOLS:
+                    result_calls[call.id] = agent_name
+            for function_response in event.get_function_responses():
+                agent_name = result_calls.pop(function_response.id, None)
+                task = function_response.response or {}
+                if agent_name == FINAL_AGENT and task.get('state') == 'completed':
+                    final_task = 'partial' if task.get('partial') else 'completed'
+            if event.is_final_response() and event.content and event.content.parts:
+                response = ''.join(p.text for p in event.content.parts if p.text)
+        return response, delegations, final_task
+
+
+async def run_batch(
+    ideas_path: str,
+    output: str,
+    concurrency: int,
+    timeout: float,
+    retry_failed: bool,
+    start_agents: bool,
+) -> None:
+    finished = finished_runs(output, retry_failed)
+    pending = [(run_id, idea) for run_id, idea in read_ideas(ideas_path) if run_id not in finished]
+    click.echo(f'{len(pending)} ideas to run, {len(finished)} already in {output}')
+    if not pending:
+        return
+
+    supervisor = None
+    if start_agents:
+        supervisor = AgentSupervisor(remote_agents(), logger)
+        supervisor.start()
+        if not await asyncio.to_thread(supervisor.wait_ready, AGENT_READY_TIMEOUT):
+            supervisor.stop()
+            raise click.ClickException(f'Remote agents not ready: {supervisor.status()}')
+
+    try:
+        from coordinator import initialized_coordinator_agent
+        from Policy_Enforcer.batch import BatchPolicyEvaluator
+        from Policy_Enforcer.policy_enforcement_agent import create_batch_agent
+
+        evaluator = BatchPolicyEvaluator(create_batch_agent(), logger=logger)
+        runner = BatchRunner(await initialized_coordinator_agent(), evaluator, concurrency, timeout)
+        # The ideas are checked together, with few model calls, before any run
+        verdicts = await evaluator.evaluate([idea_message(idea) for _, idea in pending])
+
+        with open(output, 'a', encoding='utf-8') as results:
+            async def run_one(run_id: str, idea: dict, verdict: dict) -> None:
+                result = await runner.run(run_id, idea, verdict)
+                # Written as soon as a run ends, so an interrupted batch resumes
+                results.write(json.dumps(result) + '\n')
+                results.flush()
+                click.echo(f"{run_id}: {result['status']}")
+
+            await asyncio.gather(
+                *(run_one(run_id, idea, verdict) for (run_id, idea), verdict in zip(pending, verdicts))
+            )
+    finally:
+        from coordinator import close_coordinator_agent
+        await close_coordinator_agent()
+        if supervisor is not None:
+            supervisor.stop()
+
+
+@click.command()
+@click.argument('ideas', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', default=None, help='Results JSONL file, IDEAS with a .results.jsonl suffix by default.')
+@click.option('--concurrency', default=4, help='Ideas run at once.')
+@click.option('--timeout', default=900, help='Seconds allowed per idea.')
+@click.option('--retry-failed', is_flag=True, help='Run again the ideas that failed or timed out.')
+@click.option('--start-agents/--no-start-agents', default=True, help='Start and supervise the remote agents.')
+def main(ideas, output, concurrency, timeout, retry_failed, start_agents):
+    """Assess the business ideas of a JSONL file without the chat UI.
+
+    Each line holds an idea: {"id": ..., "text": ..., "documents": ..., "email": ...}.
+    Ideas already in the results file are skipped, so an interrupted batch
+    resumes where it stopped.
+    """
+    output = output or f'{os.path.splitext(ideas)[0]}.results.jsonl'
+    asyncio.run(run_batch(ideas, output, concurrency, timeout, retry_failed, start_agents))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+import hashlib, json
+
+import gradio as gr
+
+from a2a.types import AgentCard, Task, TaskArtifactUpdateEvent, TaskStatusUpdateEvent
+from a2a.utils import get_artifact_text, get_data_parts, get_message_text
+from pydantic import BaseModel
+
+from constants import CHAT_MESSAGE_MAX_CHARS, TOOL_PAYLOAD_PREVIEW_CHARS
+
+
+# Strings of a payload at least this long are shown once per response, and
+# referenced by the title of the message showing them afterwards.
+HEAVY_STRING_CHARS = 500
+
+
+def to_jsonable(value):
+    """JSON compatible copy of a tool payload, with A2A models as dicts."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json', exclude_none=True)
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, bytes):
+        return f'<{len(value):,} bytes>'
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def truncate(text: str, limit: int) -> str:
+    """Text cut to at most `limit` characters, at a line end when possible."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind('\n', 0, limit)
+    if cut < limit // 2:
+        cut = limit
+    return f'{text[:cut]}\n… {len(text) - cut:,} more characters'
+
+
+class ChatTranscript:
+    """Messages of the response to a chat request, bounded in size.
+
+    Tool calls and responses are collapsed messages whose payload is cut to
+    `preview_chars` characters, and no other message but the answer exceeds
+    `max_chars`. A response or a long string already shown is replaced by a
+    reference to the message showing it, an exchange repeating the previous
+    one (e.g. polling a task) only increases its count, and the status
+    updates of a remote task replace each other. The transcript is yielded
+    whole: Gradio only sends the changes between yields, so a message is
+    sent once, not with every update.
+    """
+
+    def __init__(
+        self,
+        preview_chars: int = TOOL_PAYLOAD_PREVIEW_CHARS,
+        max_chars: int = CHAT_MESSAGE_MAX_CHARS,
+    ):
+        self.messages: list[gr.ChatMessage] = []
+        self.preview_chars = preview_chars
+        self.max_chars = max_chars
+        self._calls = 0
+        # Title of the message showing each response and long string
+        self._shown: dict[str, str] = {}
+        # Number and key of the calls waiting for their response, by tool
+        self._open_calls: dict[str, list[tuple[int, str]]] = {}
+        # Index and key of the call ending the transcript, if any
+        self._last_call: tuple[int, str] | None = None
+        # Keys of the last exchange and index of its call, while it ends the transcript
+        self._exchange: dict | None = None
+        # Call repeating the last exchange, shown only if its response differs
+        self._held_call: tuple[str, dict] | None = None
+        # Index and task of the status update ending the transcript, if any
+        self._status: tuple | None = None
+        self._answer: int | None = None
+
+    def tool_call(self, name: str, args: dict) -> list[gr.ChatMessage]:
+        self._flush()
+        args = to_jsonable(args)
+        exchange = self._exchange
+        if (
+            exchange is not None
+            and exchange['call'] == digest([name, args])
+            and exchange['index'] == len(self.messages) - 2
+        ):
+            self._held_call = (name, args)
+            return self.view()
+        self._append_call(name, args)
+        return self.view()
+
+    def tool_response(self, name: str, response) -> list[gr.ChatMessage]:
+        response = to_jsonable(response)
+        if isinstance(response, dict) and 'response' in response:
+            response = response['response']
+        key = digest([name, response])
+        if self._held_call is not None:
+            if key == self._exchange['response']:
+                self._held_call = None
+                self._exchange['count'] += 1
+                self._replace(
+                    self._exchange['index'],
+                    f"🛠️ Tool Call #{self._exchange['number']}: {name} (×{self._exchange['count']})",
+                    self.messages[self._exchange['index']].content,
+                )
+                return self.view()
+            self._flush()
+
+        number, call_key = (self._open_calls.get(name) or [(self._calls, None)]).pop(0)
+        title = f'⚡ Tool Response #{number}: {name}'
+        if key in self._shown:
+            content = f'Same response as "{self._shown[key]}".'
+        else:
+            content = self._render(response, title)
+            self._shown[key] = title
+        follows_call = self._last_call == (len(self.messages) - 1, call_key)
+        self._append(title, content)
+        if follows_call:
+            self._exchange = {
+                'call': call_key,
+                'response': key,
+                'index': len(self.messages) - 2,
+                'number': number,
+                'count': 1,
+            }
+        return self.view()
+
+    def task_update(
+        self,
+        update: Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent,
+        agent_card: AgentCard,
+    ) -> list[gr.ChatMessage]:
+        self._flush()
+        if isinstance(update, TaskStatusUpdateEvent):
+            content = f'⏳ **{agent_card.name}: {update.status.state.value}**'
+            if update.status.message:
+                content += f'\n{get_message_text(update.status.message)}'
+            key = (len(self.messages) - 1, update.task_id)
+            if self._status == key:
+                # Only the latest status of a task is worth showing
+                self._replace(key[0], None, truncate(content, self.max_chars))
+            else:
+                self._append(None, truncate(content, self.max_chars))
+                self._status = (len(self.messages) - 1, update.task_id)
+        elif isinstance(update, TaskArtifactUpdateEvent):
+            title = f'📦 Artifact from {agent_card.name}: {update.artifact.name}'
+            text = get_artifact_text(update.artifact)
+            if len(text) >= HEAVY_STRING_CHARS:
+                self._shown.setdefault(digest(text), title)
+            content = f'**{title}**\n{text}'
+            for data in get_data_parts(update.artifact.parts):
+                content += f'\n```json\n{json.dumps(self._reference(to_jsonable(data), title), indent=2, ensure_ascii=False)}\n```'
+            self._append(None, truncate(content, self.max_chars))
+        elif isinstance(update, Task):
+            self._append(None, f'📨 **{agent_card.name} accepted task `{update.id}`**')
+        return self.view()
+
+    def answer(self, text: str) -> list[gr.ChatMessage]:
+        """Show the answer, replacing the answer shown since the last tool message."""
+        self._flush()
+        if self._answer is not None:
+            self._replace(self._answer, None, text)
+        else:
+            self._append(None, text)
+            self._answer = len(self.messages) - 1
+        return self.view()
+
+    def view(self) -> list[gr.ChatMessage]:
+        return list(self.messages)
+
+    def _append_call(self, name: str, args: dict) -> None:
+        self._calls += 1
+        title = f'🛠️ Tool Call #{self._calls}: {name}'
+        key = digest([name, args])
+        self._append(title, self._render(args, title))
+        self._open_calls.setdefault(name, []).append((self._calls, key))
+        self._last_call = (len(self.messages) - 1, key)
+
+    def _flush(self) -> None:
+        if self._held_call is not None:
+            name, args = self._held_call
+            self._held_call = None
+            self._append_call(name, args)
+
+    def _append(self, title: str | None, content: str) -> None:
+        self._answer = None
+        self._exchange = None
+        self.messages.append(self._message(title, content))
+
+    def _replace(self, index: int, title: str | None, content: str) -> None:
+        self.messages[index] = self._message(title, content)
+
+    def _message(self, title: str | None, content: str) -> gr.ChatMessage:
+        if title is None:
+            return gr.ChatMessage(role='assistant', content=content)
+        # Tool payloads start collapsed, under their title
+        return gr.ChatMessage(role='assistant', content=content, metadata={'title': title, 'status': 'done'})
+
+    def _render(self, value, title: str) -> str:
+        text = json.dumps(self._reference(value, title), indent=2, ensure_ascii=False)
+        return f'```json\n{truncate(text, self.preview_chars)}\n```'
+
+    def _reference(self, value, title: str):
+        """The payload with the long strings already shown replaced by a reference."""
+        if isinstance(value, dict):
+            return {k: self._reference(v, title) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._reference(v, title) for v in value]
+        if isinstance(value, str) and len(value) >= HEAVY_STRING_CHARS:
+            shown = self._shown.setdefault(digest(value), title)
+            if shown != title:
+                return f'<{len(value):,} characters, shown in "{shown}">'
+        return value
@@ -2,27 +2,112 @@ import os
 
 from dotenv import load_dotenv
 
-from google.genai import types
-
 load_dotenv()
 
 APP_NAME = 'BusinessFlow'
-TIMEOUT = int(os.getenv("TIMEOUT")) if os.getenv("TIMEOUT").isdecimal() else None
+TIMEOUT = int(os.getenv("TIMEOUT", "")) if os.getenv("TIMEOUT", "").isdecimal() else None
 
 WORKSPACE_DIR = os.getenv("WORKSPACE_DIR")
 PLATFORM = os.getenv("PLATFORM")
 MODEL = os.getenv("MODEL")
 
+# Agent URLs may list several comma separated replicas of the same agent
 VALIDATOR_AGENT_URL = os.getenv("VALIDATOR_AGENT_URL")
 EMIAL_AUTOMATION_AGENT_URL = os.getenv("EMIAL_AUTOMATION_AGENT_URL")
+VALIDATOR_AGENT_URLS = [url.strip() for url in (VALIDATOR_AGENT_URL or "").split(",") if url.strip()]
+EMIAL_AUTOMATION_AGENT_URLS = [url.strip() for url in (EMIAL_AUTOMATION_AGENT_URL or "").split(",") if url.strip()]
+
+# Seconds before an idempotent delegation is duplicated to a second replica;
+# only agents named in IDEMPOTENT_AGENTS are ever hedged.
+AGENT_HEDGE_DELAY = float(os.getenv("AGENT_HEDGE_DELAY")) if os.getenv("AGENT_HEDGE_DELAY") else None
+IDEMPOTENT_AGENTS = [name.strip() for name in os.getenv("IDEMPOTENT_AGENTS", "").split(",") if name.strip()]
+
+LOGGING_LEVEL = os.getenv("LOGGING_LEVEL", "info")
+
+# MCP connection/read timeout; each tool call is further bounded by the
+# remaining budget of the request deadline.
+MCP_TIMEOUT = float(os.getenv("MCP_TIMEOUT", "15"))
+# Refinement loops do not start an iteration with less budget left than this.
+MIN_LOOP_ITERATION_BUDGET = float(os.getenv("MIN_LOOP_ITERATION_BUDGET", "60"))
+
+# Tasks submitted without waiting are polled with exponential backoff; when a
+# local push notification endpoint is configured, agents notify it instead.
+PUSH_NOTIFICATION_URL = os.getenv("PUSH_NOTIFICATION_URL")
+POLL_INITIAL_DELAY = float(os.getenv("POLL_INITIAL_DELAY", "2"))
+POLL_MAX_DELAY = float(os.getenv("POLL_MAX_DELAY", "30"))
+# Waits for a submitted task end after this many seconds when the request has
+# no deadline, or after this many polls in a row find no such task.
+TASK_WAIT_TIMEOUT = float(os.getenv("TASK_WAIT_TIMEOUT", "1800"))
+POLL_MAX_MISSES = int(os.getenv("POLL_MAX_MISSES", "3"))
+
+# Completed results of the agents in IDEMPOTENT_AGENTS are reused for
+# identical delegations (same agent, task text and context) during this
+# many seconds.
+DELEGATION_CACHE_TTL = int(os.getenv("DELEGATION_CACHE_TTL", "900"))
+DELEGATION_CACHE_SIZE = int(os.getenv("DELEGATION_CACHE_SIZE", "128"))
 
-LOGGING_LEVEL = os.getenv("LOGGING_LEVEL")
+# Agent servers keep tasks, sessions, artifacts and memory in SQLite under
+# STORAGE_DIR (in memory when unset); rows expire STORAGE_TTL seconds after
+# their last write and STORAGE_CACHE_SIZE decoded values stay in memory.
+STORAGE_DIR = os.getenv("STORAGE_DIR")
+STORAGE_TTL = int(os.getenv("STORAGE_TTL", str(7 * 24 * 3600)))
+STORAGE_CACHE_SIZE = int(os.getenv("STORAGE_CACHE_SIZE", "256"))
+SESSION_MAX_EVENTS = int(os.getenv("SESSION_MAX_EVENTS", "500"))
+
+# Agent runs executed at once by an agent server; further requests wait in a
+# bounded queue (interactive before batch) and are rejected when it is full.
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "2"))
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", "16"))
+
+# Seconds an agent server waits for in-flight requests and runs on shutdown
+SHUTDOWN_DRAIN_TIMEOUT = int(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "60"))
+# Characters of an inline output key streamed in the progress artifact of a run;
+# the other output keys are only named there and published by reference.
+PROGRESS_PREVIEW_CHARS = int(os.getenv("PROGRESS_PREVIEW_CHARS", "500"))
+
+# Chat requests of the Gradio app processed concurrently, across all users
+GRADIO_CONCURRENCY_LIMIT = int(os.getenv("GRADIO_CONCURRENCY_LIMIT", "8"))
+
+# Policy verdicts reused for identical or near-duplicate texts
+POLICY_CACHE_SIZE = int(os.getenv("POLICY_CACHE_SIZE", "4096"))
+POLICY_CACHE_TTL = int(os.getenv("POLICY_CACHE_TTL", str(24 * 3600)))
+# When an input needs the policy model, the coordinator may start concurrently
+# with the check, on a copy of the session; its output and tool calls are held
+# until the input is cleared. Opt-in.
+SPECULATIVE_POLICY_CHECK = os.getenv("SPECULATIVE_POLICY_CHECK", "false").lower() == "true"
+# Final responses are streamed and checked by chunks of about this many
+# characters while they are generated.
+OUTPUT_CHECK_CHUNK_SIZE = int(os.getenv("OUTPUT_CHECK_CHUNK_SIZE", "1500"))
+# Policy checks see one text of at most this many characters; longer texts
+# are checked by overlapping windows.
+POLICY_MAX_INPUT_CHARS = int(os.getenv("POLICY_MAX_INPUT_CHARS", "8000"))
+POLICY_WINDOW_OVERLAP = int(os.getenv("POLICY_WINDOW_OVERLAP", "200"))
+# Windows of one text checked by the model at once
+POLICY_WINDOW_CONCURRENCY = int(os.getenv("POLICY_WINDOW_CONCURRENCY", "4"))
+# Batch evaluations of the Policy Enforcer pack up to POLICY_BATCH_SIZE texts
+# per model call and run POLICY_BATCH_CONCURRENCY calls at once.
+POLICY_BATCH_SIZE = int(os.getenv("POLICY_BATCH_SIZE", "20"))
+POLICY_BATCH_CONCURRENCY = int(os.getenv("POLICY_BATCH_CONCURRENCY", "4"))
+# Tool calls and responses are shown collapsed in the chat, cut to this many
+# characters; other chat messages, but the final answer, to CHAT_MESSAGE_MAX_CHARS.
+TOOL_PAYLOAD_PREVIEW_CHARS = int(os.getenv("TOOL_PAYLOAD_PREVIEW_CHARS", "2000"))
+CHAT_MESSAGE_MAX_CHARS = int(os.getenv("CHAT_MESSAGE_MAX_CHARS", "20000"))
 
 os.environ["PYTHONUTF8"] = "1"
 
-RETRY_CONFIG=types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
-    initial_delay=30,
-    http_status_codes=[429, 500, 503, 504]
-)
\ No newline at end of file
+
+def __getattr__(name):
+    # RETRY_CONFIG needs google.genai, which is only imported once an agent
+    # is built, so that importing constants stays cheap.
+    if name == "RETRY_CONFIG":
+        from google.genai import types
+
+        global RETRY_CONFIG
+        RETRY_CONFIG = types.HttpRetryOptions(
+            attempts=5,
+            exp_base=7,
+            initial_delay=30,
+            http_status_codes=[429, 500, 503, 504]
+        )
+        return RETRY_CONFIG
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,17 +1,28 @@
-import json, os, uuid, httpx
+import asyncio, base64, hashlib, json, random, time, uuid, httpx
 
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from a2a.client import A2ACardResolver
 from a2a.types import (
     AgentCard,
+    FileWithUri,
     MessageSendParams,
     Part,
     SendMessageRequest,
     SendMessageResponse,
     SendMessageSuccessResponse,
+    SendStreamingMessageRequest,
     Task,
+    TaskState,
 )
+from admission import PRIORITY_KEY
+from deadline import DEADLINE_KEY, PARTIAL_KEY, state_remaining_budget
+from refinement import REFINE_KEY
+from request_config import RequestConfiguredGemini
+from speculation import hold_until_input_cleared
+from push_notification_receiver import PushNotificationReceiver, TERMINAL_STATES
 from remote_agent_connection import (
     RemoteAgentConnections,
     TaskUpdateCallback,
@@ -21,28 +32,100 @@ from google.adk import Agent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.tools.tool_context import ToolContext
-
-from constants import VALIDATOR_AGENT_URL, EMIAL_AUTOMATION_AGENT_URL, MODEL, TIMEOUT
+from google.genai import types
+
+from constants import (
+    VALIDATOR_AGENT_URLS,
+    EMIAL_AUTOMATION_AGENT_URLS,
+    AGENT_HEDGE_DELAY,
+    IDEMPOTENT_AGENTS,
+    MODEL,
+    TIMEOUT,
+    DELEGATION_CACHE_TTL,
+    DELEGATION_CACHE_SIZE,
+    PUSH_NOTIFICATION_URL,
+    POLL_INITIAL_DELAY,
+    POLL_MAX_DELAY,
+    POLL_MAX_MISSES,
+    TASK_WAIT_TIMEOUT,
+)
 from logs.core.loggers import coordinator_logger as logger
 
 root_agent = None
+coordinator = None
     
 
-def convert_part(part: Part, tool_context: ToolContext):
-    """Convert a part to text. Only text parts are supported."""
-    if part.type == 'text':
+async def convert_part(part: Part, tool_context: ToolContext):
+    """Convert a part to a value the coordinator can read directly.
+
+    Text parts become strings and data parts keep their JSON structure.
+    Files given by URI are returned as a reference, while inline file bytes
+    are saved as a session artifact and returned by artifact id.
+    """
+    part = part.root
+    if part.kind == 'text':
         return part.text
+    if part.kind == 'data':
+        return part.data
+    if part.kind == 'file':
+        file = part.file
+        if isinstance(file, FileWithUri):
+            return {'file_name': file.name, 'mime_type': file.mime_type, 'uri': file.uri}
+        file_id = file.name or uuid.uuid4().hex
+        await tool_context.save_artifact(
+            file_id,
+            types.Part(
+                inline_data=types.Blob(
+                    mime_type=file.mime_type, data=base64.b64decode(file.bytes)
+                )
+            ),
+        )
+        return {'artifact_file_id': file_id, 'mime_type': file.mime_type}
 
-    return f'Unknown type: {part.type}'
+    return f'Unknown type: {part.kind}'
 
 
-def convert_parts(parts: list[Part], tool_context: ToolContext):
-    """Convert parts to text."""
+async def convert_parts(parts: list[Part], tool_context: ToolContext):
+    """Convert parts to text, JSON data or file references."""
     rval = []
     for p in parts:
-        rval.append(convert_part(p, tool_context))
+        rval.append(await convert_part(p, tool_context))
     return rval
 
+
+async def convert_task(task: Task | None, tool_context: ToolContext):
+    """Flatten a remote task into the fields the coordinator reasons on.
+
+    Artifacts are keyed by name; an artifact made of a single part is
+    replaced by the converted value of that part.
+    """
+    if not isinstance(task, Task):
+        return task
+
+    artifacts = {}
+    for artifact in task.artifacts or []:
+        if (artifact.metadata or {}).get('progress'):
+            # Progress chunks are only meant for streaming clients
+            continue
+        values = await convert_parts(artifact.parts, tool_context)
+        artifacts[artifact.name or artifact.artifact_id] = values[0] if len(values) == 1 else values
+
+    status_message = None
+    if task.status.message:
+        status_message = await convert_parts(task.status.message.parts, tool_context)
+    result = {
+        'task_id': task.id,
+        'context_id': task.context_id,
+        'state': task.status.state.value,
+        'status_message': status_message,
+        'artifacts': artifacts,
+    }
+    if (task.metadata or {}).get(PARTIAL_KEY):
+        # Completed at its deadline, before the whole pipeline ran
+        result['partial'] = True
+    return result
+
+
 def create_send_message_payload(
     text: str, task_id: str | None = None, context_id: str | None = None
 ) -> dict[str, Any]:
@@ -62,6 +145,94 @@ def create_send_message_payload(
         payload['message']['contextId'] = context_id
     return payload
 
+class DelegationCache:
+    """Single-flight and result cache for remote agent delegations.
+
+    Concurrent calls with the same key share one in-flight call, and results
+    accepted by `should_cache` are kept for `ttl` seconds, bounded to
+    `max_entries` in LRU order.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        should_cache: Callable[[Any], bool] = lambda result: result is not None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.should_cache = should_cache
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._waiters: dict[tuple, int] = {}
+        self._results: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+
+    @staticmethod
+    def make_key(context_id: str, agent_name: str, task: str, artifact_refs: list | None = None) -> tuple:
+        """Key of a delegation; new artifacts attached to the same task make a new key."""
+        content = json.dumps([task.strip(), artifact_refs or []], sort_keys=True)
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return (context_id, agent_name, digest)
+
+    def get(self, key: tuple) -> Any | None:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return result
+
+    def invalidate(self, context_id: str) -> None:
+        """Drop every cached result of a context."""
+        for key in [k for k in self._results if k[0] == context_id]:
+            del self._results[key]
+
+    async def run(self, key: tuple, call: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self.get(key)
+        if cached is not None:
+            logger.info(f'delegation cache hit for {key[1]} in context {key[0]}')
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        else:
+            logger.info(f'joining in-flight delegation to {key[1]} in context {key[0]}')
+        # Shielded so that a cancelled caller does not cancel the call for the
+        # others; the call itself is cancelled once its last caller is gone.
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def _on_done(self, key: tuple, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if not self.should_cache(result):
+            return
+        self._results[key] = (time.monotonic() + self.ttl, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+
+def is_completed_task(result: Any) -> bool:
+    return isinstance(result, Task) and result.status.state == TaskState.completed
+
+
 class CoordinatorAgent:
     """The Coordinator agent. This is the agent responsible for sending tasks to agents.
     """
@@ -74,35 +245,58 @@ class CoordinatorAgent:
         self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
         self.cards: dict[str, AgentCard] = {}
         self.agents: str = ''
+        self.push_receiver: PushNotificationReceiver | None = None
+        # Remote tasks started by each coordinator session: {task_id: agent_name}
+        self.active_tasks: dict[str, dict[str, str]] = {}
+        self.delegations = DelegationCache(
+            ttl=DELEGATION_CACHE_TTL,
+            max_entries=DELEGATION_CACHE_SIZE,
+            should_cache=is_completed_task,
+        )
 
     async def _async_init_components(
-        self, remote_agent_addresses: list[str]
+        self, remote_agent_addresses: list[str | list[str]]
     ) -> None:
-        """Asynchronous part of initialization."""
+        """Asynchronous part of initialization.
+
+        Each address is either one URL or the list of replica URLs serving
+        the same agent; the card is resolved from the first replica answering.
+        """
         # Use a single httpx.AsyncClient for all card resolutions for efficiency
         async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            for address in remote_agent_addresses:
-                card_resolver = A2ACardResolver(
-                    client, address
-                )  # Constructor is sync
-                try:
-                    card = (
-                        await card_resolver.get_agent_card()
-                    )  # get_agent_card is async
-
-                    remote_connection = RemoteAgentConnections(
-                        agent_card=card, agent_url=address, logger=logger,
-                    )
-                    self.remote_agent_connections[card.name] = remote_connection
-                    self.cards[card.name] = card
-                except httpx.ConnectError as e:
-                    logger.error(
-                        f'ERROR: Failed to get agent card from {address}: {e}'
-                    )
-                except Exception as e:  # Catch other potential errors
-                    logger.error(
-                        f'ERROR: Failed to initialize connection for {address}: {e}'
-                    )
+            for addresses in remote_agent_addresses:
+                replica_urls = [addresses] if isinstance(addresses, str) else addresses
+                for address in replica_urls:
+                    card_resolver = A2ACardResolver(
+                        client, address
+                    )  # Constructor is sync
+                    try:
+                        card = (
+                            await card_resolver.get_agent_card()
+                        )  # get_agent_card is async
+
+                        remote_connection = RemoteAgentConnections(
+                            agent_card=card,
+                            agent_url=replica_urls,
+                            logger=logger,
+                            hedge_delay=AGENT_HEDGE_DELAY,
+                        )
+                        remote_connection.start_health_checks()
+                        self.remote_agent_connections[card.name] = remote_connection
+                        self.cards[card.name] = card
+                        break
+                    except httpx.ConnectError as e:
+                        logger.error(
+                            f'ERROR: Failed to get agent card from {address}: {e}'
+                        )
+                    except Exception as e:  # Catch other potential errors
+                        logger.error(
+                            f'ERROR: Failed to initialize connection for {address}: {e}'
+                        )
+
+        if PUSH_NOTIFICATION_URL:
+            self.push_receiver = PushNotificationReceiver(PUSH_NOTIFICATION_URL, logger)
+            await self.push_receiver.start()
 
         # Populate self.agents using the logic from original __init__ (via list_remote_agents)
         agent_info = []
@@ -110,10 +304,17 @@ class CoordinatorAgent:
             agent_info.append(json.dumps(agent_detail_dict))
         self.agents = '\n'.join(agent_info)
 
+    async def close(self) -> None:
+        """Stop the health checks of the remote agents and the push receiver."""
+        for connection in self.remote_agent_connections.values():
+            await connection.close()
+        if self.push_receiver is not None:
+            await self.push_receiver.stop()
+
     @classmethod
     async def create(
         cls,
-        remote_agent_addresses: list[str],
+        remote_agent_addresses: list[str | list[str]],
         task_callback: TaskUpdateCallback | None = None,
     ) -> 'CoordinatorAgent':
         """Create and asynchronously initialize an instance of the CoordinatorAgent."""
@@ -124,22 +325,24 @@ class CoordinatorAgent:
     def create_agent(self) -> Agent:
         """Create an instance of the CoordinatorAgent."""
 
-        if(os.getenv("GOOGLE_API_KEY") is None or os.getenv("GOOGLE_API_KEY") == ""):
-            raise ValueError("Please provide `GOOGLE_API_KEY` in .env file")
-        else:
-            model = f"{MODEL}"
-        
-        logger.info(f'Using hardcoded model: {model}')
+        # The model name and API key of each chat request take precedence
+        # over MODEL and GOOGLE_API_KEY.
+        model = f"{MODEL}"
+
+        logger.info(f'Using default model: {model}')
         return Agent(
-            model=model,
+            model=RequestConfiguredGemini(model=model),
             name='Routing_agent',
             instruction=self.root_instruction,
             before_model_callback=self.before_model_callback,
+            before_tool_callback=hold_until_input_cleared,
             description=(
                 'This coordinator agent plans the tasks and controls the workflow for the business automation'
             ),
             tools=[
                 self.send_message,
+                self.submit_task,
+                self.check_task,
             ],
         )
 
@@ -203,11 +406,14 @@ class CoordinatorAgent:
 
         **Core Directives:**
         * **Task Delegation:** Utilize the `send_message` function to assign each task to a remote agent.
+        * **Long-Running Tasks:** For long pipelines such as business validation you may instead use `submit_task`, which returns a task id immediately, and later `check_task` to obtain the result.
         * **Contextual Awareness for Remote Agents:** If a remote agent repeatedly requests user confirmation, assume it lacks access to the full conversation history. In such cases, enrich the task description with all necessary contextual information relevant to that specific agent.
         * **Autonomous Agent Engagement:** Never seek user permission before engaging with remote agents. If multiple agents are required to fulfill a request, connect with them directly without requesting user preference or confirmation.
         * **Transparent Communication:** Always present the complete and detailed response from the remote agent to the user.
         * **User Confirmation Relay:** If a remote agent asks for confirmation, and the user has not already provided it, relay this confirmation request to the user.
         * **Focused Information Sharing:** Provide remote agents with only relevant contextual information. Avoid extraneous details.
+        * **Artifacts by Reference:** Outputs published by a remote agent (executive summary, business rules, statistics) are attached to later delegations by reference automatically. Never copy their content into the task description.
+        * **Refinements:** When the user only asks to refine or adjust results an agent already produced in this conversation, call `send_message` (or `submit_task`) with `refine` set to true. The agent then reuses its collected data and business rules instead of rerunning the whole pipeline.
         * **No Redundant Confirmations:** Do not ask remote agents for confirmation of information or actions.
         * **Tool Reliance:** Strictly rely on available tools to address user requests. Do not generate responses based on assumptions. If information is insufficient, request clarification from the user.
         * **Prioritize Recent Interaction:** Focus primarily on the most recent parts of the conversation when processing requests.
@@ -253,35 +459,217 @@ class CoordinatorAgent:
         return remote_agent_info
 
     async def send_message(
-        self, agent_name: str, task: str, tool_context: ToolContext
+        self, agent_name: str, task: str, tool_context: ToolContext, refine: bool = False
     ):
         """Sends a task to remote agent.
 
         This will send a message to the remote agent named agent_name.
 
+        Args:
+            agent_name: The name of the agent to send the task to.
+            task: The comprehensive conversation context summary
+                and goal to be achieved regarding user inquiry. Artifacts
+                published by previous agents are attached by reference.
+            tool_context: The tool context this method runs in.
+            refine: Whether the task only refines the results of a previous
+                delegation to the same agent, which then reuses them.
+
+        Returns:
+            A dictionary with the task state and its artifacts, where text
+            is returned as strings and structured results as JSON data.
+        """
+        logger.info(f"sending message to {agent_name}")
+        client = self._get_client(agent_name, tool_context)
+        state = tool_context.state
+        message_id, payload = self._create_payload(task, state, refine)
+
+        send = lambda: self._send_to_remote_agent(
+            client, message_id, payload, tool_context.session.id
+        )
+        if agent_name in IDEMPOTENT_AGENTS:
+            cache_context = payload['message']['contextId']
+            key = DelegationCache.make_key(
+                cache_context,
+                agent_name,
+                f'refine:{task}' if refine else task,
+                payload['message'].get('metadata', {}).get('artifact_refs'),
+            )
+            result = await self.delegations.run(key, send)
+        else:
+            # Agents with side effects, e.g. sending an email, run every time
+            result = await send()
+        self._remember_artifact_refs(result, state)
+        return await convert_task(result, tool_context)
+
+    async def submit_task(
+        self, agent_name: str, task: str, tool_context: ToolContext, refine: bool = False
+    ):
+        """Submits a long-running task to a remote agent without waiting for it.
+
+        The remote agent acknowledges the task immediately; use `check_task`
+        with the returned task id to obtain its result.
+
         Args:
             agent_name: The name of the agent to send the task to.
             task: The comprehensive conversation context summary
                 and goal to be achieved regarding user inquiry.
             tool_context: The tool context this method runs in.
+            refine: Whether the task only refines the results of a previous
+                delegation to the same agent, which then reuses them.
+
+        Returns:
+            A dictionary with the agent name, the task id and its state.
+        """
+        logger.info(f"submitting task to {agent_name}")
+        client = self._get_client(agent_name, tool_context)
+        message_id, payload = self._create_payload(task, tool_context.state, refine)
+        payload['configuration'] = {'blocking': False}
+        if self.push_receiver and client.get_agent().capabilities.push_notifications:
+            payload['configuration']['pushNotificationConfig'] = (
+                self.push_receiver.config().model_dump(mode='json', exclude_none=True)
+            )
+
+        message_request = SendMessageRequest(
+            id=message_id, params=MessageSendParams.model_validate(payload)
+        )
+        send_response: SendMessageResponse = await client.send_message(
+            message_request=message_request
+        )
+        if not isinstance(send_response.root, SendMessageSuccessResponse) or not isinstance(
+            send_response.root.result, Task
+        ):
+            logger.info(f'task submission to {agent_name} failed: {send_response.root}')
+            return None
+
+        submitted = send_response.root.result
+        logger.info(f'task {submitted.id} submitted to {agent_name}')
+        self._track_task(tool_context.session.id, submitted.id, agent_name)
+        return {
+            'agent_name': agent_name,
+            'task_id': submitted.id,
+            'state': submitted.status.state.value,
+        }
+
+    async def check_task(
+        self, agent_name: str, task_id: str, wait: bool, tool_context: ToolContext
+    ):
+        """Gets the state and result of a task submitted with `submit_task`.
+
+        Args:
+            agent_name: The name of the agent the task was submitted to.
+            task_id: The task id returned by `submit_task`.
+            wait: Whether to wait for the task to finish before returning.
+            tool_context: The tool context this method runs in.
 
-        Yields:
-            A dictionary of JSON data.
+        Returns:
+            A dictionary with the task state and its artifacts.
         """
+        client = self._get_client(agent_name, tool_context)
+        if not wait:
+            result = await client.get_task(task_id)
+        else:
+            budget = state_remaining_budget(tool_context.state)
+            result = await self.wait_for_task(
+                client, task_id, timeout=budget if budget is not None else TIMEOUT
+            )
+        if isinstance(result, Task) and result.status.state in TERMINAL_STATES:
+            self._untrack_task(tool_context.session.id, task_id)
+        self._remember_artifact_refs(result, tool_context.state)
+        return await convert_task(result, tool_context)
+
+    async def wait_for_task(
+        self,
+        client: RemoteAgentConnections,
+        task_id: str,
+        timeout: float | None = None,
+    ) -> Task | None:
+        """Wait for a submitted task to settle.
+
+        Polls `tasks/get` with exponential backoff and jitter. When push
+        notifications are enabled the waits between polls end as soon as
+        the remote agent notifies completion, and polling only acts as a
+        fallback for lost notifications. Gives up after `timeout` seconds,
+        TASK_WAIT_TIMEOUT by default, or once POLL_MAX_MISSES polls in a
+        row found no task, e.g. after a restart lost it.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (TASK_WAIT_TIMEOUT if timeout is None else timeout)
+        delay = POLL_INITIAL_DELAY
+        task = None
+        misses = 0
+        while True:
+            task = await client.get_task(task_id)
+            if task is not None and task.status.state in TERMINAL_STATES:
+                return task
+            misses = misses + 1 if task is None else 0
+            if misses >= POLL_MAX_MISSES:
+                logger.info(f'task {task_id} not found after {misses} polls, giving up')
+                return None
+            if loop.time() >= deadline:
+                logger.info(f'gave up waiting for task {task_id}')
+                return task
+
+            wait_for = min(delay * random.uniform(0.8, 1.2), deadline - loop.time())
+            if self.push_receiver:
+                notified = await self.push_receiver.wait(task_id, wait_for)
+                if notified is not None:
+                    return notified
+            else:
+                await asyncio.sleep(wait_for)
+            delay = min(delay * 2, POLL_MAX_DELAY)
+
+    def _track_task(self, session_id: str, task_id: str, agent_name: str) -> None:
+        self.active_tasks.setdefault(session_id, {})[task_id] = agent_name
+
+    def _untrack_task(self, session_id: str, task_id: str) -> None:
+        tasks = self.active_tasks.get(session_id, {})
+        tasks.pop(task_id, None)
+        if not tasks:
+            self.active_tasks.pop(session_id, None)
+
+    def move_session_tasks(self, from_session_id: str, to_session_id: str) -> None:
+        """Track the remote tasks of a forked session under the session it was merged into."""
+        tasks = self.active_tasks.pop(from_session_id, {})
+        if tasks:
+            self.active_tasks.setdefault(to_session_id, {}).update(tasks)
+
+    async def cancel_session_tasks(self, session_id: str) -> None:
+        """Cancel every remote task still running for a coordinator session.
+
+        Called when the user abandons a request, so that remote agents stop
+        working on delegations, including the ones submitted without waiting.
+        """
+        tasks = self.active_tasks.pop(session_id, {})
+        for task_id, agent_name in tasks.items():
+            client = self.remote_agent_connections.get(agent_name)
+            if client is None:
+                continue
+            try:
+                await client.cancel_task(task_id)
+            except Exception as e:
+                logger.error(f'failed to cancel task {task_id} on {agent_name}: {e}')
+
+    def _get_client(
+        self, agent_name: str, tool_context: ToolContext
+    ) -> RemoteAgentConnections:
         if agent_name not in self.remote_agent_connections:
             raise ValueError(f'Agent {agent_name} not found')
-        logger.info(f"sending message to {agent_name}")
-        state = tool_context.state
-        state['active_agent'] = agent_name
+        tool_context.state['active_agent'] = agent_name
         client = self.remote_agent_connections[agent_name]
 
         if not client:
             raise ValueError(f'Client not available for {agent_name}')
+        return client
 
-        if 'context_id' in state:
-            context_id = state['context_id']
-        else:
-            context_id = str(uuid.uuid4())
+    def _create_payload(
+        self, task: str, state, refine: bool = False
+    ) -> tuple[str, dict[str, Any]]:
+        """Build the `message/send` payload of a delegation.
+
+        Delegations of a coordinator session share one A2A context, so that
+        remote agents continue their session from one turn to the next.
+        """
+        context_id = state.get('context_id') or state.get('session_id') or str(uuid.uuid4())
 
         message_id = ''
         metadata = {}
@@ -305,11 +693,77 @@ class CoordinatorAgent:
         if context_id:
             payload['message']['contextId'] = context_id
 
+        message_metadata = {}
+        if state.get('artifact_refs'):
+            message_metadata['artifact_refs'] = list(state['artifact_refs'].values())
+        if state.get(DEADLINE_KEY):
+            message_metadata[DEADLINE_KEY] = state[DEADLINE_KEY]
+        if refine:
+            message_metadata[REFINE_KEY] = True
+        # Runs of the batch runner are queued after interactive requests
+        if state.get(PRIORITY_KEY):
+            message_metadata[PRIORITY_KEY] = state[PRIORITY_KEY]
+        if message_metadata:
+            payload['message']['metadata'] = message_metadata
+        return message_id, payload
+
+    def _remember_artifact_refs(self, task: Task | None, state) -> None:
+        """Keep the references of the artifacts published by a remote agent.
+
+        They are attached to every following delegation, so agents fetch
+        previous outputs from the shared store rather than from the task text.
+        """
+        if not isinstance(task, Task) or not task.artifacts:
+            return
+        refs = dict(state.get('artifact_refs', {}))
+        for artifact in task.artifacts:
+            reference = (artifact.metadata or {}).get('artifact_ref')
+            if reference:
+                refs[reference['name']] = reference
+        state['artifact_refs'] = refs
+
+    async def _send_to_remote_agent(
+        self,
+        client: RemoteAgentConnections,
+        message_id: str,
+        payload: dict[str, Any],
+        session_id: str,
+    ) -> Task | None:
+        """Deliver a message payload to a remote agent and return its task."""
+        if client.get_agent().capabilities.streaming:
+            streaming_request = SendStreamingMessageRequest(
+                id=message_id, params=MessageSendParams.model_validate(payload)
+            )
+            agent_name = client.get_agent().name
+            started: list[str] = []
+
+            def track_task(update, agent_card):
+                if isinstance(update, Task) and not started:
+                    started.append(update.id)
+                    self._track_task(session_id, update.id, agent_name)
+                if self.task_callback:
+                    self.task_callback(update, agent_card)
+
+            try:
+                result = await client.send_message_streaming(
+                    message_request=streaming_request,
+                    task_callback=track_task,
+                )
+            finally:
+                for task_id in started:
+                    self._untrack_task(session_id, task_id)
+            if not isinstance(result, Task):
+                logger.info('received non-task streaming response. Aborting get task ')
+                return None
+            logger.info(f"streamed task {result.model_dump_json(exclude_none=True, indent=2)}")
+            return result
+
         message_request = SendMessageRequest(
             id=message_id, params=MessageSendParams.model_validate(payload)
         )
         send_response: SendMessageResponse = await client.send_message(
-            message_request=message_request
+            message_request=message_request,
+            idempotent=client.get_agent().name in IDEMPOTENT_AGENTS,
         )
         logger.info(f"send_response {send_response.model_dump_json(exclude_none=True, indent=2)}")
 
@@ -324,15 +778,27 @@ class CoordinatorAgent:
         return send_response.root.result
 
 
-async def initialized_coordinator_agent() -> Agent:
-    global root_agent
+async def initialized_coordinator_agent(
+    task_callback: TaskUpdateCallback | None = None,
+) -> Agent:
+    global root_agent, coordinator
     if root_agent is None:
         coordinator_agent_instance = await CoordinatorAgent.create(
             remote_agent_addresses=[
-                VALIDATOR_AGENT_URL,
-                EMIAL_AUTOMATION_AGENT_URL
-            ]
+                VALIDATOR_AGENT_URLS,
+                EMIAL_AUTOMATION_AGENT_URLS
+            ],
+            task_callback=task_callback,
         )
         root_agent = coordinator_agent_instance.create_agent()
+        coordinator = coordinator_agent_instance
 
     return root_agent
+
+
+async def close_coordinator_agent() -> None:
+    """Release the coordinator built by `initialized_coordinator_agent`."""
+    global root_agent, coordinator
+    if coordinator is not None:
+        await coordinator.close()
+    root_agent = coordinator = None
@@ -0,0 +1,110 @@
+import asyncio, time
+
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+
+# Absolute deadline of the user request, as epoch seconds. The same key is
+# used in A2A message metadata and in ADK session state.
+DEADLINE_KEY = 'deadline'
+# Metadata of the final status of a task completed with partial results
+# because its deadline was reached.
+PARTIAL_KEY = 'partial'
+LOOP_ITERATION_KEY = 'loop_iteration_started'
+
+
+def new_deadline(timeout: float | None) -> float | None:
+    return time.time() + timeout if timeout else None
+
+
+def remaining_budget(deadline: float | None) -> float | None:
+    """Seconds left before the deadline, None when there is no deadline."""
+    if deadline is None:
+        return None
+    return max(float(deadline) - time.time(), 0.0)
+
+
+def state_remaining_budget(state: Any) -> float | None:
+    return remaining_budget(state.get(DEADLINE_KEY))
+
+
+def stop_loop_on_low_budget(min_iteration_budget: float):
+    """Build a `before_agent_callback` for the first sub-agent of a LoopAgent.
+
+    Before each iteration the remaining budget is compared to the duration
+    of the previous iteration (or `min_iteration_budget` for the first one).
+    When it is insufficient the loop is escalated, so the run ends with the
+    results of the last complete iteration instead of timing out.
+    """
+
+    def callback(callback_context: CallbackContext) -> types.Content | None:
+        state = callback_context.state
+        now = time.time()
+        previous = state.get(LOOP_ITERATION_KEY) or {}
+        started = None
+        if previous.get('invocation_id') == callback_context.invocation_id:
+            started = previous.get('started')
+        state[LOOP_ITERATION_KEY] = {
+            'invocation_id': callback_context.invocation_id,
+            'started': now,
+        }
+
+        remaining = state_remaining_budget(state)
+        if remaining is None:
+            return None
+        needed = max(now - started, min_iteration_budget) if started else min_iteration_budget
+        if remaining >= needed:
+            return None
+
+        callback_context.actions.escalate = True
+        return types.Content(
+            role='model',
+            parts=[types.Part.from_text(
+                text=f'Stopping refinement: {remaining:.0f}s left, an iteration needs about {needed:.0f}s.'
+            )],
+        )
+
+    return callback
+
+
+class DeadlineBoundTool(BaseTool):
+    """Runs a tool within the remaining budget of the request."""
+
+    def __init__(self, tool: BaseTool):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            is_long_running=tool.is_long_running,
+            custom_metadata=tool.custom_metadata,
+        )
+        self.tool = tool
+
+    def _get_declaration(self) -> types.FunctionDeclaration | None:
+        return self.tool._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        remaining = state_remaining_budget(tool_context.state)
+        if remaining is not None and remaining <= 0:
+            return {'STATUS': 'FAILURE', 'ERROR': 'Deadline exceeded before the tool call.'}
+        try:
+            return await asyncio.wait_for(
+                self.tool.run_async(args=args, tool_context=tool_context), remaining
+            )
+        except asyncio.TimeoutError:
+            return {'STATUS': 'FAILURE', 'ERROR': f'Tool call exceeded the remaining budget of {remaining:.0f}s.'}
+
+
+class DeadlineMcpToolset(McpToolset):
+    """McpToolset whose tool calls are bounded by the request deadline."""
+
+    async def get_tools(
+        self, readonly_context: ReadonlyContext | None = None
+    ) -> list[BaseTool]:
+        tools = await super().get_tools(readonly_context)
+        return [DeadlineBoundTool(tool) for tool in tools]
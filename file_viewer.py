@@ -0,0 +1,146 @@
+import fnmatch, os
+
+from dataclasses import dataclass
+
+
+# Bytes read per page of a file, and at most per follow-mode update
+PAGE_SIZE = 64 * 1024
+# Characters kept in the viewer while following a file
+MAX_VIEW_CHARS = 128 * 1024
+
+
+@dataclass
+class Page:
+    """Text of the bytes [start, end) of a file of `size` bytes."""
+
+    path: str
+    text: str
+    start: int
+    end: int
+    size: int
+
+
+def read_page(path: str, offset: int, page_size: int = PAGE_SIZE) -> Page:
+    """Page of a file from a byte offset, cut at line boundaries.
+
+    Only `page_size` bytes are read, whatever the size of the file. A line
+    longer than a page is returned cut rather than dropped.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        offset = min(max(offset, 0), size)
+        at_line_start = offset == 0
+        if not at_line_start:
+            f.seek(offset - 1)
+            at_line_start = f.read(1) == b'\n'
+        f.seek(offset)
+        data = f.read(page_size)
+
+    start, end = offset, offset + len(data)
+    if not at_line_start:
+        newline = data.find(b'\n')
+        if 0 <= newline < len(data) - 1:
+            data = data[newline + 1:]
+            start += newline + 1
+    if end < size:
+        newline = data.rfind(b'\n')
+        if newline != -1:
+            data = data[:newline + 1]
+            end = start + newline + 1
+    return Page(path, data.decode('utf-8', errors='replace'), start, end, size)
+
+
+def read_tail(path: str, page_size: int = PAGE_SIZE) -> Page:
+    return read_page(path, os.path.getsize(path) - page_size, page_size)
+
+
+def read_appended(page: Page, limit: int = PAGE_SIZE) -> Page | None:
+    """Bytes appended to the file of a page since it was read.
+
+    None when the file did not grow; a truncated or rotated file is read
+    again from its tail. A trailing partial line is left for the next call.
+    """
+    size = os.path.getsize(page.path)
+    if size == page.end:
+        return None
+    if size < page.end:
+        return read_tail(page.path, limit)
+    with open(page.path, 'rb') as f:
+        f.seek(page.end)
+        data = f.read(limit)
+    if len(data) < limit:
+        newline = data.rfind(b'\n')
+        if newline == -1:
+            return None
+        data = data[:newline + 1]
+    return Page(page.path, data.decode('utf-8', errors='replace'), page.end, page.end + len(data), size)
+
+
+def follow(page: Page, max_chars: int = MAX_VIEW_CHARS) -> Page | None:
+    """The page extended with the lines appended since, None without any.
+
+    Only the last `max_chars` characters are kept, starting with a whole line.
+    """
+    appended = read_appended(page)
+    if appended is None:
+        return None
+    if appended.start != page.end:
+        return appended
+    text = page.text + appended.text
+    if len(text) > max_chars:
+        cut = text.find('\n', len(text) - max_chars)
+        text = text[cut + 1:] if cut != -1 else text[-max_chars:]
+    # The start offset is only used to page backwards from the kept text
+    start = appended.end - len(text.encode('utf-8'))
+    return Page(page.path, text, max(start, 0), appended.end, appended.size)
+
+
+class DirectoryWatcher:
+    """Files of a directory tree, listed again only when it changes.
+
+    A check stats the directories of the last listing: creating, renaming or
+    deleting an entry changes the modification time of its directory, so
+    the tree is only walked again after such a change. `version` increases
+    on each change, so that every viewer can tell whether its list is stale.
+    """
+
+    def __init__(self, root: str, pattern: str = '*'):
+        self.root = root
+        self.pattern = pattern
+        self.version = 0
+        self._files: list[str] = []
+        self._directories: dict[str, int] = {}
+        self._scan()
+
+    def files(self) -> list[str]:
+        """Paths of the matching files, relative to the root."""
+        self.check()
+        return self._files
+
+    def check(self) -> int:
+        """Current version of the listing, after refreshing it if needed."""
+        for directory, mtime in self._directories.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    break
+            except OSError:
+                break
+        else:
+            if self._directories or not os.path.isdir(self.root):
+                return self.version
+        self._scan()
+        self.version += 1
+        return self.version
+
+    def _scan(self) -> None:
+        files, directories = [], {}
+        for directory, _, names in os.walk(self.root):
+            try:
+                directories[directory] = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            for name in names:
+                if fnmatch.fnmatch(name, self.pattern):
+                    files.append(os.path.relpath(os.path.join(directory, name), self.root))
+        self._files = sorted(files)
+        self._directories = directories
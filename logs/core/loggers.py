@@ -31,3 +31,9 @@ workflow_log = create_logger(
     filename="workflow.log",
     level=LOGGING_LEVEL,
 )
+
+batch_logger = create_logger(
+    name="batch",
+    filename="batch.log",
+    level=LOGGING_LEVEL,
+)
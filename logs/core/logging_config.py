@@ -41,9 +41,12 @@ def create_logger(
     if logger.handlers:
         return logger
 
+    # The file is only opened by the first record, so importing the
+    # loggers of every agent does not open all their files.
     file_handler = logging.FileHandler(
         LOG_DIR / filename,
-        encoding="utf-8"
+        encoding="utf-8",
+        delay=True,
     )
     file_handler.setFormatter(
         logging.Formatter(LOG_FORMAT, DATE_FORMAT)
@@ -62,7 +65,8 @@ def configure_adk_logging():
 
     handler = logging.FileHandler(
         LOG_DIR / "adk_plugin.log",
-        encoding="utf-8"
+        encoding="utf-8",
+        delay=True,
     )
     handler.setFormatter(
         logging.Formatter(LOG_FORMAT, DATE_FORMAT)
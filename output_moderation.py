@@ -0,0 +1,101 @@
+import asyncio, re
+
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from constants import OUTPUT_CHECK_CHUNK_SIZE
+
+
+# Chunks without a paragraph break are cut at the end of a sentence
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+class ChunkedOutputCheck:
+    """Policy check of a response chunk by chunk, while it is generated.
+
+    The text is cut at the first paragraph break after `chunk_size`
+    characters or, once twice that size is pending without one, at the
+    first sentence end after `chunk_size` characters. Each chunk is
+    checked in the background as soon as it is complete, one after the
+    other, so the checks overlap with the generation of the next chunks.
+    `check` returns whether a chunk is safe and the reasoning of the verdict.
+    """
+
+    def __init__(
+        self,
+        check: Callable[[str], Awaitable[tuple[bool, str]]],
+        chunk_size: int = OUTPUT_CHECK_CHUNK_SIZE,
+    ):
+        self.check = check
+        self.chunk_size = chunk_size
+        self.text = ''
+        self.rejection: str | None = None
+        self._cut = 0
+        self._checks: list[tuple[str, asyncio.Task]] = []
+
+    @property
+    def released(self) -> str:
+        """Text of the leading chunks already cleared."""
+        released = []
+        for chunk, check in self._checks:
+            if not check.done() or check.cancelled() or not check.result():
+                break
+            released.append(chunk)
+        return ''.join(released)
+
+    def feed(self, text: str) -> None:
+        """Add generated text, checking the chunks it completes."""
+        self.text += text
+        self._submit(final=False)
+
+    def finish(self, text: str) -> None:
+        """Complete the response with its full text, which extends the text fed."""
+        self.text = text
+        self._submit(final=True)
+
+    async def releases(self) -> AsyncIterator[str]:
+        """Released text after each chunk cleared, once the response is finished.
+
+        Stops at the first unsafe chunk, whose reasoning is in `rejection`.
+        """
+        released = ''
+        for chunk, check in self._checks:
+            if not await check:
+                return
+            released += chunk
+            yield released
+
+    def cancel(self) -> None:
+        for _, check in self._checks:
+            check.cancel()
+
+    def _submit(self, final: bool) -> None:
+        while (end := self._next_cut(final)) is not None:
+            chunk = self.text[self._cut:end]
+            previous = self._checks[-1][1] if self._checks else None
+            self._checks.append((chunk, asyncio.create_task(self._check_after(previous, chunk))))
+            self._cut = end
+
+    def _next_cut(self, final: bool) -> int | None:
+        pending = self.text[self._cut:]
+        if not pending:
+            return None
+        if len(pending) >= self.chunk_size:
+            paragraph_end = pending.find('\n\n', self.chunk_size)
+            if paragraph_end != -1:
+                return self._cut + paragraph_end + 2
+            if len(pending) >= 2 * self.chunk_size:
+                sentence_end = SENTENCE_END.search(pending, self.chunk_size)
+                if sentence_end:
+                    return self._cut + sentence_end.end()
+                # Without any sentence end, at least keep words whole
+                return self._cut + max(pending.rfind(' ', self.chunk_size) + 1, self.chunk_size)
+        return self._cut + len(pending) if final else None
+
+    async def _check_after(self, previous: asyncio.Task | None, chunk: str) -> bool:
+        # Chunks are checked in order, none after an unsafe one
+        if previous is not None and not await previous:
+            return False
+        safe, reasoning = await self.check(chunk)
+        if not safe:
+            self.rejection = reasoning
+        return safe
@@ -0,0 +1,100 @@
+import asyncio, secrets, uvicorn
+
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from a2a.types import PushNotificationConfig, Task, TaskState
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+
+# States after which a task will not make progress without a new message
+TERMINAL_STATES = {
+    TaskState.completed,
+    TaskState.failed,
+    TaskState.canceled,
+    TaskState.rejected,
+    TaskState.input_required,
+    TaskState.auth_required,
+}
+
+NOTIFICATION_PATH = '/a2a/notifications'
+# Number of task snapshots kept for waiters registering after the notification
+LATEST_TASKS_SIZE = 1024
+
+
+class PushNotificationReceiver:
+    """Local HTTP endpoint receiving A2A push notifications.
+
+    Remote agents POST the task snapshot on every update of a task submitted
+    with this receiver's `PushNotificationConfig`; callers await the task
+    reaching a terminal state with `wait`.
+    """
+
+    def __init__(self, base_url: str, logger):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 80
+        self.url = f'{base_url.rstrip("/")}{NOTIFICATION_PATH}'
+        self.token = secrets.token_urlsafe(24)
+        self.logger = logger
+        self._waiters: dict[str, asyncio.Event] = {}
+        self._latest: OrderedDict[str, Task] = OrderedDict()
+        self._server: uvicorn.Server | None = None
+        self._serve_task: asyncio.Task | None = None
+
+    def config(self) -> PushNotificationConfig:
+        return PushNotificationConfig(url=self.url, token=self.token)
+
+    async def start(self) -> None:
+        app = Starlette(
+            routes=[Route(NOTIFICATION_PATH, self._handle, methods=['POST'])]
+        )
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host=self.host, port=self.port, log_level='warning')
+        )
+        self._serve_task = asyncio.create_task(self._server.serve())
+        self.logger.info(f'push notification receiver listening on {self.url}')
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            await self._serve_task
+
+    async def _handle(self, request: Request) -> Response:
+        if request.headers.get('X-A2A-Notification-Token') != self.token:
+            return Response(status_code=401)
+        try:
+            task = Task.model_validate(await request.json())
+        except Exception as e:
+            self.logger.error(f'invalid push notification payload: {e}')
+            return Response(status_code=400)
+
+        self._latest[task.id] = task
+        self._latest.move_to_end(task.id)
+        while len(self._latest) > LATEST_TASKS_SIZE:
+            self._latest.popitem(last=False)
+
+        if task.status.state in TERMINAL_STATES and task.id in self._waiters:
+            self._waiters[task.id].set()
+        return Response(status_code=200)
+
+    def latest(self, task_id: str) -> Task | None:
+        return self._latest.get(task_id)
+
+    async def wait(self, task_id: str, timeout: float) -> Task | None:
+        """Wait up to `timeout` seconds for a terminal notification of a task."""
+        task = self._latest.get(task_id)
+        if task is not None and task.status.state in TERMINAL_STATES:
+            return task
+
+        event = self._waiters.setdefault(task_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiters.pop(task_id, None)
+        return self._latest.get(task_id)
@@ -0,0 +1,27 @@
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+
+# Message metadata and session state key set when a follow-up message only
+# asks to refine the results of a previous turn of the same context.
+REFINE_KEY = 'refine'
+
+
+def reuse_cached_output(output_key: str):
+    """Build a `before_agent_callback` skipping an agent on refinements.
+
+    When the request is a refinement and the session already holds the
+    agent's output from a previous turn, the agent is not run again and
+    downstream agents keep reading the stored value.
+    """
+
+    def callback(callback_context: CallbackContext) -> types.Content | None:
+        state = callback_context.state
+        if not state.get(REFINE_KEY) or not state.get(output_key):
+            return None
+        return types.Content(
+            role='model',
+            parts=[types.Part.from_text(text=f'Reusing the {output_key} of the previous turn.')],
+        )
+
+    return callback
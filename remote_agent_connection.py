@@ -13,43 +13,388 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from collections.abc import Callable
+import asyncio, time, uuid
 
-import httpx, os
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+import httpx
 
 from a2a.client import A2AClient
+from a2a.client.errors import A2AClientError
+from a2a.client.client_task_manager import ClientTaskManager
 from a2a.types import (
     AgentCard,
+    CancelTaskRequest,
+    CancelTaskSuccessResponse,
+    GetTaskRequest,
+    GetTaskSuccessResponse,
+    JSONRPCErrorResponse,
+    Message,
     SendMessageRequest,
     SendMessageResponse,
+    SendMessageSuccessResponse,
+    SendStreamingMessageRequest,
     Task,
     TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskQueryParams,
     TaskStatusUpdateEvent,
 )
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
 
 
-TIMEOUT = int(os.getenv("TIMEOUT")) if os.getenv("TIMEOUT").isdecimal() else None
+from constants import TIMEOUT
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
+T = TypeVar('T')
+
+# Circuit breaker: a replica is ejected after this many consecutive failures
+# and gets a single trial request once the cooldown has elapsed. Failed
+# health checks are counted apart, with the same threshold.
+FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN = 30.0
+HEALTH_CHECK_INTERVAL = 10.0
+HEALTH_CHECK_TIMEOUT = 5.0
+# Number of task ids remembered to route follow-ups to the replica owning the task.
+TASK_AFFINITY_SIZE = 1024
+
+
+class NoHealthyReplicaError(Exception):
+    """Raised when every replica of a remote agent is ejected."""
+
+
+def is_connect_error(error: BaseException) -> bool:
+    """Whether a request failed before reaching the agent, so it was never run.
+
+    The A2A client wraps transport errors, so their causes are looked at too.
+    """
+    while error is not None:
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, ConnectionRefusedError)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class AgentReplica:
+    """One process serving a remote agent, with its circuit breaker state."""
+
+    def __init__(self, agent_card: AgentCard, url: str):
+        self.url = url.rstrip('/')
+        self._httpx_client = httpx.AsyncClient(timeout=TIMEOUT)
+        self.agent_client = A2AClient(self._httpx_client, agent_card, url=url)
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.trial_in_flight = False
+        # Health checks only tell whether the replica serves its agent card;
+        # they never close the breaker opened by failed calls.
+        self.probe_failures = 0
+
+    @property
+    def available(self) -> bool:
+        """Serving replica whose breaker is closed, or open with a trial allowed."""
+        if self.probe_failures >= FAILURE_THRESHOLD:
+            return False
+        if self.opened_at is None:
+            return True
+        cooled_down = time.monotonic() - self.opened_at >= BREAKER_COOLDOWN
+        return cooled_down and not self.trial_in_flight
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= FAILURE_THRESHOLD:
+            self.opened_at = time.monotonic()
+
+    async def close(self) -> None:
+        await self._httpx_client.aclose()
+
+    async def probe(self) -> bool:
+        """Fetch the agent card endpoint to check that the replica is serving."""
+        try:
+            response = await self._httpx_client.get(
+                f'{self.url}{AGENT_CARD_WELL_KNOWN_PATH}',
+                timeout=HEALTH_CHECK_TIMEOUT,
+            )
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
 
 class RemoteAgentConnections:
-    """A class to hold the connections to the remote agents."""
+    """A class to hold the connections to the remote agents.
+
+    A remote agent may be served by several replicas. Requests go to the
+    available replica with the fewest outstanding requests, replicas that
+    keep failing are ejected by a circuit breaker, and a background task
+    probes the agent card endpoint of each replica.
+    """
 
-    def __init__(self, agent_card: AgentCard, agent_url: str, logger: str):
+    def __init__(
+        self,
+        agent_card: AgentCard,
+        agent_url: str | list[str],
+        logger: str,
+        hedge_delay: float | None = None,
+    ):
+        agent_urls = [agent_url] if isinstance(agent_url, str) else agent_url
         logger.info(f'agent_card: {agent_card}')
-        logger.info(f'agent_url: {agent_url}')
-        self._httpx_client = httpx.AsyncClient(timeout=TIMEOUT)
-        self.agent_client = A2AClient(
-            self._httpx_client, agent_card, url=agent_url
-        )
+        logger.info(f'agent_urls: {agent_urls}')
+        self.replicas = [AgentReplica(agent_card, url) for url in agent_urls]
         self.card = agent_card
+        self.logger = logger
+        self.hedge_delay = hedge_delay
+        self._task_replicas: OrderedDict[str, AgentReplica] = OrderedDict()
+        self._health_task: asyncio.Task | None = None
 
     def get_agent(self) -> AgentCard:
         return self.card
 
+    def start_health_checks(self, interval: float = HEALTH_CHECK_INTERVAL) -> None:
+        if self._health_task is None and len(self.replicas) > 0:
+            self._health_task = asyncio.create_task(self._health_loop(interval))
+
+    async def close(self) -> None:
+        """Stop the health checks and close the connections of the replicas."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for replica in self.replicas:
+            await replica.close()
+
+    async def _health_loop(self, interval: float) -> None:
+        while True:
+            results = await asyncio.gather(*(r.probe() for r in self.replicas))
+            for replica, healthy in zip(self.replicas, results):
+                if healthy:
+                    if replica.probe_failures >= FAILURE_THRESHOLD:
+                        self.logger.info(f'replica {replica.url} of {self.card.name} serves its agent card again')
+                    replica.probe_failures = 0
+                    continue
+                replica.probe_failures += 1
+                if replica.probe_failures == FAILURE_THRESHOLD:
+                    self.logger.warning(
+                        f'ejecting replica {replica.url} of {self.card.name} after '
+                        f'{FAILURE_THRESHOLD} failed health checks'
+                    )
+            await asyncio.sleep(interval)
+
+    def _pick(self, exclude: tuple[AgentReplica, ...] = ()) -> AgentReplica:
+        candidates = [
+            r for r in self.replicas if r not in exclude and r.available
+        ]
+        if not candidates:
+            raise NoHealthyReplicaError(
+                f'No healthy replica available for {self.card.name}'
+            )
+        replica = min(candidates, key=lambda r: r.outstanding)
+        if replica.opened_at is not None:
+            replica.trial_in_flight = True
+        return replica
+
+    def _replica_for(self, task_id: str | None) -> AgentReplica | None:
+        """Replica owning a task, so that follow-ups reach the same process."""
+        if task_id and task_id in self._task_replicas:
+            self._task_replicas.move_to_end(task_id)
+            return self._task_replicas[task_id]
+        return None
+
+    def _remember_task(self, task_id: str | None, replica: AgentReplica) -> None:
+        if not task_id or len(self.replicas) < 2:
+            return
+        self._task_replicas[task_id] = replica
+        self._task_replicas.move_to_end(task_id)
+        while len(self._task_replicas) > TASK_AFFINITY_SIZE:
+            self._task_replicas.popitem(last=False)
+
+    @asynccontextmanager
+    async def _track(self, replica: AgentReplica):
+        replica.outstanding += 1
+        try:
+            yield replica
+        except (httpx.HTTPError, A2AClientError, OSError):
+            replica.record_failure()
+            if replica.opened_at is not None:
+                self.logger.warning(f'ejecting replica {replica.url} of {self.card.name}')
+            raise
+        else:
+            replica.record_success()
+        finally:
+            replica.outstanding -= 1
+
+    async def _call(
+        self,
+        call: Callable[[AgentReplica], Awaitable[T]],
+        task_id: str | None = None,
+        idempotent: bool = False,
+    ) -> T:
+        """Run a call on one replica, failing over once on transport errors.
+
+        A call that may have reached the agent, e.g. one that timed out while
+        reading the response, is only retried when it is idempotent: running
+        it twice could otherwise send an email twice.
+        """
+        pinned = self._replica_for(task_id)
+        replica = pinned or self._pick()
+        try:
+            async with self._track(replica):
+                return await call(replica)
+        except (httpx.HTTPError, A2AClientError, OSError) as e:
+            if pinned is not None or len(self.replicas) < 2:
+                raise
+            if not idempotent and not is_connect_error(e):
+                raise
+            self.logger.warning(f'retrying {self.card.name} call on another replica')
+            async with self._track(self._pick(exclude=(replica,))) as retry:
+                return await call(retry)
+
+    async def _hedged_call(self, call: Callable[[AgentReplica], Awaitable[T]]) -> T:
+        """Idempotent call: fire a second replica if the first is slow."""
+        primary = self._pick()
+        attempts = [asyncio.create_task(self._run_on(primary, call))]
+        done, _ = await asyncio.wait(attempts, timeout=self.hedge_delay)
+        if not done:
+            try:
+                backup = self._pick(exclude=(primary,))
+            except NoHealthyReplicaError:
+                backup = None
+            if backup is not None:
+                self.logger.info(f'hedging {self.card.name} call to {backup.url}')
+                attempts.append(asyncio.create_task(self._run_on(backup, call)))
+
+        pending = set(attempts)
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    error = attempt.exception()
+            raise error
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+
+    async def _run_on(
+        self, replica: AgentReplica, call: Callable[[AgentReplica], Awaitable[T]]
+    ) -> T:
+        async with self._track(replica):
+            return await call(replica)
+
     async def send_message(
-        self, message_request: SendMessageRequest
+        self, message_request: SendMessageRequest, idempotent: bool = False
     ) -> SendMessageResponse:
-        return await self.agent_client.send_message(message_request)
+        async def call(replica: AgentReplica) -> SendMessageResponse:
+            response = await replica.agent_client.send_message(message_request)
+            if isinstance(response.root, SendMessageSuccessResponse) and isinstance(
+                response.root.result, Task
+            ):
+                self._remember_task(response.root.result.id, replica)
+            return response
+
+        if idempotent and self.hedge_delay is not None and len(self.replicas) > 1:
+            return await self._hedged_call(call)
+        return await self._call(
+            call, task_id=message_request.params.message.task_id, idempotent=idempotent
+        )
+
+    async def get_task(
+        self, task_id: str, history_length: int | None = None
+    ) -> Task | None:
+        """Fetch the current snapshot of a task with `tasks/get`."""
+        request = GetTaskRequest(
+            id=str(uuid.uuid4()),
+            params=TaskQueryParams(id=task_id, history_length=history_length),
+        )
+        response = await self._call(
+            lambda replica: replica.agent_client.get_task(request),
+            task_id=task_id,
+            idempotent=True,
+        )
+        if not isinstance(response.root, GetTaskSuccessResponse):
+            self.logger.error(f'tasks/get failed on {self.card.name}: {response.root}')
+            return None
+        return response.root.result
+
+    async def cancel_task(self, task_id: str) -> Task | None:
+        """Ask the replica running a task to cancel it with `tasks/cancel`."""
+        request = CancelTaskRequest(
+            id=str(uuid.uuid4()), params=TaskIdParams(id=task_id)
+        )
+        response = await self._call(
+            lambda replica: replica.agent_client.cancel_task(request), task_id=task_id
+        )
+        if not isinstance(response.root, CancelTaskSuccessResponse):
+            self.logger.error(f'tasks/cancel failed on {self.card.name}: {response.root}')
+            return None
+        self.logger.info(f'task {task_id} canceled on {self.card.name}')
+        return response.root.result
+
+    async def send_message_streaming(
+        self,
+        message_request: SendStreamingMessageRequest,
+        task_callback: TaskUpdateCallback | None = None,
+    ) -> Task | Message | None:
+        """Send a message over `message/stream` and forward every update.
+
+        Each `Task`, `TaskStatusUpdateEvent` and `TaskArtifactUpdateEvent` is
+        handed to `task_callback` as soon as it arrives, and folded into the
+        task returned once the stream is closed. Streams are never hedged,
+        since the updates would reach the callback twice.
+        """
+        replica = self._replica_for(message_request.params.message.task_id) or self._pick()
+        task_manager = ClientTaskManager()
+        try:
+            async with self._track(replica):
+                async for response in replica.agent_client.send_message_streaming(
+                    message_request
+                ):
+                    if isinstance(response.root, JSONRPCErrorResponse):
+                        self.logger.error(
+                            f'streaming error from {self.card.name}: {response.root.error}'
+                        )
+                        return None
+
+                    event = response.root.result
+                    if isinstance(event, Message):
+                        return event
+
+                    await task_manager.process(event)
+                    self._remember_task(
+                        event.id if isinstance(event, Task) else event.task_id,
+                        replica,
+                    )
+                    if task_callback:
+                        task_callback(event, self.card)
+        except asyncio.CancelledError:
+            # The caller gave up: stop the remote run instead of letting it
+            # consume capacity for a result nobody will read.
+            task = task_manager.get_task()
+            if task is not None:
+                await asyncio.shield(self._cancel_quietly(task.id))
+            raise
+
+        return task_manager.get_task()
+
+    async def _cancel_quietly(self, task_id: str) -> None:
+        try:
+            await asyncio.wait_for(self.cancel_task(task_id), HEALTH_CHECK_TIMEOUT)
+        except Exception as e:
+            self.logger.error(f'failed to cancel task {task_id} on {self.card.name}: {e}')
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncGenerator
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import Client, types
+from pydantic import PrivateAttr
+
+
+# Number of API clients kept for the keys of recent requests
+API_CLIENT_CACHE_SIZE = 16
+
+
+@dataclass(frozen=True)
+class RequestConfig:
+    """Settings chosen by the user for one chat request."""
+
+    model: str
+    api_key: str
+    timeout: float
+
+
+# Configuration of the chat request being processed, read by the in-process
+# agents' models instead of the process environment.
+REQUEST_CONFIG: ContextVar[RequestConfig | None] = ContextVar("request_config", default=None)
+
+
+class RequestConfiguredGemini(Gemini):
+    """Gemini model using the model name and API key of the current request.
+
+    Outside of a request with a `REQUEST_CONFIG`, it behaves like Gemini,
+    with the agent's model and the API key of the environment.
+    """
+
+    _clients: OrderedDict[str, Client] = PrivateAttr(default_factory=OrderedDict)
+
+    @property
+    def api_client(self) -> Client:
+        config = REQUEST_CONFIG.get()
+        api_key = config.api_key if config else None
+        if api_key in self._clients:
+            self._clients.move_to_end(api_key)
+            return self._clients[api_key]
+
+        client = Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                headers=self._tracking_headers,
+                retry_options=self.retry_options,
+            ),
+        )
+        self._clients[api_key] = client
+        while len(self._clients) > API_CLIENT_CACHE_SIZE:
+            self._clients.popitem(last=False)
+        return client
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        config = REQUEST_CONFIG.get()
+        if config is not None and config.model:
+            llm_request.model = config.model
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
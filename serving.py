@@ -0,0 +1,52 @@
+import json, os, uvicorn
+
+from typing import Any, Callable
+
+from constants import SHUTDOWN_DRAIN_TIMEOUT
+
+
+# Environment variable handing the server options over to worker processes
+SERVER_OPTIONS_ENV = 'A2A_SERVER_OPTIONS'
+
+
+def server_options() -> dict[str, Any]:
+    """Options of the server, inside a worker process started by `serve`."""
+    return json.loads(os.environ[SERVER_OPTIONS_ENV])
+
+
+def serve(
+    factory: str,
+    build_app: Callable[..., Any],
+    host: str,
+    port: int,
+    workers: int = 1,
+    **options: Any,
+) -> None:
+    """Run an A2A agent server, in `workers` processes sharing the port.
+
+    With a single worker the app is built in this process. Otherwise each
+    worker imports `factory` ("module:function"), which must build the same
+    app from `server_options()`. `build_app` receives the host, port,
+    number of workers and `options` as keyword arguments. On shutdown,
+    in-flight requests get SHUTDOWN_DRAIN_TIMEOUT seconds to complete.
+    """
+    if workers <= 1:
+        uvicorn.run(
+            build_app(host=host, port=port, workers=1, **options),
+            host=host,
+            port=port,
+            timeout_graceful_shutdown=SHUTDOWN_DRAIN_TIMEOUT,
+        )
+        return
+
+    os.environ[SERVER_OPTIONS_ENV] = json.dumps(
+        {'host': host, 'port': port, 'workers': workers, **options}
+    )
+    uvicorn.run(
+        factory,
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=SHUTDOWN_DRAIN_TIMEOUT,
+    )
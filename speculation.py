@@ -0,0 +1,27 @@
+import asyncio
+
+from contextvars import ContextVar
+from typing import Any
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+
+# Resolved once the input of the chat request being processed is cleared by
+# the policy check, cancelled when it is unsafe. Only set while the
+# coordinator runs speculatively, concurrently with that check.
+INPUT_CLEARED: ContextVar[asyncio.Future | None] = ContextVar('input_cleared', default=None)
+
+
+async def hold_until_input_cleared(
+    tool: BaseTool, args: dict[str, Any], tool_context: ToolContext
+) -> dict | None:
+    """`before_tool_callback` holding the side effects of a speculative run.
+
+    Tools only run once the input is cleared, so no task is delegated to a
+    remote agent (nor any email sent) for an unsafe message.
+    """
+    cleared = INPUT_CLEARED.get()
+    if cleared is not None:
+        await asyncio.shield(cleared)
+    return None
@@ -0,0 +1,725 @@
+import asyncio, json, logging, os, re, sqlite3, time, uuid, zlib
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Task
+from google.adk.artifacts.base_artifact_service import ArtifactVersion, BaseArtifactService
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.memory.base_memory_service import BaseMemoryService, SearchMemoryResponse
+from google.adk.memory.memory_entry import MemoryEntry
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import (
+    BaseSessionService,
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+from google.adk.sessions.state import State
+from google.genai import types
+
+from constants import (
+    SESSION_MAX_EVENTS,
+    STORAGE_CACHE_SIZE,
+    STORAGE_DIR,
+    STORAGE_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Writes are flushed in one transaction after this many seconds, or as soon
+# as this many keys are pending.
+FLUSH_INTERVAL = 0.05
+FLUSH_BATCH_SIZE = 256
+# Seconds before a failed background flush is retried
+FLUSH_RETRY_DELAY = 1
+# Expired rows are purged at most this often, in seconds
+EVICTION_INTERVAL = 60
+# Encoded values larger than this many bytes are stored zlib compressed
+COMPRESSION_THRESHOLD = 4096
+# Events a session may hold above its limit before they are trimmed, so that
+# the keys of a session are listed once every this many appends, and number
+# of sessions whose event count is tracked
+EVENT_TRIM_SLACK = 32
+EVENT_COUNTS_SIZE = 4096
+
+_DELETED = object()
+
+
+def default_db_path(name: str) -> str | None:
+    """Database of an agent server under STORAGE_DIR, None when it is unset."""
+    if not STORAGE_DIR:
+        return None
+    return os.path.join(STORAGE_DIR, f'{name}.db')
+
+
+class SqliteStorage:
+    """Durable key-value store shared by the SQLite backed agent services.
+
+    Values live in a single WAL mode table keyed by (namespace, key). Writes
+    are buffered and flushed in batches, each batch in one transaction on a
+    dedicated thread, so the event loop never waits on the disk. Large
+    values are compressed, every row expires `ttl` seconds after its last
+    write, and the most recently used decoded values are kept in a bounded
+    LRU hot tier. Memory use is therefore bounded by `cache_size` and
+    `FLUSH_BATCH_SIZE`, whatever the traffic.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float | None = STORAGE_TTL,
+        cache_size: int = STORAGE_CACHE_SIZE,
+        shared: bool = False,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.shared = shared
+        # When several processes write the database the hot tier is not
+        # used, so that reads see the writes of the other processes.
+        self.cache_size = 0 if shared else cache_size
+        self._codecs: dict[str, tuple[Callable[[Any], str], Callable[[str], Any]]] = {}
+        self._cache: OrderedDict[tuple[str, str], tuple[Any, float | None]] = OrderedDict()
+        # Writes waiting for the next flush, and those of the flush in progress
+        self._pending: dict[tuple[str, str], tuple[Any, float | None]] = {}
+        self._flushing: dict[tuple[str, str], tuple[Any, float | None]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-storage')
+        self._connection: sqlite3.Connection | None = None
+        self._last_eviction = 0.0
+
+    def register(self, namespace: str, encode: Callable[[Any], str], decode: Callable[[str], Any]) -> None:
+        """Set how the values of a namespace are serialized, JSON by default."""
+        self._codecs[namespace] = (encode, decode)
+
+    # Database thread
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA busy_timeout=5000')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS kv ('
+                ' namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,'
+                ' compressed INTEGER NOT NULL, expires_at REAL,'
+                ' PRIMARY KEY (namespace, key))'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at)')
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _select(self, namespace: str, key: str, now: float):
+        return self._db().execute(
+            'SELECT value, compressed, expires_at FROM kv'
+            ' WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)',
+            (namespace, key, now),
+        ).fetchone()
+
+    def _select_keys(self, namespace: str, prefix: str, now: float) -> list[str]:
+        rows = self._db().execute(
+            'SELECT key FROM kv WHERE namespace = ? AND key >= ? AND key < ?'
+            ' AND (expires_at IS NULL OR expires_at > ?)',
+            (namespace, prefix, prefix + '\uffff', now),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _select_items(self, namespace: str, prefix: str, now: float) -> list[tuple[str, bytes, int]]:
+        return self._db().execute(
+            'SELECT key, value, compressed FROM kv WHERE namespace = ? AND key >= ? AND key < ?'
+            ' AND (expires_at IS NULL OR expires_at > ?)',
+            (namespace, prefix, prefix + '\uffff', now),
+        ).fetchall()
+
+    def _write(self, rows: list[tuple[str, str, str | None, float | None]], now: float) -> None:
+        upserts, deletes = [], []
+        for namespace, key, text, expires_at in rows:
+            if text is None:
+                deletes.append((namespace, key))
+                continue
+            data = text.encode('utf-8')
+            compressed = len(data) > COMPRESSION_THRESHOLD
+            if compressed:
+                data = zlib.compress(data)
+            upserts.append((namespace, key, data, int(compressed), expires_at))
+
+        db = self._db()
+        with db:
+            if upserts:
+                db.executemany(
+                    'INSERT INTO kv (namespace, key, value, compressed, expires_at)'
+                    ' VALUES (?, ?, ?, ?, ?) ON CONFLICT (namespace, key) DO UPDATE SET'
+                    ' value = excluded.value, compressed = excluded.compressed,'
+                    ' expires_at = excluded.expires_at',
+                    upserts,
+                )
+            if deletes:
+                db.executemany('DELETE FROM kv WHERE namespace = ? AND key = ?', deletes)
+            if now - self._last_eviction > EVICTION_INTERVAL:
+                db.execute('DELETE FROM kv WHERE expires_at <= ?', (now,))
+                self._last_eviction = now
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    # Event loop
+
+    def _encode(self, namespace: str, value: Any) -> str:
+        encode = self._codecs.get(namespace, (json.dumps, json.loads))[0]
+        return encode(value)
+
+    def _decode(self, namespace: str, text: str) -> Any:
+        decode = self._codecs.get(namespace, (json.dumps, json.loads))[1]
+        return decode(text)
+
+    def _load(self, namespace: str, data: bytes, compressed: int) -> Any:
+        if compressed:
+            data = zlib.decompress(data)
+        return self._decode(namespace, data.decode('utf-8'))
+
+    def _expires_at(self) -> float | None:
+        return time.time() + self.ttl if self.ttl else None
+
+    def _remember(self, item: tuple[str, str], value: Any, expires_at: float | None) -> None:
+        if not self.cache_size:
+            return
+        self._cache[item] = (value, expires_at)
+        self._cache.move_to_end(item)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _buffered(self, item: tuple[str, str]):
+        """Value of a write not flushed yet, `_DELETED` for a pending delete."""
+        for buffer in (self._pending, self._flushing):
+            if item in buffer:
+                return buffer[item][0]
+        return None
+
+    async def get(self, namespace: str, key: str) -> Any:
+        """The value of a key, None when it is missing or expired.
+
+        Values may be shared with the hot tier, callers must copy them
+        before mutating them.
+        """
+        item = (namespace, key)
+        value = self._buffered(item)
+        if value is not None:
+            return None if value is _DELETED else value
+
+        now = time.time()
+        cached = self._cache.get(item)
+        if cached is not None:
+            value, expires_at = cached
+            if expires_at is None or expires_at > now:
+                self._cache.move_to_end(item)
+                return value
+            del self._cache[item]
+
+        row = await self._run(self._select, namespace, key, now)
+        if row is None:
+            return None
+        data, compressed, expires_at = row
+        value = self._load(namespace, data, compressed)
+        self._remember(item, value, expires_at)
+        return value
+
+    async def put(self, namespace: str, key: str, value: Any) -> None:
+        item = (namespace, key)
+        expires_at = self._expires_at()
+        self._pending[item] = (value, expires_at)
+        self._remember(item, value, expires_at)
+        self._schedule_flush()
+
+    async def delete(self, namespace: str, key: str) -> None:
+        item = (namespace, key)
+        self._pending[item] = (_DELETED, None)
+        self._cache.pop(item, None)
+        self._schedule_flush()
+
+    async def keys(self, namespace: str, prefix: str = '') -> list[str]:
+        """Sorted live keys of a namespace starting with `prefix`."""
+        keys = set(await self._run(self._select_keys, namespace, prefix, time.time()))
+        for buffer in (self._flushing, self._pending):
+            for (item_namespace, key), (value, _) in buffer.items():
+                if item_namespace != namespace or not key.startswith(prefix):
+                    continue
+                if value is _DELETED:
+                    keys.discard(key)
+                else:
+                    keys.add(key)
+        return sorted(keys)
+
+    async def items(self, namespace: str, prefix: str = '') -> list[tuple[str, Any]]:
+        """Sorted (key, value) pairs of a namespace whose key starts with `prefix`.
+
+        The values are read in one query and bypass the hot tier. Values of
+        writes not flushed yet are shared with the buffer, callers must copy
+        them before mutating them.
+        """
+        rows = await self._run(self._select_items, namespace, prefix, time.time())
+        values = {key: self._load(namespace, data, compressed) for key, data, compressed in rows}
+        for buffer in (self._flushing, self._pending):
+            for (item_namespace, key), (value, _) in buffer.items():
+                if item_namespace != namespace or not key.startswith(prefix):
+                    continue
+                if value is _DELETED:
+                    values.pop(key, None)
+                else:
+                    values[key] = value
+        return sorted(values.items(), key=lambda item: item[0])
+
+    def _schedule_flush(self) -> None:
+        if self._flusher is not None and not self._flusher.done():
+            if len(self._pending) < FLUSH_BATCH_SIZE:
+                return
+        self._flusher = asyncio.create_task(
+            self._flush_later(0 if len(self._pending) >= FLUSH_BATCH_SIZE else FLUSH_INTERVAL)
+        )
+
+    async def _flush_later(self, delay: float) -> None:
+        """Flush after `delay` seconds, retrying until the writes are stored."""
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.flush()
+                return
+            except Exception:
+                logger.exception(f'Flush of {self.path} failed, retrying in {FLUSH_RETRY_DELAY}s')
+                delay = FLUSH_RETRY_DELAY
+
+    async def flush(self) -> None:
+        """Write the pending values in a single transaction."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            self._flushing, self._pending = self._pending, {}
+            try:
+                rows = [
+                    (namespace, key, None if value is _DELETED else self._encode(namespace, value), expires_at)
+                    for (namespace, key), (value, expires_at) in self._flushing.items()
+                ]
+                await self._run(self._write, rows, time.time())
+            except Exception:
+                # Keep the batch for the next flush, newer writes take precedence
+                self._flushing.update(self._pending)
+                self._pending = self._flushing
+                raise
+            finally:
+                self._flushing = {}
+
+    async def close(self) -> None:
+        await self.flush()
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+
+class SqliteTaskStore(TaskStore):
+    """A2A task store persisted in a SqliteStorage."""
+
+    NAMESPACE = 'task'
+
+    def __init__(self, storage: SqliteStorage):
+        self.storage = storage
+        storage.register(self.NAMESPACE, lambda task: task.model_dump_json(), Task.model_validate_json)
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        await self.storage.put(self.NAMESPACE, task.id, task.model_copy(deep=True))
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        task = await self.storage.get(self.NAMESPACE, task_id)
+        return task.model_copy(deep=True) if task else None
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        await self.storage.delete(self.NAMESPACE, task_id)
+
+
+def split_state_delta(state: dict[str, Any] | None) -> dict[str, dict[str, Any]]:
+    """Split a state dict into its app, user and session scoped parts."""
+    deltas = {'app': {}, 'user': {}, 'session': {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            deltas['app'][key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            deltas['user'][key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            deltas['session'][key] = value
+    return deltas
+
+
+class SqliteSessionService(BaseSessionService):
+    """ADK session service persisted in a SqliteStorage.
+
+    Behaves like InMemorySessionService, except that only the
+    `max_events` most recent events of a session are kept. Each event is a
+    row of its own, keyed by the session, its timestamp and its id, so
+    appending one writes only that event, and workers appending to the
+    same session do not overwrite each other's events.
+    """
+
+    SESSIONS = 'session'
+    EVENTS = 'session_event'
+    APP_STATE = 'app_state'
+    USER_STATE = 'user_state'
+
+    def __init__(self, storage: SqliteStorage, max_events: int | None = SESSION_MAX_EVENTS):
+        self.storage = storage
+        self.max_events = max_events
+        # Stored events of the recently appended sessions, by session key
+        self._event_counts: OrderedDict[str, int] = OrderedDict()
+        storage.register(self.SESSIONS, lambda session: session.model_dump_json(), Session.model_validate_json)
+        storage.register(self.EVENTS, lambda event: event.model_dump_json(), Event.model_validate_json)
+
+    @staticmethod
+    def _event_key(session_key: str, event: Event) -> str:
+        return f'{session_key}/{event.timestamp:017.6f}/{event.id}'
+
+    async def _update_state(self, namespace: str, key: str, delta: dict[str, Any]) -> None:
+        if not delta:
+            return
+        state = dict(await self.storage.get(namespace, key) or {})
+        state.update(delta)
+        await self.storage.put(namespace, key, state)
+
+    async def _trim_events(self, key: str) -> None:
+        """Drop the oldest events of a session beyond `max_events`.
+
+        The events are counted as they are appended, and the keys of the
+        session are only listed when the count is unknown or exceeds the
+        limit by EVENT_TRIM_SLACK.
+        """
+        count = self._event_counts.pop(key, None)
+        if count is not None:
+            count += 1
+        if count is None or count > self.max_events + EVENT_TRIM_SLACK:
+            event_keys = await self.storage.keys(self.EVENTS, f'{key}/')
+            for event_key in event_keys[:-self.max_events]:
+                await self.storage.delete(self.EVENTS, event_key)
+            count = min(len(event_keys), self.max_events)
+        self._event_counts[key] = count
+        while len(self._event_counts) > EVENT_COUNTS_SIZE:
+            self._event_counts.popitem(last=False)
+
+    async def _merge_state(self, session: Session) -> Session:
+        app_state = await self.storage.get(self.APP_STATE, session.app_name) or {}
+        user_state = await self.storage.get(self.USER_STATE, f'{session.app_name}/{session.user_id}') or {}
+        for key, value in app_state.items():
+            session.state[State.APP_PREFIX + key] = value
+        for key, value in user_state.items():
+            session.state[State.USER_PREFIX + key] = value
+        return session
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        key = f'{app_name}/{user_id}/{session_id}'
+        if await self.storage.get(self.SESSIONS, key) is not None:
+            raise AlreadyExistsError(f'Session with id {session_id} already exists.')
+
+        deltas = split_state_delta(state)
+        await self._update_state(self.APP_STATE, app_name, deltas['app'])
+        await self._update_state(self.USER_STATE, f'{app_name}/{user_id}', deltas['user'])
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=deltas['session'],
+            last_update_time=time.time(),
+        )
+        await self.storage.put(self.SESSIONS, key, session)
+        return await self._merge_state(session.model_copy(deep=True))
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = f'{app_name}/{user_id}/{session_id}'
+        session = await self.storage.get(self.SESSIONS, key)
+        if session is None:
+            return None
+        session = session.model_copy(deep=True)
+        events = [event for _, event in await self.storage.items(self.EVENTS, f'{key}/')]
+        if self.max_events:
+            events = events[-self.max_events:]
+        if config:
+            if config.num_recent_events:
+                events = events[-config.num_recent_events:]
+            if config.after_timestamp:
+                events = [event for event in events if event.timestamp >= config.after_timestamp]
+        session.events = [event.model_copy(deep=True) for event in events]
+        return await self._merge_state(session)
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        prefix = f'{app_name}/{user_id}/' if user_id is not None else f'{app_name}/'
+        sessions = []
+        for key in await self.storage.keys(self.SESSIONS, prefix):
+            session = await self.storage.get(self.SESSIONS, key)
+            if session is None:
+                continue
+            session = session.model_copy(update={'events': []}, deep=True)
+            sessions.append(await self._merge_state(session))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        key = f'{app_name}/{user_id}/{session_id}'
+        await self.storage.delete(self.SESSIONS, key)
+        self._event_counts.pop(key, None)
+        for event_key in await self.storage.keys(self.EVENTS, f'{key}/'):
+            await self.storage.delete(self.EVENTS, event_key)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        key = f'{session.app_name}/{session.user_id}/{session.id}'
+        stored = await self.storage.get(self.SESSIONS, key)
+        if stored is None:
+            return event
+        await self.storage.put(self.EVENTS, self._event_key(key, event), event.model_copy(deep=True))
+        if self.max_events:
+            await self._trim_events(key)
+
+        # The stored session only holds the state, and is shared with the hot tier
+        stored = stored.model_copy(update={'state': dict(stored.state)})
+        stored.last_update_time = event.timestamp
+        if event.actions and event.actions.state_delta:
+            deltas = split_state_delta(event.actions.state_delta)
+            await self._update_state(self.APP_STATE, session.app_name, deltas['app'])
+            await self._update_state(
+                self.USER_STATE, f'{session.app_name}/{session.user_id}', deltas['user']
+            )
+            stored.state.update(deltas['session'])
+        await self.storage.put(self.SESSIONS, key, stored)
+        return event
+
+
+class SqliteArtifactService(BaseArtifactService):
+    """Versioned ADK artifacts persisted in a SqliteStorage.
+
+    Each version is a separate key `<app>/<user>/<session|user>/<filename>/<version>`.
+    """
+
+    NAMESPACE = 'artifact'
+
+    def __init__(self, storage: SqliteStorage):
+        self.storage = storage
+
+    @staticmethod
+    def _scope(app_name: str, user_id: str, session_id: str | None, user_scoped: bool) -> str:
+        if user_scoped:
+            return f'{app_name}/{user_id}/user/'
+        if session_id is None:
+            raise ValueError('Session ID must be provided for session-scoped artifacts.')
+        return f'{app_name}/{user_id}/{session_id}/'
+
+    def _path(self, app_name: str, user_id: str, filename: str, session_id: str | None) -> str:
+        scope = self._scope(app_name, user_id, session_id, filename.startswith('user:'))
+        return f'{scope}{filename}/'
+
+    async def _entries(self, app_name, user_id, filename, session_id) -> list[tuple[int, dict]]:
+        path = self._path(app_name, user_id, filename, session_id)
+        entries = []
+        for key in await self.storage.keys(self.NAMESPACE, path):
+            version = key.removeprefix(path)
+            if not version.isdigit():
+                continue
+            entry = await self.storage.get(self.NAMESPACE, key)
+            if entry is not None:
+                entries.append((int(version), entry))
+        return sorted(entries, key=lambda entry: entry[0])
+
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: types.Part,
+        session_id: Optional[str] = None,
+        custom_metadata: Optional[dict[str, Any]] = None,
+    ) -> int:
+        path = self._path(app_name, user_id, filename, session_id)
+        versions = await self.list_versions(
+            app_name=app_name, user_id=user_id, filename=filename, session_id=session_id
+        )
+        version = versions[-1] + 1 if versions else 0
+        if artifact.inline_data is not None:
+            mime_type = artifact.inline_data.mime_type
+        elif artifact.text is not None:
+            mime_type = 'text/plain'
+        elif artifact.file_data is not None:
+            mime_type = artifact.file_data.mime_type
+        else:
+            raise ValueError('Not supported artifact type.')
+
+        await self.storage.put(self.NAMESPACE, f'{path}{version}', {
+            'part': artifact.model_dump(mode='json', exclude_none=True),
+            'version': ArtifactVersion(
+                version=version,
+                canonical_uri=f'sqlite://{path}{version}',
+                custom_metadata=custom_metadata or {},
+                mime_type=mime_type,
+            ).model_dump(mode='json'),
+        })
+        return version
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[types.Part]:
+        if version is None:
+            entries = await self._entries(app_name, user_id, filename, session_id)
+            entry = entries[-1][1] if entries else None
+        else:
+            path = self._path(app_name, user_id, filename, session_id)
+            entry = await self.storage.get(self.NAMESPACE, f'{path}{version}')
+        if entry is None:
+            return None
+        return types.Part.model_validate(entry['part'])
+
+    async def list_artifact_keys(
+        self, *, app_name: str, user_id: str, session_id: Optional[str] = None
+    ) -> list[str]:
+        scopes = [self._scope(app_name, user_id, None, True)]
+        if session_id:
+            scopes.append(self._scope(app_name, user_id, session_id, False))
+        filenames = set()
+        for scope in scopes:
+            for key in await self.storage.keys(self.NAMESPACE, scope):
+                filenames.add(key.removeprefix(scope).rsplit('/', 1)[0])
+        return sorted(filenames)
+
+    async def delete_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> None:
+        path = self._path(app_name, user_id, filename, session_id)
+        for key in await self.storage.keys(self.NAMESPACE, path):
+            await self.storage.delete(self.NAMESPACE, key)
+
+    async def list_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> list[int]:
+        path = self._path(app_name, user_id, filename, session_id)
+        keys = await self.storage.keys(self.NAMESPACE, path)
+        return sorted(int(key.removeprefix(path)) for key in keys if key.removeprefix(path).isdigit())
+
+    async def list_artifact_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> list[ArtifactVersion]:
+        entries = await self._entries(app_name, user_id, filename, session_id)
+        return [ArtifactVersion.model_validate(entry['version']) for _, entry in entries]
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[ArtifactVersion]:
+        versions = await self.list_artifact_versions(
+            app_name=app_name, user_id=user_id, filename=filename, session_id=session_id
+        )
+        if not versions:
+            return None
+        if version is None:
+            return versions[-1]
+        return next((item for item in versions if item.version == version), None)
+
+
+def _words(text: str) -> set[str]:
+    return {word.lower() for word in re.findall(r'[A-Za-z]+', text)}
+
+
+class SqliteMemoryService(BaseMemoryService):
+    """Keyword search memory persisted in a SqliteStorage.
+
+    Like InMemoryMemoryService, a session added to memory replaces its
+    previous copy; only the events with text are stored.
+    """
+
+    NAMESPACE = 'memory'
+
+    def __init__(self, storage: SqliteStorage):
+        self.storage = storage
+
+    async def add_session_to_memory(self, session: Session) -> None:
+        events = []
+        for event in session.events:
+            text = ' '.join(part.text for part in (event.content.parts if event.content else None) or [] if part.text)
+            if text:
+                events.append({
+                    'author': event.author,
+                    'timestamp': event.timestamp,
+                    'content': event.content.model_dump(mode='json', exclude_none=True),
+                    'text': text,
+                })
+        await self.storage.put(
+            self.NAMESPACE, f'{session.app_name}/{session.user_id}/{session.id}', events
+        )
+
+    async def search_memory(
+        self, *, app_name: str, user_id: str, query: str
+    ) -> SearchMemoryResponse:
+        words_in_query = _words(query)
+        response = SearchMemoryResponse()
+        for key in await self.storage.keys(self.NAMESPACE, f'{app_name}/{user_id}/'):
+            for event in await self.storage.get(self.NAMESPACE, key) or []:
+                if words_in_query & _words(event['text']):
+                    response.memories.append(
+                        MemoryEntry(
+                            content=types.Content.model_validate(event['content']),
+                            author=event['author'],
+                            timestamp=datetime.fromtimestamp(event['timestamp']).isoformat(),
+                        )
+                    )
+        return response
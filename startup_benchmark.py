@@ -0,0 +1,85 @@
+import os, subprocess, sys
+
+import click
+
+
+# Import time budgets, in milliseconds, of the modules loaded at the start of
+# the agent processes. They are imported without any credential, so they
+# must not build agents, toolsets or model clients at import time.
+IMPORT_BUDGETS_MS = {
+    'constants': 150,
+    'logs.core.loggers': 200,
+    'Data_Agent.data_agent': 200,
+    'Business_Agent.business_agent': 200,
+    'Automation_Agent.automation_agent': 200,
+    'Validator_Agent.validator_agent': 200,
+    'Policy_Enforcer.policy_enforcement_agent': 200,
+    'Policy_Enforcer.rule_engine': 250,
+    'file_viewer': 100,
+}
+# Variables removed from the environment of the measured imports
+CREDENTIALS = ('GOOGLE_API_KEY', 'TIMEOUT')
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(report: str) -> list[tuple[int, int, int, str]]:
+    """(depth, self us, cumulative us, module) of each line of a -X importtime report."""
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((depth, int(self_us), int(cumulative_us), name.strip()))
+    return imports
+
+
+def measure_import(module: str) -> tuple[float, list[tuple[int, str]]]:
+    """Import time of a module in a fresh interpreter, in ms, and its imports by self time."""
+    env = {k: v for k, v in os.environ.items() if k not in CREDENTIALS}
+    env['PYTHONPATH'] = ROOT
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        raise click.ClickException(f'import {module} failed:\n{process.stderr.splitlines()[-1]}')
+
+    imports = parse_importtime(process.stderr)
+    # The module and its parent packages are the top level entries of its chain;
+    # what they import is nested below them.
+    chain = {'.'.join(module.split('.')[:i]) for i in range(1, module.count('.') + 2)}
+    total = sum(cumulative for depth, _, cumulative, name in imports if depth == 0 and name in chain)
+    # Interpreter startup imports come first, at the top level too
+    start = max((i + 1 for i, (depth, _, _, name) in enumerate(imports) if depth == 0 and name not in chain), default=0)
+    heaviest = sorted(((self_us, name) for _, self_us, _, name in imports[start:]), reverse=True)
+    return total / 1000, heaviest
+
+
+@click.command()
+@click.argument('modules', nargs=-1)
+@click.option('--runs', default=5, help='Imports measured per module, the fastest one is kept.')
+@click.option('--top', default=5, help='Slowest imports listed per module.')
+def main(modules, runs, top):
+    """Measure the import time of the agent modules against their budgets.
+
+    Each module is imported in a fresh interpreter with `python -X importtime`
+    and without credentials. Exits with an error when a module fails to
+    import or exceeds its budget in IMPORT_BUDGETS_MS.
+    """
+    over_budget = []
+    for module in modules or IMPORT_BUDGETS_MS:
+        elapsed, heaviest = min((measure_import(module) for _ in range(runs)), key=lambda m: m[0])
+        budget = IMPORT_BUDGETS_MS.get(module)
+        within = budget is None or elapsed <= budget
+        if not within:
+            over_budget.append(module)
+        click.echo(f"{module}: {elapsed:.1f} ms (budget {budget or '-'} ms){'' if within else ' OVER BUDGET'}")
+        for self_us, name in heaviest[:top]:
+            click.echo(f'    {self_us / 1000:8.1f} ms  {name}')
+    if over_budget:
+        raise click.ClickException(f"Over budget: {', '.join(over_budget)}")
+
+
+if __name__ == '__main__':
+    main()
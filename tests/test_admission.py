@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+def run(scenario):
+    return asyncio.run(scenario())
+
+
+def test_admits_up_to_max_concurrency_then_queues():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=2, max_queue=4)
+        tickets = [admission.enqueue() for _ in range(3)]
+        return [t.future.done() for t in tickets], admission.active, admission.depth
+
+    assert run(scenario) == ([True, True, False], 2, 1)
+
+
+def test_release_admits_interactive_before_batch_and_fifo_within_a_class():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=4)
+        admission.enqueue()
+        first_batch = admission.enqueue('batch')
+        second_batch = admission.enqueue('batch')
+        interactive = admission.enqueue('interactive')
+        positions = [admission.position(t) for t in (interactive, first_batch, second_batch)]
+        admitted = []
+        for _ in range(3):
+            admission.release(1.0)
+            admitted.append(next(
+                name for name, t in (('interactive', interactive), ('first', first_batch), ('second', second_batch))
+                if t.future.done() and name not in admitted
+            ))
+        return positions, admitted
+
+    assert run(scenario) == ([1, 2, 3], ['interactive', 'first', 'second'])
+
+
+def test_full_queue_rejects_requests_that_do_not_outrank_a_queued_one():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=1)
+        admission.enqueue()
+        admission.enqueue('interactive')
+        admission.enqueue('batch')
+
+    with pytest.raises(AdmissionRejected):
+        run(scenario)
+
+
+def test_full_queue_rejects_a_queued_batch_request_for_an_interactive_one():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=1)
+        admission.enqueue()
+        batch = admission.enqueue('batch')
+        interactive = admission.enqueue('interactive')
+        return isinstance(batch.future.exception(), AdmissionRejected), admission.position(interactive)
+
+    assert run(scenario) == (True, 1)
+
+
+def test_closed_controller_rejects_with_a_retry_hint():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=2, max_queue=2)
+        admission.closed = True
+        admission.enqueue()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        run(scenario)
+    assert rejected.value.retry_after > 0
+
+
+def test_withdraw_frees_the_queue_place_or_the_run_slot():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=2)
+        running = admission.enqueue()
+        queued = admission.enqueue()
+        admission.withdraw(queued)
+        depth = admission.depth
+        admission.withdraw(running)
+        return depth, admission.active
+
+    assert run(scenario) == (0, 0)
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('gradio')
+pytest.importorskip('a2a')
+
+from a2a.types import TaskState, TaskStatus, TaskStatusUpdateEvent
+from chat_rendering import ChatTranscript, truncate
+
+AGENT = SimpleNamespace(name='Data Agent')
+
+
+def titles(messages):
+    return [(message.metadata or {}).get('title') for message in messages]
+
+
+def status(state, task_id='t1'):
+    return TaskStatusUpdateEvent(
+        task_id=task_id, context_id='c1', status=TaskStatus(state=state), final=False
+    )
+
+
+def test_truncate_cuts_at_a_line_end_and_counts_the_rest():
+    text = 'line one\nline two\nline three'
+    assert truncate(text, 100) == text
+    assert truncate(text, 20) == 'line one\nline two\n… 11 more characters'
+
+
+def test_tool_payloads_are_collapsed_and_bounded():
+    transcript = ChatTranscript(preview_chars=200, max_chars=1000)
+    messages = transcript.tool_call('send_message', {'task': 'x' * 1000})
+    assert titles(messages) == ['🛠️ Tool Call #1: send_message']
+    assert len(messages[0].content) < 300
+
+
+def test_repeated_exchange_only_increases_its_count():
+    transcript = ChatTranscript()
+    for _ in range(3):
+        transcript.tool_call('check_task', {'task_id': 't1'})
+        messages = transcript.tool_response('check_task', {'state': 'working'})
+    assert titles(messages) == ['🛠️ Tool Call #1: check_task (×3)', '⚡ Tool Response #1: check_task']
+
+    messages = transcript.tool_call('check_task', {'task_id': 't1'})
+    messages = transcript.tool_response('check_task', {'state': 'completed'})
+    assert len(messages) == 4
+
+
+def test_response_and_long_strings_already_shown_are_referenced():
+    transcript = ChatTranscript()
+    document = 'word ' * 200
+    transcript.tool_call('send_message', {'agent_name': 'Data Agent'})
+    transcript.tool_response('send_message', {'data': document})
+    transcript.tool_call('send_message', {'agent_name': 'Business Agent', 'data': document})
+    messages = transcript.tool_response('send_message', {'data': document})
+    assert '<1,000 characters, shown in' in messages[2].content and document not in messages[2].content
+    assert messages[3].content == 'Same response as "⚡ Tool Response #1: send_message".'
+
+
+def test_status_updates_of_a_task_replace_each_other():
+    transcript = ChatTranscript()
+    transcript.task_update(status(TaskState.submitted), AGENT)
+    messages = transcript.task_update(status(TaskState.working), AGENT)
+    assert len(messages) == 1 and 'working' in messages[0].content
+    messages = transcript.task_update(status(TaskState.working, task_id='t2'), AGENT)
+    assert len(messages) == 2
+
+
+def test_answer_replaces_the_answer_since_the_last_tool_message():
+    transcript = ChatTranscript()
+    transcript.answer('Draft')
+    messages = transcript.answer('Draft, then final')
+    assert [m.content for m in messages] == ['Draft, then final']
+    transcript.tool_call('check_task', {'task_id': 't1'})
+    messages = transcript.answer('Next answer')
+    assert [m.content for m in messages][-1] == 'Next answer' and len(messages) == 3
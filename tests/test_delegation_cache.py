@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('a2a')
+pytest.importorskip('google.adk')
+
+from coordinator import DelegationCache
+
+
+class CountingCall:
+    def __init__(self, result='done', delay=0.01):
+        self.calls = 0
+        self.result = result
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+def test_key_depends_on_task_and_artifact_refs_only():
+    key = DelegationCache.make_key('ctx', 'Data Agent', ' Find sales data ')
+    assert key == DelegationCache.make_key('ctx', 'Data Agent', 'Find sales data', [])
+    assert key != DelegationCache.make_key('ctx', 'Data Agent', 'Find sales data', [{'id': 'a1'}])
+    assert key != DelegationCache.make_key('other', 'Data Agent', 'Find sales data')
+
+
+def test_concurrent_identical_delegations_share_one_call():
+    async def scenario():
+        cache = DelegationCache(ttl=60, max_entries=10)
+        call = CountingCall()
+        key = cache.make_key('ctx', 'agent', 'task')
+        results = await asyncio.gather(*(cache.run(key, call) for _ in range(3)))
+        return results, call.calls
+
+    assert asyncio.run(scenario()) == (['done'] * 3, 1)
+
+
+def test_completed_result_is_reused_until_it_expires():
+    async def scenario():
+        cache = DelegationCache(ttl=60, max_entries=10)
+        expired = DelegationCache(ttl=0, max_entries=10)
+        call, other = CountingCall(), CountingCall()
+        for _ in range(2):
+            await cache.run(('ctx', 'agent', 'a'), call)
+            await expired.run(('ctx', 'agent', 'a'), other)
+        return call.calls, other.calls
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_rejected_results_and_failures_are_not_cached():
+    async def scenario():
+        cache = DelegationCache(ttl=60, max_entries=10, should_cache=lambda result: result == 'done')
+        partial = CountingCall(result='partial')
+        await cache.run(('ctx', 'agent', 'a'), partial)
+        await cache.run(('ctx', 'agent', 'a'), partial)
+
+        async def fail():
+            raise RuntimeError('remote agent down')
+
+        with pytest.raises(RuntimeError):
+            await cache.run(('ctx', 'agent', 'b'), fail)
+        return partial.calls, cache.get(('ctx', 'agent', 'b'))
+
+    assert asyncio.run(scenario()) == (2, None)
+
+
+def test_results_are_bounded_in_lru_order_and_invalidated_by_context():
+    async def scenario():
+        cache = DelegationCache(ttl=60, max_entries=2)
+        for task in ('a', 'b'):
+            await cache.run(('ctx', 'agent', task), CountingCall(result=task))
+        cache.get(('ctx', 'agent', 'a'))
+        await cache.run(('other', 'agent', 'c'), CountingCall(result='c'))
+        kept = [cache.get(('ctx', 'agent', t)) for t in ('a', 'b')]
+        cache.invalidate('ctx')
+        return kept, cache.get(('ctx', 'agent', 'a')), cache.get(('other', 'agent', 'c'))
+
+    assert asyncio.run(scenario()) == (['a', None], None, 'c')
+
+
+def test_cancelling_one_caller_keeps_the_call_for_the_others():
+    async def scenario():
+        cache = DelegationCache(ttl=60, max_entries=10)
+        call = CountingCall(delay=0.05)
+        key = ('ctx', 'agent', 'a')
+        first = asyncio.create_task(cache.run(key, call))
+        second = asyncio.create_task(cache.run(key, call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, call.calls
+
+    assert asyncio.run(scenario()) == ('done', 1)
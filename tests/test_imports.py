@@ -0,0 +1,42 @@
+import os, subprocess, sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules loaded at the start of the agent processes, and those of the agents,
+# which must not load ADK, Gemini or MCP until an agent is built
+MODULES = ['constants', 'logs.core.loggers', 'Policy_Enforcer.rule_engine', 'file_viewer']
+AGENT_MODULES = [
+    'Data_Agent.data_agent',
+    'Business_Agent.business_agent',
+    'Automation_Agent.automation_agent',
+    'Validator_Agent.validator_agent',
+    'Policy_Enforcer.policy_enforcement_agent',
+]
+HEAVY_MODULES = ('google.adk', 'google.genai', 'mcp')
+
+
+def import_without_credentials(module: str) -> list[str]:
+    """Heavy modules loaded by importing `module` in a fresh interpreter without credentials."""
+    env = {k: v for k, v in os.environ.items() if k not in ('GOOGLE_API_KEY', 'TIMEOUT')}
+    env['PYTHONPATH'] = ROOT
+    check = f'import sys, {module}; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    process = subprocess.run([sys.executable, '-c', check], cwd=ROOT, env=env, capture_output=True, text=True)
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1]
+        # A missing dependency is not installed here, a missing app module is a failure
+        missing = error.split("'")[1].split('.')[0] if error.startswith('ModuleNotFoundError') else None
+        if missing and not any(os.path.exists(os.path.join(ROOT, missing + suffix)) for suffix in ('', '.py')):
+            pytest.skip(error)
+        pytest.fail(f'import {module} failed: {error}')
+    return [m for m in process.stdout.strip().split(',') if m]
+
+
+@pytest.mark.parametrize('module', MODULES + AGENT_MODULES)
+def test_module_imports_without_credentials(module):
+    import_without_credentials(module)
+
+
+@pytest.mark.parametrize('module', AGENT_MODULES)
+def test_agent_module_builds_nothing_at_import(module):
+    assert import_without_credentials(module) == []
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+# constants loads the .env file
+pytest.importorskip('dotenv')
+
+from output_moderation import ChunkedOutputCheck
+
+PARAGRAPHS = ['First paragraph. ' * 4, 'Second paragraph. ' * 4, 'Unsafe paragraph. ' * 4, 'Last one.']
+
+
+def moderate(paragraphs, unsafe='Unsafe'):
+    """Feed paragraphs one by one, returning the checked chunks, releases and rejection."""
+    async def scenario():
+        checked = []
+
+        async def check(chunk):
+            checked.append(chunk)
+            await asyncio.sleep(0)
+            return unsafe not in chunk, f'{unsafe} content'
+
+        moderation = ChunkedOutputCheck(check, chunk_size=40)
+        pieces = [paragraph + '\n\n' for paragraph in paragraphs[:-1]] + paragraphs[-1:]
+        for piece in pieces:
+            moderation.feed(piece)
+        moderation.finish(''.join(pieces))
+        releases = [released async for released in moderation.releases()]
+        return checked, releases, moderation.rejection
+
+    return asyncio.run(scenario())
+
+
+def test_chunks_are_cut_at_paragraph_breaks_and_checked_in_order():
+    checked, releases, rejection = moderate(PARAGRAPHS[:2] + PARAGRAPHS[3:], unsafe='Nothing')
+    assert checked[0] == PARAGRAPHS[0] + '\n\n'
+    assert ''.join(checked) == '\n\n'.join(PARAGRAPHS[:2] + PARAGRAPHS[3:])
+    assert releases[-1] == ''.join(checked)
+    assert rejection is None
+
+
+def test_releases_stop_at_the_first_unsafe_chunk():
+    checked, releases, rejection = moderate(PARAGRAPHS)
+    assert rejection == 'Unsafe content'
+    assert releases == [PARAGRAPHS[0] + '\n\n', PARAGRAPHS[0] + '\n\n' + PARAGRAPHS[1] + '\n\n']
+    # No chunk after the unsafe one is checked
+    assert not any('Last one' in chunk for chunk in checked)
+
+
+def test_long_text_without_paragraph_breaks_is_cut_at_sentence_ends():
+    async def scenario():
+        checked = []
+
+        async def check(chunk):
+            checked.append(chunk)
+            return True, ''
+
+        moderation = ChunkedOutputCheck(check, chunk_size=40)
+        moderation.feed('A sentence of some twenty words. ' * 6)
+        await asyncio.sleep(0)
+        return checked
+
+    checked = asyncio.run(scenario())
+    assert checked and all(chunk.endswith('. ') for chunk in checked)
@@ -0,0 +1,107 @@
+import asyncio, sqlite3
+
+import pytest
+
+pytest.importorskip('a2a')
+pytest.importorskip('google.adk')
+
+import sqlite_storage
+from google.adk.events import Event
+from sqlite_storage import SqliteSessionService, SqliteStorage
+
+
+def run(scenario):
+    return asyncio.run(scenario())
+
+
+def test_values_are_read_back_before_and_after_a_flush(tmp_path):
+    path = str(tmp_path / 'kv.db')
+
+    async def scenario():
+        storage = SqliteStorage(path)
+        await storage.put('ns', 'a', {'n': 1})
+        await storage.put('ns', 'big', 'x' * 10000)
+        pending = await storage.get('ns', 'a')
+        await storage.close()
+
+        reopened = SqliteStorage(path)
+        values = await reopened.get('ns', 'a'), await reopened.get('ns', 'big'), await reopened.get('ns', 'missing')
+        await reopened.close()
+        return pending, values
+
+    assert run(scenario) == ({'n': 1}, ({'n': 1}, 'x' * 10000, None))
+
+
+def test_deletes_keys_and_items_merge_the_buffered_writes(tmp_path):
+    async def scenario():
+        storage = SqliteStorage(str(tmp_path / 'kv.db'))
+        for key in ('s/1', 's/2', 't/1'):
+            await storage.put('ns', key, key)
+        await storage.flush()
+        await storage.delete('ns', 's/1')
+        await storage.put('ns', 's/3', 's/3')
+        result = await storage.get('ns', 's/1'), await storage.keys('ns', 's/'), await storage.items('ns', 's/')
+        await storage.close()
+        return result
+
+    assert run(scenario) == (None, ['s/2', 's/3'], [('s/2', 's/2'), ('s/3', 's/3')])
+
+
+def test_values_expire_after_the_ttl(tmp_path):
+    async def scenario():
+        storage = SqliteStorage(str(tmp_path / 'kv.db'), ttl=0.05, shared=True)
+        await storage.put('ns', 'a', 1)
+        await storage.flush()
+        fresh = await storage.get('ns', 'a')
+        await asyncio.sleep(0.1)
+        expired = await storage.get('ns', 'a'), await storage.keys('ns')
+        await storage.close()
+        return fresh, expired
+
+    assert run(scenario) == (1, (None, []))
+
+
+def test_failed_background_flush_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_storage, 'FLUSH_RETRY_DELAY', 0.01)
+    path = str(tmp_path / 'kv.db')
+
+    async def scenario():
+        storage = SqliteStorage(path)
+        write, failures = storage._write, [2]
+
+        def flaky_write(rows, now):
+            if failures[0]:
+                failures[0] -= 1
+                raise sqlite3.OperationalError('database is locked')
+            write(rows, now)
+
+        storage._write = flaky_write
+        await storage.put('ns', 'a', 1)
+        await asyncio.sleep(0.2)
+        flushed = not storage._pending and storage._flusher.done()
+        await storage.close()
+        return flushed, failures[0]
+
+    assert run(scenario) == (True, 0)
+    with sqlite3.connect(path) as db:
+        assert db.execute('SELECT COUNT(*) FROM kv').fetchone() == (1,)
+
+
+def test_sessions_keep_only_their_most_recent_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_storage, 'EVENT_TRIM_SLACK', 2)
+
+    async def scenario():
+        storage = SqliteStorage(str(tmp_path / 'kv.db'))
+        service = SqliteSessionService(storage, max_events=3)
+        session = await service.create_session(app_name='app', user_id='user', session_id='s1')
+        for i in range(10):
+            event = Event(author='user', invocation_id=f'inv{i}', timestamp=1000.0 + i)
+            await service.append_event(session, event)
+        stored = await storage.keys(SqliteSessionService.EVENTS, 'app/user/s1/')
+        loaded = await service.get_session(app_name='app', user_id='user', session_id='s1')
+        await storage.close()
+        return len(stored), [event.invocation_id for event in loaded.events]
+
+    stored, invocations = run(scenario)
+    assert stored <= 3 + 2
+    assert invocations == ['inv7', 'inv8', 'inv9']
@@ -0,0 +1,64 @@
+import asyncio
+
+from Policy_Enforcer.verdict_cache import VerdictCache, normalize
+
+SAFE = '{"decision": "safe", "reasoning": "ok"}'
+UNSAFE = '{"decision": "unsafe", "reasoning": "exfiltration"}'
+SENTENCE = (
+    'Please draft a reply to the supplier saying we will not send them the full '
+    'customer database export today'
+)
+
+
+def test_normalize_ignores_case_whitespace_and_punctuation():
+    assert normalize('  Hello,   WORLD!! ') == 'hello world'
+
+
+def test_exact_match_reuses_safe_verdict():
+    async def scenario():
+        cache = VerdictCache(size=10, ttl=60)
+        await cache.put(SENTENCE, SAFE, safe=True)
+        return await cache.get(SENTENCE.upper() + '.')
+
+    assert asyncio.run(scenario()) == SAFE
+
+
+def test_near_duplicate_never_inherits_safe_verdict():
+    async def scenario():
+        cache = VerdictCache(size=10, ttl=60)
+        await cache.put(SENTENCE, SAFE, safe=True)
+        # Deleting the negation keeps the text close and flips its meaning
+        return await cache.get(SENTENCE.replace(' not ', ' '))
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_near_duplicate_inherits_unsafe_verdict():
+    async def scenario():
+        cache = VerdictCache(size=10, ttl=60)
+        await cache.put(SENTENCE.replace(' not ', ' '), UNSAFE, safe=False)
+        return await cache.get(SENTENCE.replace(' not ', ' ') + ' thanks')
+
+    assert asyncio.run(scenario()) == UNSAFE
+
+
+def test_short_texts_only_match_exactly():
+    async def scenario():
+        cache = VerdictCache(size=10, ttl=60)
+        await cache.put('not approved', UNSAFE, safe=False)
+        return await cache.get('approved')
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_expired_and_evicted_entries_are_missed():
+    async def scenario():
+        cache = VerdictCache(size=1, ttl=-1)
+        await cache.put('first text', SAFE, safe=True)
+        expired = await cache.get('first text')
+        cache.ttl = 60
+        await cache.put('first text', SAFE, safe=True)
+        await cache.put('second text', SAFE, safe=True)
+        return expired, await cache.get('first text'), await cache.get('second text')
+
+    assert asyncio.run(scenario()) == (None, None, SAFE)
@@ -0,0 +1,32 @@
+from Policy_Enforcer.windows import split_windows
+
+TEXT = ' '.join(f'word{i}' for i in range(200))
+
+
+def test_short_text_is_a_single_window():
+    assert split_windows('a short text', size=100, overlap=10) == ['a short text']
+
+
+def test_windows_are_bounded_and_cover_the_whole_text():
+    windows = split_windows(TEXT, size=100, overlap=20)
+    assert len(windows) > 1
+    assert all(len(window) <= 100 for window in windows)
+    assert windows[0] == TEXT[:len(windows[0])]
+    assert TEXT.endswith(windows[-1])
+
+
+def test_consecutive_windows_overlap():
+    windows = split_windows(TEXT, size=100, overlap=20)
+    for previous, window in zip(windows, windows[1:]):
+        assert previous[-20:] == window[:20]
+
+
+def test_cuts_fall_on_whitespace():
+    windows = split_windows(TEXT, size=100, overlap=20)
+    for window in windows[:-1]:
+        assert TEXT[TEXT.index(window) + len(window)] == ' '
+
+
+def test_text_without_whitespace_is_cut_at_the_size():
+    windows = split_windows('x' * 250, size=100, overlap=10)
+    assert [len(window) for window in windows] == [100, 100, 70]